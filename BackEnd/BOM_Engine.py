@@ -0,0 +1,143 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+from scipy import sparse
+
+from Connect_MySQL import *
+from Recipe_Store import recipe_store
+
+
+class BillOfMaterials:
+    """Recipes as a sparse dishes x ingredients matrix.
+
+    Multiplying a days x dishes sales plan by it gives days x ingredients
+    demand in one operation. The matrix is rebuilt only when the recipe
+    store hands out a new set of recipes.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._recipes = None
+        self._built = None
+
+    def _build(self, recipes):
+        dishes = list(recipes)
+        dish_index = {dish: i for i, dish in enumerate(dishes)}
+        ingredient_index = {}
+        rows, cols, values = [], [], []
+        for dish, ingredients in recipes.items():
+            for ingredient, qty in ingredients.items():
+                col = ingredient_index.setdefault(ingredient, len(ingredient_index))
+                rows.append(dish_index[dish])
+                cols.append(col)
+                values.append(qty)
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(values, dtype=float), (rows, cols)),
+            shape=(len(dishes), len(ingredient_index)),
+        )
+        return {
+            "dishes": dishes,
+            "dish_index": dish_index,
+            "ingredients": np.asarray(list(ingredient_index), dtype=object),
+            "ingredient_index": ingredient_index,
+            "matrix": matrix,
+            "uses": (matrix != 0).astype(float),
+        }
+
+    def current(self):
+        recipes = self.store.recipes()
+        with self._lock:
+            if recipes is not self._recipes:
+                self._built = self._build(recipes)
+                self._recipes = recipes
+            return self._built
+
+    def demand(self, plan):
+        """days x dishes plan -> days x ingredients demand."""
+        return np.asarray((self.current()["matrix"].T @ plan.T).T)
+
+
+bom = BillOfMaterials(recipe_store)
+
+
+def _as_number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def plan_ingredients(days=1):
+    """Per-day ingredient demand for the next `days` days against current stock.
+
+    Each day is judged on the cumulative demand up to and including that day,
+    so stock used on day 1 is not counted again for day 2.
+    """
+    start = (datetime.now() + timedelta(days=1)).date()
+    dates = [start + timedelta(days=i) for i in range(days)]
+    date_index = {date: i for i, date in enumerate(dates)}
+
+    with get_cursor() as cursor:
+        cursor.execute("""
+            SELECT date, dish_name, ROUND(predicted_sales) AS predicted_sales
+            FROM sales_predictions
+            WHERE date BETWEEN %s AND %s
+            ORDER BY date, id
+        """, (dates[0], dates[-1]))
+        predictions = cursor.fetchall()
+
+        cursor.execute("SELECT ingredient, quantity FROM inventory")
+        inventory_data = cursor.fetchall()
+
+    built = bom.current()
+    dish_index = built["dish_index"]
+    ingredients = built["ingredients"]
+
+    # days x dishes plan, plus which dishes have a prediction at all that day
+    plan = np.zeros((days, len(dish_index)))
+    predicted = np.zeros((days, len(dish_index)))
+    sales_summary = [[] for _ in dates]
+    for date, dish, sales in predictions:
+        day = date_index[date]
+        sales_summary[day].append({"dish": dish, "predicted_sales": int(sales)})
+        if dish in dish_index:
+            plan[day, dish_index[dish]] = int(sales)
+            predicted[day, dish_index[dish]] = 1
+
+    demand = bom.demand(plan)
+    cumulative = np.cumsum(demand, axis=0)
+    touched = np.asarray((built["uses"].T @ predicted.T).T) > 0
+
+    available = np.zeros(len(ingredients))
+    for ingredient, qty in inventory_data:
+        col = built["ingredient_index"].get(ingredient)
+        if col is not None:
+            available[col] = qty or 0
+
+    result = []
+    for day, date in enumerate(dates):
+        mask = touched[day]
+        required = cumulative[day]
+        to_buy = mask & (available == 0)
+        insufficient = mask & (available > 0) & (available < required)
+        sufficient = mask & (available >= required) & (available > 0)
+
+        result.append({
+            "date": date.isoformat(),
+            "predicted_sales": sales_summary[day],
+            "total_ingredients_needed": {
+                name: _as_number(qty) for name, qty in zip(ingredients[mask], demand[day][mask])
+            },
+            "ingredients_to_buy": {
+                name: _as_number(qty) for name, qty in zip(ingredients[to_buy], required[to_buy])
+            },
+            "insufficient_ingredients": {
+                name: {"available": _as_number(have), "required": _as_number(need)}
+                for name, have, need in zip(ingredients[insufficient], available[insufficient], required[insufficient])
+            },
+            "sufficient_ingredients": {
+                name: _as_number(have) for name, have in zip(ingredients[sufficient], available[sufficient])
+            },
+        })
+    return result
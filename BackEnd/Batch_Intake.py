@@ -0,0 +1,88 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from Freshness import freshness_classifier
+from Yolo_Prediction import run_detection, update_inventory_from_counts
+
+
+class MicroBatcher:
+    """Groups pending images into batches for a single YOLO call.
+
+    `submit()` returns a Future right away. A background thread waits for the
+    first image, then keeps collecting until either `max_batch_size` images are
+    queued or `max_wait` seconds have passed, and runs them through the
+    detector together. Each Future resolves to that image's label counts.
+    """
+
+    def __init__(self, max_batch_size=8, max_wait=0.05):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def submit(self, source):
+        self._ensure_started()
+        future = Future()
+        self._pending.put((source, future))
+        return future
+
+    def _collect(self):
+        batch = [self._pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            sources = [source for source, _ in batch]
+            try:
+                results, label_counts = run_detection(sources)
+            except Exception as err:
+                for _, future in batch:
+                    future.set_exception(err)
+                continue
+            for (_, future), result, counts in zip(batch, results, label_counts):
+                future.set_result((result, counts))
+
+
+batcher = MicroBatcher(
+    max_batch_size=int(os.getenv("IntakeMaxBatch", 8)),
+    max_wait=float(os.getenv("IntakeMaxWaitMs", 50)) / 1000,
+)
+
+
+def intake_images(sources):
+    """Detect every image of one delivery and commit the combined counts at once."""
+    futures = [batcher.submit(source) for source in sources]
+    detections = [future.result() for future in futures]
+    per_image = [counts for _, counts in detections]
+
+    total = Counter()
+    for counts in per_image:
+        total.update(counts)
+    total = dict(total)
+
+    # Boxes from the whole delivery go through the freshness model together
+    freshness = freshness_classifier.assess([result for result, _ in detections])
+
+    update_inventory_from_counts(total, freshness)
+    return {"images": per_image, "total": total, "freshness": freshness}
@@ -0,0 +1,83 @@
+"""Ingredient demand: nested dict loops vs. the sparse bill-of-materials matrix.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.BOM_Benchmark --dishes 5000 --ingredients 3000 --days 14
+
+Synthetic recipes and predictions only, no database involved.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from BOM_Engine import BillOfMaterials
+
+
+class StaticRecipes:
+    def __init__(self, recipes):
+        self._recipes = recipes
+
+    def recipes(self):
+        return self._recipes
+
+
+def dict_loops(recipes, predictions):
+    # What get_tomorrow_predictions() used to do, repeated for every day
+    per_day = []
+    for day_predictions in predictions:
+        total = {}
+        for dish, sales in day_predictions.items():
+            for ingredient, qty in recipes[dish].items():
+                total[ingredient] = total.get(ingredient, 0) + qty * sales
+        per_day.append(total)
+    return per_day
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=5000)
+    parser.add_argument("--ingredients", type=int, default=3000)
+    parser.add_argument("--per-dish", type=int, default=8)
+    parser.add_argument("--days", type=int, default=14)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    ingredient_names = [f"Ingredient {i}" for i in range(args.ingredients)]
+    recipes = {
+        f"Dish {d}": {name: rng.randint(1, 3) for name in rng.sample(ingredient_names, args.per_dish)}
+        for d in range(args.dishes)
+    }
+    predictions = [{dish: rng.randint(0, 60) for dish in recipes} for _ in range(args.days)]
+
+    start = time.perf_counter()
+    expected = dict_loops(recipes, predictions)
+    loops = time.perf_counter() - start
+
+    bom = BillOfMaterials(StaticRecipes(recipes))
+    start = time.perf_counter()
+    built = bom.current()
+    build = time.perf_counter() - start
+
+    plan = np.zeros((args.days, len(built["dishes"])))
+    for day, day_predictions in enumerate(predictions):
+        for dish, sales in day_predictions.items():
+            plan[day, built["dish_index"][dish]] = sales
+    start = time.perf_counter()
+    demand = bom.demand(plan)
+    multiply = time.perf_counter() - start
+
+    # Spot-check the matrix result against the loops
+    for day in range(args.days):
+        for ingredient, qty in list(expected[day].items())[:50]:
+            assert demand[day, built["ingredient_index"][ingredient]] == qty
+
+    print(f"dishes={args.dishes} ingredients={args.ingredients} days={args.days}")
+    print(f"dict loops            {loops * 1000:9.2f} ms")
+    print(f"matrix build (once)   {build * 1000:9.2f} ms")
+    print(f"matrix multiply       {multiply * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Dashboard load test against a running API: uncached vs. cached vs. 304.
+
+Start the API (uvicorn mainAPI:app) and run from the BackEnd folder, e.g.
+
+    python -m Benchmarks.Cache_Load_Benchmark --url http://localhost:8000 --clients 50 --seconds 10
+
+Every simulated client polls the dashboard endpoints in a loop.
+"uncached" sends Cache-Control: no-cache so every request is rebuilt,
+"cached" is a plain GET served from the response cache, and "conditional"
+replays the last ETag with If-None-Match like a browser does.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+ENDPOINTS = [
+    "/Get_Menu",
+    "/get_inventory_item",
+    "/get_prediction",
+    "/get_inventory_predictions",
+    "/get_Weekly_sales",
+    "/get_Monthly_sales",
+]
+
+
+async def client(http, mode, deadline, latencies, statuses):
+    etags = {}
+    while time.perf_counter() < deadline:
+        for endpoint in ENDPOINTS:
+            headers = {}
+            if mode == "uncached":
+                headers["Cache-Control"] = "no-cache"
+            elif mode == "conditional" and endpoint in etags:
+                headers["If-None-Match"] = etags[endpoint]
+
+            start = time.perf_counter()
+            response = await http.get(endpoint, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if "etag" in response.headers:
+                etags[endpoint] = response.headers["etag"]
+
+
+async def run(url, mode, clients, seconds):
+    latencies, statuses = [], {}
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as http:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(client(http, mode, deadline, latencies, statuses) for _ in range(clients)))
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    print(
+        f"{mode:<12} {len(latencies) / seconds:9.1f} req/s  "
+        f"p50={statistics.median(latencies) * 1000:7.2f} ms  p95={p95 * 1000:7.2f} ms  status={statuses}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--modes", nargs="+", default=["uncached", "cached", "conditional"])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        asyncio.run(run(args.url, mode, args.clients, args.seconds))
+
+    print(httpx.get(args.url + "/cache_stats").json())
+
+
+if __name__ == "__main__":
+    main()
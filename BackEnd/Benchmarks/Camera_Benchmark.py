@@ -0,0 +1,55 @@
+"""Can camera ingestion keep up with a 720p feed on this machine?
+
+Run from the BackEnd folder with a recorded till video:
+
+    python -m Benchmarks.Camera_Benchmark till_720p.mp4
+    python -m Benchmarks.Camera_Benchmark till_720p.mp4 --realtime --diff-threshold 4
+
+By default the file is processed as fast as possible and the result is
+reported as a real-time factor (video seconds per wall-clock second; above
+1.0 keeps up). With --realtime it is played at its own frame rate like a
+live camera, and frames dropped because the detector was busy are reported
+instead. Nothing is written to the database.
+"""
+import argparse
+import json
+import time
+
+from Camera_Ingest import CameraIngest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video")
+    parser.add_argument("--realtime", action="store_true")
+    parser.add_argument("--diff-threshold", type=float, default=6.0)
+    parser.add_argument("--max-fps", type=float, default=10.0)
+    parser.add_argument("--min-hits", type=int, default=3)
+    parser.add_argument("--image-size", type=int, default=640)
+    args = parser.parse_args()
+
+    camera = CameraIngest(
+        args.video,
+        diff_threshold=args.diff_threshold,
+        max_fps=args.max_fps,
+        min_hits=args.min_hits,
+        image_size=args.image_size,
+        realtime=args.realtime,
+        dry_run=True,
+    )
+    camera.start()
+    start = time.perf_counter()
+    camera.wait()
+    elapsed = time.perf_counter() - start
+
+    status = camera.status()
+    video_seconds = status["frames"].get("frames_read", 0) / (status["source_fps"] or 25.0)
+    print(json.dumps(status, indent=2, default=str))
+    print(f"video {video_seconds:.1f} s processed in {elapsed:.1f} s, real-time factor {video_seconds / elapsed:.2f}")
+    sampled = status["frames"].get("frames_detected", 0)
+    print(f"detected {sampled} of {status['frames'].get('frames_read', 0)} frames, "
+          f"avg {status['detect_ms_avg']} ms per detection")
+
+
+if __name__ == "__main__":
+    main()
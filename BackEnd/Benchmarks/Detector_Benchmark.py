@@ -0,0 +1,104 @@
+"""Latency, throughput and count agreement of the detector backends on CPU.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Detector_Benchmark path/to/images --calibration path/to/calibration/images
+    python -m Benchmarks.Detector_Benchmark path/to/images --backends torch onnx --threads 4 --parallel 2
+
+Every backend runs on the same images. Missing exports are created next to
+the weights first (see Detector_Backends.prepare). Counts are compared
+per image and per class against PyTorch FP32, which is what the inventory
+update would have recorded.
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from Detector_Backends import BACKENDS, prepare, set_threads
+from Model_Registry import MODELS
+
+
+def load(path, threads):
+    model = YOLO(path, task="detect")
+    model(np.zeros((640, 640, 3), dtype=np.uint8), device="cpu", verbose=False)  # Builds the predictor
+    set_threads(model, path, threads)
+    return model
+
+
+def counts(model, image):
+    result = model(image, device="cpu", verbose=False)[0]
+    return Counter(model.names[int(idx)] for idx in result.boxes.cls.tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Folder of test images")
+    parser.add_argument("--weights", default=MODELS["till"])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"], choices=BACKENDS)
+    parser.add_argument("--calibration", help="Image folder (onnx-int8) or dataset YAML (openvino-int8)")
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads, 0 = runtime default")
+    parser.add_argument("--parallel", type=int, default=1, help="model instances for the throughput run")
+    args = parser.parse_args()
+
+    images = [cv2.imread(path) for path in sorted(glob.glob(os.path.join(args.images, "*.*")))]
+    images = [image for image in images if image is not None]
+    if not images:
+        raise SystemExit(f"No images found in {args.images}")
+    print(f"images={len(images)} threads={args.threads or 'default'} parallel={args.parallel}")
+
+    reference = None
+    per_class = {}
+    print(f"{'backend':<14} {'p50':>9} {'p95':>9} {'img/s':>8} {'same counts':>12} {'count MAE':>10}")
+    for backend in args.backends:
+        path = prepare(args.weights, backend, args.calibration)
+        model = load(path, args.threads)
+
+        # Latency and counts, one image at a time
+        samples, per_image = [], []
+        for image in images:
+            start = time.perf_counter()
+            per_image.append(counts(model, image))
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+        # Throughput with `parallel` instances working through the set
+        models = [model] + [load(path, args.threads) for _ in range(args.parallel - 1)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.parallel) as pool:
+            list(pool.map(lambda i: counts(models[i % len(models)], images[i]), range(len(images))))
+        throughput = len(images) / (time.perf_counter() - start)
+
+        if reference is None:
+            reference = per_image
+        same = sum(ours == theirs for ours, theirs in zip(per_image, reference)) / len(images)
+        classes = set().union(*reference, *per_image)
+        errors = [abs(ours[name] - theirs[name]) for ours, theirs in zip(per_image, reference) for name in classes]
+        mae = statistics.mean(errors) if errors else 0.0
+        per_class[backend] = {
+            name: statistics.mean(abs(ours[name] - theirs[name]) for ours, theirs in zip(per_image, reference))
+            for name in classes
+        }
+
+        print(f"{backend:<14} {statistics.median(samples) * 1000:7.1f}ms {p95 * 1000:7.1f}ms {throughput:8.1f} {same:11.1%} {mae:10.3f}")
+
+    print(f"(agreement is against {args.backends[0]})")
+
+    # Per-class mean absolute count difference against the reference
+    classes = sorted(set().union(*(errors.keys() for errors in per_class.values())))
+    print()
+    print(f"{'class':<20}" + "".join(f"{backend:>14}" for backend in args.backends))
+    for name in classes:
+        print(f"{name:<20}" + "".join(f"{per_class[backend].get(name, 0.0):14.3f}" for backend in args.backends))
+
+
+if __name__ == "__main__":
+    main()
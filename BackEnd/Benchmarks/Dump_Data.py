@@ -0,0 +1,38 @@
+"""Read table rows straight out of petpooja_dump.sql, no MySQL server needed."""
+import os
+import re
+
+import pandas as pd
+
+DUMP_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "petpooja_dump.sql")
+
+# One tuple of the extended INSERT, e.g. (1,'2024-03-30',6,3,1,0,'Crispy Veggie Delight',42)
+_VALUE = r"(NULL|-?\d+(?:\.\d+)?|'(?:[^'\\]|\\.)*')"
+
+
+def _parse_value(token):
+    if token == "NULL":
+        return None
+    if token.startswith("'"):
+        return token[1:-1].replace("\\'", "'").replace('\\"', '"').replace("\\\\", "\\")
+    return float(token) if "." in token else int(token)
+
+
+def load_table(table, columns, path=DUMP_PATH):
+    """Rows of `table` from the dump as a DataFrame with the given column names."""
+    with open(path, encoding="utf-8") as dump:
+        for line in dump:
+            if line.startswith(f"INSERT INTO `{table}` VALUES "):
+                break
+        else:
+            raise ValueError(f"Table {table} not found in {path}")
+
+    row_pattern = re.compile(r"\(" + ",".join([_VALUE] * len(columns)) + r"\)")
+    rows = [[_parse_value(token) for token in match.groups()] for match in row_pattern.finditer(line)]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def load_sales_data(path=DUMP_PATH):
+    df = load_table("sales_data", ["id", "date", "day", "month", "is_weekend", "is_holiday", "dish_name", "sales"], path)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    return df
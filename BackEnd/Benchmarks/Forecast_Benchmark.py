@@ -0,0 +1,78 @@
+"""Speed and error of the fast NumPy forecaster against per-dish Prophet.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Forecast_Benchmark --horizon 10
+
+Uses the complete days of sales_data in petpooja_dump.sql. The last `horizon` days are held out,
+every engine forecasts them from the remaining history, and MAE / MAPE are
+computed over all dishes. Prophet is skipped if it isn't installed.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import Fast_Forecast
+from Benchmarks.Dump_Data import load_sales_data
+
+
+def score(actual, predicted):
+    merged = actual.merge(predicted, on=["date", "dish_name"], how="inner")
+    error = merged["predicted_sales"] - merged["sales"]
+    mae = float(np.mean(np.abs(error)))
+    mape = float(np.mean(np.abs(error) / merged["sales"].clip(lower=1))) * 100
+    return mae, mape, len(merged)
+
+
+def run_fast(train, horizon, method):
+    start = time.perf_counter()
+    rows = Fast_Forecast.forecast_sales(train, horizon, method)
+    return time.perf_counter() - start, pd.DataFrame(rows, columns=["date", "dish_name", "predicted_sales"])
+
+
+def run_prophet(train, horizon):
+    from Sale_prediction import fit_dish, prepare_data
+
+    start = time.perf_counter()
+    rows = []
+    for dish in train["dish_name"].unique():
+        rows.extend(fit_dish(dish, prepare_data(train, dish))[1])
+    return time.perf_counter() - start, pd.DataFrame(rows, columns=["date", "dish_name", "predicted_sales"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument("--skip-prophet", action="store_true")
+    args = parser.parse_args()
+
+    df = load_sales_data()
+    # The dump ends with a partial day of live orders; keep only complete days
+    dishes_per_day = df.groupby("date")["dish_name"].transform("nunique")
+    df = df[dishes_per_day == df["dish_name"].nunique()]
+    cutoff = sorted(df["date"].unique())[-args.horizon]
+    train = df[df["date"] < cutoff]
+    test = df[df["date"] >= cutoff][["date", "dish_name", "sales"]]
+    print(f"dishes={df['dish_name'].nunique()} train_days={train['date'].nunique()} horizon={args.horizon}")
+
+    print(f"{'engine':<24} {'seconds':>9} {'MAE':>7} {'MAPE%':>7} {'points':>7}")
+    for method in Fast_Forecast.METHODS:
+        seconds, predicted = run_fast(train, args.horizon, method)
+        mae, mape, points = score(test, predicted)
+        print(f"{'fast/' + method:<24} {seconds:>9.4f} {mae:>7.2f} {mape:>7.1f} {points:>7}")
+
+    if args.skip_prophet:
+        return
+    try:
+        seconds, predicted = run_prophet(train, args.horizon)
+    except ImportError:
+        print("prophet is not installed, skipping")
+        return
+    mae, mape, points = score(test, predicted)
+    print(f"{'prophet (serial)':<24} {seconds:>9.4f} {mae:>7.2f} {mape:>7.1f} {points:>7}")
+
+
+if __name__ == "__main__":
+    main()
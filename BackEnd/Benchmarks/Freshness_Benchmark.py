@@ -0,0 +1,92 @@
+"""Latency the freshness stage adds to a scan at 5, 20 and 50 detections.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Freshness_Benchmark --runs 20
+    python -m Benchmarks.Freshness_Benchmark --untrained     # no model file, same architecture
+
+A 12-MP-class frame is downscaled to 1280 px (what the upload path hands the
+detector at most) and random boxes are placed on it, shaped like what
+ultralytics returns. "batched" is Freshness.assess: every crop in one
+forward pass. "per crop" calls the model once per crop, for comparison.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from Freshness import LABELS, FreshnessClassifier
+
+
+class _Tensor:
+    # Just enough of a torch tensor for FreshnessClassifier.crops
+    def __init__(self, array):
+        self._array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._array
+
+
+class _Boxes:
+    def __init__(self, xyxy, cls):
+        self.xyxy = _Tensor(xyxy)
+        self.cls = _Tensor(cls)
+
+
+class _Result:
+    def __init__(self, frame, boxes, classes, names):
+        self.orig_img = frame
+        self.boxes = _Boxes(boxes, classes)
+        self.names = names
+
+
+def fake_result(detections, rng, width=1280, height=960):
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    x1 = rng.integers(0, width - 200, detections)
+    y1 = rng.integers(0, height - 200, detections)
+    sizes = rng.integers(60, 200, (detections, 2))
+    boxes = np.stack([x1, y1, x1 + sizes[:, 0], y1 + sizes[:, 1]], axis=1).astype(float)
+    classes = rng.integers(0, 5, detections).astype(float)
+    names = {i: name for i, name in enumerate(["Tomato", "Onion", "Potato", "Carrot", "Capsicum"])}
+    return _Result(frame, boxes, classes, names)
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--untrained", action="store_true", help="time an untrained MobileNetV2 instead of the model file")
+    parser.add_argument("--detections", type=int, nargs="+", default=[5, 20, 50])
+    args = parser.parse_args()
+
+    classifier = FreshnessClassifier()
+    if args.untrained:
+        import keras
+        classifier.load(keras.applications.MobileNetV2(weights=None, classes=len(LABELS)))
+    else:
+        classifier.load()
+
+    rng = np.random.default_rng(0)
+    print(f"{'detections':>10} {'batched':>12} {'per crop':>12} {'per box':>10}")
+    for detections in args.detections:
+        result = fake_result(detections, rng)
+        crops = [crop for _, crop in classifier.crops([result])]
+        batched = timed(lambda: classifier.assess([result]), args.runs)
+        one_by_one = timed(lambda: [classifier.classify([crop]) for crop in crops], max(3, args.runs // 5))
+        print(f"{detections:>10} {batched:9.1f} ms {one_by_one:9.1f} ms {batched / detections:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Detection throughput (images/sec) of the micro-batching intake queue.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Intake_Benchmark path/to/images --batch-sizes 1 4 8 16 --images 64
+
+Every image is submitted to a MicroBatcher configured with the given max
+batch size, all at once, the way a 10-30 photo delivery arrives through
+/upload-images. Only detection is timed; the inventory commit is skipped.
+"""
+import argparse
+import glob
+import os
+import time
+
+from Batch_Intake import MicroBatcher
+from Model_Registry import device, registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Folder of test images")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--images", type=int, default=64, help="Images submitted per run")
+    parser.add_argument("--max-wait-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.images, "*.*")))
+    if not paths:
+        raise SystemExit(f"No images found in {args.images}")
+    sources = [paths[i % len(paths)] for i in range(args.images)]
+
+    # Load and warm the model outside the timed section
+    with registry.model("till"):
+        pass
+
+    print(f"device={device} images={len(sources)}")
+    print(f"{'batch':>5} {'seconds':>8} {'images/s':>9}")
+    for batch_size in args.batch_sizes:
+        batcher = MicroBatcher(max_batch_size=batch_size, max_wait=args.max_wait_ms / 1000)
+        start = time.perf_counter()
+        futures = [batcher.submit(source) for source in sources]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>5} {elapsed:>8.2f} {len(sources) / elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Fan-out cost of the inventory event stream with many subscribers.
+
+Run from the BackEnd folder, e.g.
+
+    python -m Benchmarks.Inventory_Events_Benchmark --subscribers 500 --events 2000
+    python -m Benchmarks.Inventory_Events_Benchmark --url http://localhost:8000 --subscribers 300 --seconds 30
+
+Without --url everything runs in-process: simulated tablets subscribe to an
+InventoryEvents broadcaster and a worker thread publishes deltas the way the
+write paths do after commit. It reports delivery latency and how many slow
+subscribers were cut off.
+
+With --url it opens that many SSE connections to a running API and counts
+the snapshots and deltas each receives; post orders or scan images while it
+runs to generate deltas.
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from Inventory_Events import InventoryEvents
+
+
+async def in_process(subscribers, events, rate, slow):
+    broadcaster = InventoryEvents(queue_size=256)
+    broadcaster.attach(asyncio.get_running_loop())
+    published_at = {}
+    latencies = []
+    received = [0] * subscribers
+
+    async def tablet(index):
+        stream = broadcaster.stream(lambda: [])
+        async for chunk in stream:
+            now = time.perf_counter()
+            for line in chunk.split(b"\n"):
+                if line.startswith(b"id: "):
+                    event_id = int(line[4:])
+                    if event_id in published_at:
+                        latencies.append(now - published_at[event_id])
+                        received[index] += 1
+            if index < slow:
+                await asyncio.sleep(0.05)  # Simulates a tablet on a bad connection
+            if received[index] >= events:
+                break
+
+    tasks = [asyncio.create_task(tablet(i)) for i in range(subscribers)]
+    await asyncio.sleep(0.2)  # Let everyone get their snapshot
+
+    def writer():
+        for i in range(events):
+            rows = [{"ingredient": f"ingredient_{i % 50}", "quantity": i, "remaining_life": 7, "quality": "Fresh", "seq": i + 1}]
+            published_at[i + 1] = time.perf_counter()
+            broadcaster.publish(rows)
+            if rate:
+                time.sleep(1 / rate)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=writer)
+    thread.start()
+    await asyncio.to_thread(thread.join)
+    await asyncio.wait(tasks, timeout=10)
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+
+    latencies.sort()
+    print(f"subscribers={subscribers} events={events} in {elapsed:.2f} s")
+    print(f"deliveries={len(latencies)}  ({len(latencies) / elapsed:,.0f}/s)")
+    if latencies:
+        print(f"latency p50={statistics.median(latencies) * 1000:.2f} ms  p99={latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(broadcaster.status())
+
+
+async def over_http(url, subscribers, seconds):
+    import httpx
+
+    counts = {"snapshot": 0, "delta": 0}
+    first_byte = []
+
+    async def tablet(http):
+        start = time.perf_counter()
+        async with http.stream("GET", "/inventory/events") as response:
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[7:]
+                    if event == "snapshot":
+                        first_byte.append(time.perf_counter() - start)
+                    counts[event] = counts.get(event, 0) + 1
+
+    limits = httpx.Limits(max_connections=subscribers)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=None) as http:
+        tasks = [asyncio.create_task(tablet(http)) for _ in range(subscribers)]
+        await asyncio.sleep(seconds)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if first_byte:
+        print(f"snapshot time p50={statistics.median(first_byte) * 1000:.1f} ms  max={max(first_byte) * 1000:.1f} ms")
+    print(counts)
+    print(httpx.get(url + "/inventory/events/status").json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=100, help="events per second, 0 = as fast as possible")
+    parser.add_argument("--slow", type=int, default=5, help="subscribers that read slowly")
+    parser.add_argument("--url", help="test a running API instead of the in-process broadcaster")
+    parser.add_argument("--seconds", type=float, default=30)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(over_http(args.url, args.subscribers, args.seconds))
+    else:
+        asyncio.run(in_process(args.subscribers, args.events, args.rate, args.slow))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Point-in-time stock and consumption-rate queries over a large inventory ledger.
+
+Run from the BackEnd folder against a scratch MySQL database (it replaces
+the inventory ledger and its snapshots):
+
+    python -m Benchmarks.Ledger_Benchmark --events 5000000 --ingredients 200 --days 365 --runs 50
+    python -m Benchmarks.Ledger_Benchmark --skip-load --runs 50     # reuse the last load
+
+The ledger is filled with synthetic orders, intakes and waste spread over
+--days, then a snapshot is materialized every --snapshot-hours the way the
+ledger_snapshot job does. "full replay" sums every delta up to the
+requested time, which is what answering the question without snapshots
+costs; "snapshot" is Inventory_Ledger.stock_at. Consumption is
+Inventory_Ledger.consumption for one ingredient over 30 days and for every
+ingredient over 7 days.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from Benchmarks.Synthetic_Data import generate_ledger, load_ledger
+from Connect_MySQL import get_cursor
+from Inventory_Ledger import consumption, ensure_ledger_tables, snapshot_upto, stock_at
+
+FULL_REPLAY = """
+SELECT ingredient, SUM(delta) FROM inventory_ledger
+WHERE at <= %s GROUP BY ingredient;
+"""
+
+
+def build_snapshots(every):
+    """Snapshot every `every` of ledger time, oldest first. Returns how many."""
+    with get_cursor() as cursor:
+        cursor.execute("SELECT MIN(at), MAX(at) FROM inventory_ledger;")
+        first, last = cursor.fetchone()
+    previous = 0
+    count = 0
+    at = first + every
+    while at <= last:
+        with get_cursor(commit=True) as cursor:
+            cursor.execute("SELECT id, at FROM inventory_ledger WHERE at <= %s ORDER BY at DESC LIMIT 1;", (at,))
+            upto, taken_at = cursor.fetchone()
+            if upto > previous:
+                snapshot_upto(cursor, previous, upto, taken_at)
+                previous = upto
+                count += 1
+        at += every
+    return count
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5_000_000)
+    parser.add_argument("--ingredients", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--snapshot-hours", type=float, default=12)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--skip-load", action="store_true")
+    args = parser.parse_args()
+
+    ensure_ledger_tables()
+    if not args.skip_load:
+        start = time.perf_counter()
+        rows = load_ledger(generate_ledger(args.events, args.ingredients, args.days))
+        print(f"Loaded {rows} ledger rows in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        snapshots = build_snapshots(timedelta(hours=args.snapshot_hours))
+        print(f"Built {snapshots} snapshots in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(0)
+    now = datetime.now()
+
+    def random_time():
+        return now - timedelta(seconds=rng.uniform(0, args.days * 86400))
+
+    def full_replay():
+        with get_cursor() as cursor:
+            cursor.execute(FULL_REPLAY, (random_time(),))
+            return cursor.fetchall()
+
+    ingredient = "Ingredient 0000"
+    replay_runs = max(3, args.runs // 10)
+    print(f"{'stock at a random time':<40} {'median':>10}")
+    print(f"{'  full replay, all ingredients':<40} {timed(full_replay, replay_runs):7.1f} ms")
+    print(f"{'  snapshot, all ingredients':<40} {timed(lambda: stock_at(random_time()), args.runs):7.1f} ms")
+    print(f"{'  snapshot, one ingredient':<40} {timed(lambda: stock_at(random_time(), [ingredient]), args.runs):7.1f} ms")
+    print(f"{'consumption':<40}")
+    print(f"{'  one ingredient, 30 days':<40} {timed(lambda: consumption(now - timedelta(days=30), now, [ingredient]), args.runs):7.1f} ms")
+    print(f"{'  one ingredient, 30 days by day':<40} {timed(lambda: consumption(now - timedelta(days=30), now, [ingredient], 'day'), args.runs):7.1f} ms")
+    print(f"{'  all ingredients, 7 days':<40} {timed(lambda: consumption(now - timedelta(days=7), now), max(3, args.runs // 5)):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
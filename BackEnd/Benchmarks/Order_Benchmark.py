@@ -0,0 +1,86 @@
+"""Orders/sec for order posting at 1, 8 and 32 concurrent clients.
+
+Run from the BackEnd folder against a scratch copy of the database (it
+really posts orders and changes stock):
+
+    python -m Benchmarks.Order_Benchmark --clients 1 8 32 --seconds 10 --restock 1000000
+    python -m Benchmarks.Order_Benchmark --url http://localhost:8000 --batch 10
+
+Each client posts random menu dishes as fast as it can, one order per call
+(update_inventory_for_dish) or `--batch` orders per call (post_orders /
+/add_orders). --restock tops every ingredient up first so runs don't stop on
+empty stock.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from Connect_MySQL import get_cursor
+from Recipe_Store import recipe_store
+from SQL_Action import post_orders
+
+
+def restock(quantity):
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("UPDATE inventory SET quantity = %s;", (quantity,))
+
+
+def post_http(url, orders):
+    body = json.dumps({"orders": [{"dish_name": dish, "quantity": qty} for dish, qty in orders]}).encode()
+    request = urllib.request.Request(f"{url}/add_orders", data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+
+
+def run(clients, seconds, batch, dishes, url=None):
+    posted = 0
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(worker_id):
+        nonlocal posted, errors
+        rng = random.Random(worker_id)
+        while time.perf_counter() < deadline:
+            orders = [(rng.choice(dishes), rng.randint(1, 3)) for _ in range(batch)]
+            try:
+                if url:
+                    post_http(url, orders)
+                else:
+                    post_orders(orders)
+                with lock:
+                    posted += batch
+            except Exception:
+                with lock:
+                    errors += 1
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(client, range(clients)))
+    return posted, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--batch", type=int, default=1, help="Orders per call")
+    parser.add_argument("--restock", type=int, help="Set every ingredient to this quantity first")
+    parser.add_argument("--url", help="Post to a running API's /add_orders instead of calling post_orders")
+    args = parser.parse_args()
+
+    if args.restock:
+        restock(args.restock)
+    dishes = [row["dish_name"] for row in recipe_store.menu()]
+
+    print(f"{'clients':>7} {'batch':>5} {'orders':>8} {'errors':>7} {'orders/s':>9}")
+    for clients in args.clients:
+        posted, errors = run(clients, args.seconds, args.batch, dishes, args.url)
+        print(f"{clients:>7} {args.batch:>5} {posted:>8} {errors:>7} {posted / args.seconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Request throughput at N concurrent clients.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Pool_Benchmark --clients 1 4 8 16 32 --seconds 10
+    python -m Benchmarks.Pool_Benchmark --url http://localhost:8000/get_inventory_item
+
+Without --url the read functions from SQL_Action are called from a thread pool,
+the same way mainAPI runs them through asyncio.to_thread. The "shared" mode
+reproduces the old single global cursor (one connection behind a lock) so the
+two can be compared side by side.
+"""
+import argparse
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import Connect_MySQL
+from Connect_MySQL import pool
+from SQL_Action import Get_Menu, get_inventory, get_Prediction, get_Weekly_sales
+
+WORKLOAD = [Get_Menu, get_inventory, get_Prediction, get_Weekly_sales]
+
+
+class SharedConnectionPool:
+    """Stand-in for the old module level `db`/`cursor`: one connection, one at a time."""
+
+    def __init__(self, real_pool):
+        self._real_pool = real_pool
+        self._conn = real_pool.acquire()
+        self._lock = threading.Lock()
+
+    def connection(self):
+        pool_self = self
+
+        class _Checkout:
+            def __enter__(self):
+                pool_self._lock.acquire()
+                return pool_self._conn
+
+            def __exit__(self, *exc):
+                if pool_self._conn.in_transaction:
+                    pool_self._conn.rollback()
+                pool_self._lock.release()
+
+        return _Checkout()
+
+    def close(self):
+        self._real_pool.release(self._conn)
+
+
+def run_in_process(clients, seconds):
+    done = 0
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(worker_id):
+        nonlocal done, errors
+        i = worker_id
+        while time.perf_counter() < deadline:
+            try:
+                WORKLOAD[i % len(WORKLOAD)]()
+                with lock:
+                    done += 1
+            except Exception:
+                with lock:
+                    errors += 1
+            i += 1
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(client, range(clients)))
+    return done, errors
+
+
+def run_http(url, clients, seconds):
+    done = 0
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(_):
+        nonlocal done, errors
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                with lock:
+                    done += 1
+            except Exception:
+                with lock:
+                    errors += 1
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(client, range(clients)))
+    return done, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--url", help="Benchmark a running API endpoint instead of calling SQL_Action directly")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'clients':>7} {'requests':>9} {'errors':>7} {'req/s':>9}")
+    for clients in args.clients:
+        if args.url:
+            done, errors = run_http(args.url, clients, args.seconds)
+            print(f"{'http':<8} {clients:>7} {done:>9} {errors:>7} {done / args.seconds:>9.1f}")
+            continue
+
+        shared = SharedConnectionPool(pool)
+        Connect_MySQL.pool = shared
+        try:
+            done, errors = run_in_process(clients, args.seconds)
+        finally:
+            Connect_MySQL.pool = pool
+            shared.close()
+        print(f"{'shared':<8} {clients:>7} {done:>9} {errors:>7} {done / args.seconds:>9.1f}")
+
+        done, errors = run_in_process(clients, args.seconds)
+        print(f"{'pooled':<8} {clients:>7} {done:>9} {errors:>7} {done / args.seconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Recommendation latency with thousands of dishes, indexed vs full scan.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Recommendation_Benchmark --dishes 5000 --ingredients 400 --runs 200
+
+Runs in-process on a synthetic menu and inventory (no database). "full
+scan" is the recommendation page's algorithm: score every dish against the
+whole inventory on each request. "engine" is RecommendationEngine.recommend,
+and "apply" is the incremental update for one changed inventory row.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from Benchmarks.Synthetic_Data import generate_menu
+from Recommendation_Engine import RecommendationEngine
+
+
+def full_scan(menu, inventory, selected, top_k, urgent_days=5):
+    urgent = {row["ingredient"].lower() for row in inventory if row["remaining_life"] < urgent_days}
+
+    def score(dish):
+        names = [name.lower() for name in dish["ingredients"]]
+        return 2 * sum(name in selected for name in names) + 3 * sum(name in urgent for name in names)
+
+    return sorted((dish for dish in menu if score(dish) > 0), key=score, reverse=True)[:top_k]
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=5000)
+    parser.add_argument("--ingredients", type=int, default=400)
+    parser.add_argument("--per-dish", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    menu_rows, inventory_rows = generate_menu(args.dishes, args.ingredients, args.per_dish)
+    menu = [
+        {"dish_name": name, "price": price, "ingredients": list(json.loads(recipe)), "category": category, "vegetarian": vegetarian, "img_link": img_link}
+        for name, recipe, price, category, vegetarian, img_link in menu_rows
+    ]
+    inventory = [
+        {"ingredient": row[0], "quantity": row[1], "remaining_life": row[2], "max_life": row[3], "quality": row[4], "last_updated": None}
+        for row in inventory_rows
+    ]
+
+    engine = RecommendationEngine(refresh_interval=float("inf"))
+    engine.rebuild(inventory, menu)
+    rng = random.Random(1)
+    selected = {row["ingredient"].lower() for row in rng.sample(inventory, 3)}
+    urgent = sum(row["remaining_life"] < engine.urgent_days for row in inventory)
+    print(f"{args.dishes} dishes, {args.ingredients} ingredients, {urgent} urgent")
+
+    def change_one():
+        row = rng.choice(inventory)
+        engine.apply([{"ingredient": row["ingredient"], "quantity": row["quantity"], "remaining_life": rng.randint(0, 10), "quality": "Fresh"}])
+
+    for label, picked in (("no filter", set()), ("3 ingredients", selected)):
+        scan = timed(lambda: full_scan(menu, inventory, picked, args.top_k), max(3, args.runs // 20))
+        indexed = timed(lambda: engine.recommend(args.top_k, picked), args.runs)
+        print(f"{label:>14}: full scan {scan:8.2f} ms   engine {indexed:6.2f} ms")
+    print(f"{'apply':>14}: {timed(change_one, args.runs) * 1000:8.1f} us per changed row")
+
+
+if __name__ == "__main__":
+    main()
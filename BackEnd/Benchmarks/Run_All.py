@@ -0,0 +1,196 @@
+"""Benchmark the backend end to end and write the results as JSON.
+
+Run from the BackEnd folder against a scratch MySQL database filled by
+Synthetic_Data (the write cases post orders and replace predictions):
+
+    python -m Benchmarks.Synthetic_Data --dishes 300 --ingredients 200 --years 3
+    python -m Benchmarks.Run_All --runs 10 --images path/to/images
+    python -m Benchmarks.Run_All --compare results/before.json results/after.json
+
+Every SQL_Action read, order posting, the ingredient plans, predict_sales
+and (with --images) detect() are timed. Results go to
+results/<time>_<commit>.json with the dataset size and machine details;
+--compare prints the change per case and exits non-zero if any median got
+slower by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+def measure(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def sql_cases(writes):
+    from Connect_MySQL import get_cursor
+    from Recipe_Store import recipe_store
+    from SQL_Action import (
+        Get_Menu, get_inventory, get_monthly_sales, get_Prediction, get_sales_last_n_months,
+        get_sales_page, get_Weekly_sales, post_orders,
+    )
+
+    def reload_menu():
+        recipe_store.invalidate()
+        Get_Menu()
+
+    cases = {
+        "sql.Get_Menu": Get_Menu,
+        "sql.Get_Menu.reload": reload_menu,
+        "sql.get_Weekly_sales": get_Weekly_sales,
+        "sql.get_Weekly_sales.group_dish": lambda: get_Weekly_sales("dish"),
+        "sql.get_monthly_sales": get_monthly_sales,
+        "sql.get_sales_last_n_months.3": lambda: get_sales_last_n_months(3),
+        "sql.get_sales_last_n_months.12_by_month": lambda: get_sales_last_n_months(12, "month"),
+        "sql.get_sales_page.12_limit_1000": lambda: get_sales_page(12, limit=1000),
+        "sql.get_inventory": get_inventory,
+        "sql.get_Prediction": get_Prediction,
+    }
+    if writes:
+        dishes = [row["dish_name"] for row in Get_Menu()]
+        rng = random.Random(0)
+
+        def restock():
+            with get_cursor(commit=True) as cursor:
+                cursor.execute("UPDATE inventory SET quantity = 1000000;")
+
+        restock()
+        cases["sql.post_orders.1"] = lambda: post_orders([(rng.choice(dishes), 1)])
+        cases["sql.post_orders.10"] = lambda: post_orders([(rng.choice(dishes), 1) for _ in range(10)])
+    return cases
+
+
+def inventory_cases():
+    from Smart_Inventory import get_inventory_predictions, get_tomorrow_predictions
+    from Inventory_Ledger import consumption, stock_at
+
+    return {
+        "inventory.get_tomorrow_predictions": get_tomorrow_predictions,
+        "inventory.get_inventory_predictions.7": lambda: get_inventory_predictions(7),
+        "inventory.stock_at.yesterday": lambda: stock_at(datetime.now() - timedelta(days=1)),
+        "inventory.consumption.7": lambda: consumption(datetime.now() - timedelta(days=7)),
+    }
+
+
+def dataset_size():
+    from Connect_MySQL import get_cursor
+
+    sizes = {}
+    with get_cursor() as cursor:
+        for table in ("menu", "inventory", "sales_data", "sales_predictions", "orders"):
+            cursor.execute(f"SELECT COUNT(*) FROM {table};")
+            sizes[table] = cursor.fetchone()[0]
+    return sizes
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    results = {}
+
+    def record(name, fn, runs):
+        fn()  # Warm caches and connections outside the timings
+        results[name] = measure(fn, runs)
+        print(f"{name:<44} {results[name]['median_ms']:10.2f} ms  p95 {results[name]['p95_ms']:10.2f} ms")
+
+    for name, fn in sql_cases(not args.no_writes).items():
+        record(name, fn, args.runs)
+    for name, fn in inventory_cases().items():
+        record(name, fn, args.runs)
+
+    if not args.no_writes:
+        from Sale_prediction import predict_sales
+
+        record("forecast.predict_sales.fast", lambda: predict_sales("fast"), max(1, args.runs // 5))
+        if args.prophet:
+            record("forecast.predict_sales.prophet_full", lambda: predict_sales("prophet", full=True), 1)
+            record("forecast.predict_sales.prophet_incremental", lambda: predict_sales("prophet"), 1)
+
+    if args.images:
+        import glob
+        import itertools
+        from Yolo_Prediction import detect
+
+        images = sorted(glob.glob(os.path.join(args.images, "*.*")))
+        if not images:
+            raise SystemExit(f"No images found in {args.images}")
+        cycle = itertools.cycle(images)
+        record("vision.detect", lambda: detect(next(cycle)), args.runs)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "dataset": dataset_size(),
+        "results": results,
+    }
+
+
+def compare(before_path, after_path, threshold):
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    print(f"{before['commit']} -> {after['commit']}")
+    regressions = 0
+    for name in sorted(set(before["results"]) | set(after["results"])):
+        old = before["results"].get(name, {}).get("median_ms")
+        new = after["results"].get(name, {}).get("median_ms")
+        if old is None or new is None:
+            print(f"{name:<44} {'only in ' + ('after' if old is None else 'before'):>30}")
+            continue
+        ratio = new / old if old else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"{name:<44} {old:10.2f} -> {new:10.2f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--images", help="folder of till photos for the detect() case")
+    parser.add_argument("--prophet", action="store_true", help="also time the Prophet forecast (slow)")
+    parser.add_argument("--no-writes", action="store_true", help="skip cases that change the database")
+    parser.add_argument("--out", default="results")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    report = run(args)
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{datetime.now():%Y%m%d-%H%M%S}_{report['commit']}.json")
+    with open(path, "w") as out:
+        json.dump(report, out, indent=2)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
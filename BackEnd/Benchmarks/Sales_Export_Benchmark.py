@@ -0,0 +1,90 @@
+"""TTFB, total time, payload size and server memory for /Get_Sales_Last_N_Months.
+
+Start the API first, then run from the BackEnd folder:
+
+    python -m Benchmarks.Sales_Export_Benchmark --url http://localhost:8000 --pid <uvicorn pid>
+
+For 1, 12 and 60 months it requests every response format and reports time
+to first byte, total time, bytes received and the server's peak RSS growth
+while the request ran (sampled from /proc/<pid>/status, Linux only).
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+FORMATS = [
+    ("json", ""),
+    ("json, paged 5000", "?limit=5000"),
+    ("columnar", "?format=columnar"),
+    ("ndjson stream", "?format=ndjson"),
+]
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid, interval=0.01):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.baseline = rss_kb(pid) if pid else 0
+        self.peak = self.baseline
+        self._stop = threading.Event()
+
+    def run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_kb(self.pid))
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self.join()
+
+
+def request(url, months, query):
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=300)
+    body = json.dumps({"Month": months})
+    start = time.perf_counter()
+    conn.request("POST", f"/Get_Sales_Last_N_Months{query}", body, {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    first = response.read(1)
+    ttfb = time.perf_counter() - start
+    size = len(first) + len(response.read())
+    total = time.perf_counter() - start
+    conn.close()
+    return ttfb, total, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pid", type=int, help="uvicorn worker pid, to sample server RSS")
+    parser.add_argument("--months", type=int, nargs="+", default=[1, 12, 60])
+    args = parser.parse_args()
+
+    print(f"{'months':>6} {'format':<18} {'TTFB ms':>9} {'total ms':>9} {'KB':>9} {'peak RSS +MB':>13}")
+    for months in args.months:
+        for label, query in FORMATS:
+            sampler = RssSampler(args.pid) if args.pid else None
+            if sampler:
+                sampler.start()
+            ttfb, total, size = request(args.url, months, query)
+            growth = ""
+            if sampler:
+                sampler.stop()
+                growth = f"{(sampler.peak - sampler.baseline) / 1024:.1f}"
+            print(f"{months:>6} {label:<18} {ttfb * 1000:>9.1f} {total * 1000:>9.1f} {size / 1024:>9.1f} {growth:>13}")
+
+
+if __name__ == "__main__":
+    main()
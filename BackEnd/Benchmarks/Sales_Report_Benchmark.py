@@ -0,0 +1,68 @@
+"""Latency of the sales reporting reads: raw sales_data scans vs. rollups.
+
+Run from the BackEnd folder after loading synthetic data, e.g.
+
+    python -m Benchmarks.Synthetic_Data --dishes 300 --years 3
+    python -m Benchmarks.Sales_Report_Benchmark --runs 20
+
+"raw" runs the queries the endpoints used before the rollups; the others call
+the current SQL_Action functions with and without server-side grouping.
+"""
+import argparse
+import statistics
+import time
+
+from Connect_MySQL import get_cursor
+from SQL_Action import get_monthly_sales, get_sales_last_n_months, get_Weekly_sales
+
+RAW_QUERIES = {
+    "weekly": """
+    SELECT date, dish_name, sales FROM sales_data
+    WHERE date >= CURDATE() - INTERVAL 7 DAY;
+    """,
+    "monthly": """
+    SELECT date, dish_name, sales FROM sales_data
+    WHERE MONTH(date) = MONTH(CURDATE()) AND YEAR(date) = YEAR(CURDATE());
+    """,
+    "last 12 months": """
+    SELECT date, dish_name, sales FROM sales_data
+    WHERE date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH);
+    """,
+}
+
+
+def raw(query):
+    with get_cursor() as cursor:
+        cursor.execute(query)
+        return cursor.fetchall()
+
+
+def measure(label, fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    print(f"{label:<36} {statistics.median(samples) * 1000:9.2f} ms  rows={len(result)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'read':<36} {'median':>12}")
+    for label, query in RAW_QUERIES.items():
+        measure(f"raw {label}", lambda query=query: raw(query), args.runs)
+
+    measure("rollup weekly", get_Weekly_sales, args.runs)
+    measure("rollup weekly, group=dish", lambda: get_Weekly_sales("dish"), args.runs)
+    measure("rollup monthly", get_monthly_sales, args.runs)
+    measure("rollup monthly, group=dish", lambda: get_monthly_sales("dish"), args.runs)
+    measure("rollup last 12 months", lambda: get_sales_last_n_months(12), args.runs)
+    measure("rollup last 12 months, group=month", lambda: get_sales_last_n_months(12, "month"), args.runs)
+    measure("rollup last 36 months, group=week", lambda: get_sales_last_n_months(36, "week"), args.runs)
+
+
+if __name__ == "__main__":
+    main()
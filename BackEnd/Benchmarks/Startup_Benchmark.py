@@ -0,0 +1,95 @@
+"""Import time and memory of a read-only API worker vs. a full one.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Startup_Benchmark --runs 5
+
+Each run starts a fresh interpreter that imports mainAPI and then loads the
+subsystems named in WarmSubsystems synchronously, i.e. what a worker has
+paid by the time /ready turns green. "read-only" warms nothing (menu, sales
+and inventory reads only); "full" warms vision and planning, which is what
+every worker paid at import before the vision and planning stacks became
+lazy. Memory is the resident set at the end (Linux only).
+
+A subsystem that fails to load (e.g. torch not installed) is reported as
+such and its cost is whatever it got through before failing.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+WORKERS = {
+    "read-only": "",
+    "planning": "planning",
+    "full": "vision,planning",
+}
+
+HEAVY = ("numpy", "scipy", "pandas", "cv2", "torch", "ultralytics", "keras", "prophet")
+
+
+def rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child():
+    # Runs in the fresh interpreter
+    start = time.perf_counter()
+    import mainAPI  # noqa: F401
+    from Subsystems import SUBSYSTEMS, WARM_SUBSYSTEMS
+    imported = time.perf_counter()
+
+    failed = []
+    for name in WARM_SUBSYSTEMS:
+        try:
+            SUBSYSTEMS[name].load()
+        except Exception as err:
+            failed.append(f"{name}: {err}")
+    print(json.dumps({
+        "import": imported - start,
+        "ready": time.perf_counter() - start,
+        "rss": rss_mb(),
+        "heavy": [module for module in HEAVY if module in sys.modules],
+        "failed": failed,
+    }))
+
+
+def measure(warm, runs):
+    env = dict(os.environ, WarmSubsystems=warm, JobScheduler="0")
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "Benchmarks.Startup_Benchmark", "--child"],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    print(f"{'worker':>10} {'import':>9} {'ready':>9} {'RSS':>9}  heavy modules loaded")
+    for label, warm in WORKERS.items():
+        samples = measure(warm, args.runs)
+        median = {key: statistics.median(sample[key] for sample in samples) for key in ("import", "ready", "rss")}
+        print(f"{label:>10} {median['import']:7.2f} s {median['ready']:7.2f} s {median['rss']:6.0f} MB  {', '.join(samples[-1]['heavy']) or '-'}")
+        for failure in samples[-1]["failed"]:
+            print(f"{'':>10} failed to load {failure}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Synthetic restaurant data at configurable scale.
+
+Run from the BackEnd folder against a scratch database (SQLDatabase in .env);
+it replaces the contents of menu, inventory, sales_data and
+sales_predictions with data shaped like petpooja_dump.sql:
+
+    python -m Benchmarks.Synthetic_Data --dishes 300 --ingredients 200 --years 3
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from Connect_MySQL import get_cursor
+
+CHUNK = 5000
+
+CATEGORIES = ["Main Course", "Starter", "Dessert", "Beverage", "Soup"]
+INGREDIENT_CATEGORIES = ["Vegetables", "Fruits", "Meat", "Dairy", "Spices & Condiments"]
+QUALITIES = ["Fresh", "Bad", "Rotten"]
+
+
+def dish_names(dishes):
+    return [f"Dish {i:04d}" for i in range(dishes)]
+
+
+def generate_menu(dishes, ingredients, per_dish=5, seed=0):
+    """Menu rows (dish_name, ingredients JSON, price, category, vegetarian, img_link)
+    and inventory rows (ingredient, quantity, remaining_life, max_life, quality, price, category, img_link)."""
+    rng = random.Random(seed)
+    ingredient_names = [f"Ingredient {i:04d}" for i in range(ingredients)]
+
+    menu = []
+    for name in dish_names(dishes):
+        recipe = {ingredient: rng.randint(1, 3) for ingredient in rng.sample(ingredient_names, min(per_dish, ingredients))}
+        menu.append((name, json.dumps(recipe), rng.randint(80, 450), rng.choice(CATEGORIES), rng.randint(0, 1), None))
+
+    inventory = []
+    for name in ingredient_names:
+        max_life = rng.choice([7, 10, 14, 30, 365])
+        inventory.append((
+            name, rng.randint(0, 500), rng.randint(0, max_life), max_life, rng.choice(QUALITIES),
+            rng.randint(5, 150), rng.choice(INGREDIENT_CATEGORIES), None,
+        ))
+    return menu, inventory
+
+
+def load_menu(menu, inventory):
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("DELETE FROM menu;")
+        cursor.executemany("""
+        INSERT INTO menu (dish_name, ingredients, price, category, vegetarian, img_link)
+        VALUES (%s, %s, %s, %s, %s, %s);
+        """, menu)
+        cursor.execute("DELETE FROM inventory;")
+        cursor.executemany("""
+        INSERT INTO inventory (ingredient, quantity, remaining_life, max_life, quality, price, category, img_link)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
+        """, inventory)
+
+
+def generate_predictions(dishes, days=10, seed=0):
+    """sales_predictions rows (date, dish_name, predicted_sales) from tomorrow on."""
+    rng = random.Random(seed)
+    tomorrow = date.today() + timedelta(days=1)
+    return [
+        (tomorrow + timedelta(days=offset), name, round(rng.uniform(5, 60), 2))
+        for offset in range(days)
+        for name in dish_names(dishes)
+    ]
+
+
+def load_predictions(rows):
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("DELETE FROM sales_predictions;")
+        cursor.executemany("""
+        INSERT INTO sales_predictions (date, dish_name, predicted_sales) VALUES (%s, %s, %s);
+        """, rows)
+
+
+
+def generate_ledger(events, ingredients, days, end=None, seed=0):
+    """Yield inventory_ledger rows (at, ingredient, delta, kind) in time order:
+    an opening count per ingredient, then orders, daily intakes and some waste."""
+    rng = random.Random(seed)
+    end = end or datetime.now().replace(microsecond=0)
+    start = end - timedelta(days=days)
+    names = [f"Ingredient {i:04d}" for i in range(ingredients)]
+    for name in names:
+        yield start, name, 500, "correction"
+    step = (end - start) / max(events, 1)
+    for i in range(events):
+        at = start + step * i
+        roll = rng.random()
+        if roll < 0.9:
+            yield at, rng.choice(names), -rng.randint(1, 3), "order"
+        elif roll < 0.98:
+            yield at, rng.choice(names), rng.randint(20, 60), "intake"
+        else:
+            yield at, rng.choice(names), -rng.randint(1, 10), "waste"
+
+
+def load_ledger(rows):
+    """Replace the inventory ledger and its snapshots with `rows`. Returns the row count."""
+    total = 0
+    with get_cursor(commit=True) as cursor:
+        for table in ("inventory_snapshots", "inventory_snapshot_index", "inventory_ledger"):
+            cursor.execute(f"DELETE FROM {table};")
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == CHUNK:
+                cursor.executemany("INSERT INTO inventory_ledger (at, ingredient, delta, kind) VALUES (%s, %s, %s, %s);", chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            cursor.executemany("INSERT INTO inventory_ledger (at, ingredient, delta, kind) VALUES (%s, %s, %s, %s);", chunk)
+            total += len(chunk)
+    return total
+
+def generate_sales(dishes, years, end=None, seed=0):
+    """Yield sales_data rows (date, day, month, is_weekend, is_holiday, dish_name, sales)."""
+    rng = random.Random(seed)
+    end = end or date.today() - timedelta(days=1)
+    start = end - timedelta(days=int(365 * years) - 1)
+    names = dish_names(dishes)
+    base = [rng.randint(10, 60) for _ in names]
+
+    day = start
+    while day <= end:
+        weekday = day.weekday() + 1  # Monday=1, Sunday=7
+        is_weekend = 1 if weekday in (6, 7) else 0
+        is_holiday = 1 if rng.random() < 0.02 else 0
+        lift = 1.4 if is_weekend else 1.0
+        for name, mean in zip(names, base):
+            sales = max(0, int(rng.gauss(mean * lift, mean * 0.2)))
+            yield (day, weekday, day.month, is_weekend, is_holiday, name, sales)
+        day += timedelta(days=1)
+
+
+def load_sales(rows):
+    """Replace sales_data with `rows`, in chunks. Returns the row count."""
+    total = 0
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("DELETE FROM sales_data;")
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == CHUNK:
+                cursor.executemany("""
+                INSERT INTO sales_data (date, day, month, is_weekend, is_holiday, dish_name, sales)
+                VALUES (%s, %s, %s, %s, %s, %s, %s);
+                """, chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            cursor.executemany("""
+            INSERT INTO sales_data (date, day, month, is_weekend, is_holiday, dish_name, sales)
+            VALUES (%s, %s, %s, %s, %s, %s, %s);
+            """, chunk)
+            total += len(chunk)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=300)
+    parser.add_argument("--ingredients", type=int, default=200)
+    parser.add_argument("--per-dish", type=int, default=5)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from Schema import ensure_schema
+    from Sales_Rollups import rebuild_sales_rollups
+
+    ensure_schema()
+    menu, inventory = generate_menu(args.dishes, args.ingredients, args.per_dish, args.seed)
+    load_menu(menu, inventory)
+    load_predictions(generate_predictions(args.dishes, seed=args.seed))
+    print(f"Loaded {len(menu)} dishes, {len(inventory)} ingredients and 10 days of predictions")
+
+    start = time.perf_counter()
+    total = load_sales(generate_sales(args.dishes, args.years, seed=args.seed))
+    print(f"Loaded {total} sales_data rows in {time.perf_counter() - start:.1f}s")
+    rebuild_sales_rollups()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Per-upload latency and peak memory: save-to-disk vs. in-memory decode.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Upload_Benchmark --runs 20
+    python -m Benchmarks.Upload_Benchmark path/to/phone/photos --runs 20 --detect
+
+Without a folder a synthetic 12-MP (4000x3000) JPEG is used. "disk" is the
+old path: copy the upload into uploads/, then read it back at full size and
+shrink it to the model input the way YOLO's letterbox does. "memory" is
+Image_Input.decode_image on the uploaded bytes. With --detect the detector
+runs on the result too (needs the weights in Models/).
+
+Each mode runs in a fresh process so the reported peak RSS is its own (Linux only).
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+
+def synthetic_photo(width=4000, height=3000):
+    # Smooth shapes plus sensor-like noise, so the JPEG is about phone-sized
+    rng = np.random.default_rng(0)
+    image = cv2.resize(rng.integers(0, 255, (30, 40, 3), dtype=np.uint8), (width, height), interpolation=cv2.INTER_CUBIC)
+    image = cv2.add(image, rng.integers(0, 24, image.shape, dtype=np.uint8))
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def reset_peak_rss():
+    # ru_maxrss survives fork+exec, so the parent's peak would hide ours; Linux can reset it
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def rss_mb(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def disk(data, upload_dir, index):
+    path = os.path.join(upload_dir, f"upload_{index}.jpg")
+    with open(path, "wb") as buffer:
+        buffer.write(data)
+    image = cv2.imread(path)
+    scale = 640 / max(image.shape[:2])
+    resized = cv2.resize(image, (round(image.shape[1] * scale), round(image.shape[0] * scale)), interpolation=cv2.INTER_LINEAR)
+    return path, resized
+
+
+def memory(data, upload_dir, index):
+    from Image_Input import decode_image
+
+    image = decode_image(data)
+    return image, image
+
+
+def run_mode(mode, payloads, runs, detect, queue):
+    run = {"disk": disk, "memory": memory}[mode]
+    detector = None
+    if detect:
+        from Yolo_Prediction import run_detection
+        detector = run_detection
+        run_detection([np.zeros((640, 640, 3), dtype=np.uint8)])  # Warm up outside the timings
+
+    upload_dir = tempfile.mkdtemp()
+    reset_peak_rss()
+    baseline = rss_mb("VmRSS")
+    samples = []
+    for i in range(runs):
+        data = payloads[i % len(payloads)]
+        start = time.perf_counter()
+        source, _ = run(data, upload_dir, i)
+        if detector:
+            detector([source])
+        samples.append(time.perf_counter() - start)
+    queue.put((samples, rss_mb("VmHWM") - baseline))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="?", help="Folder of test photos")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--detect", action="store_true")
+    args = parser.parse_args()
+
+    if args.images:
+        paths = sorted(glob.glob(os.path.join(args.images, "*.*")))
+        payloads = [open(path, "rb").read() for path in paths]
+    else:
+        payloads = [synthetic_photo()]
+    print(f"images={len(payloads)} avg size={statistics.mean(map(len, payloads)) / 1e6:.1f} MB runs={args.runs} detect={args.detect}")
+
+    context = multiprocessing.get_context("spawn")
+    for mode in ("disk", "memory"):
+        queue = context.Queue()
+        process = context.Process(target=run_mode, args=(mode, payloads, args.runs, args.detect, queue))
+        process.start()
+        samples, peak_mb = queue.get()
+        process.join()
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"{mode:<8} p50 {statistics.median(samples) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms   peak RSS +{peak_mb:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Cold-start and per-request detection latency, before and after the model registry.
+
+Run from the BackEnd folder:
+
+    python -m Benchmarks.Yolo_Benchmark path/to/images --runs 20
+
+"before" rebuilds YOLO("./Models/M_Till_best.pt") for every image, which is
+what detect() used to do. "after" borrows a warmed-up instance from
+Model_Registry. Only inference is timed; the inventory update is left out so
+no database is needed.
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from ultralytics import YOLO
+
+from Model_Registry import MODELS, ModelRegistry, device
+
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<28} mean {statistics.mean(samples) * 1000:8.1f} ms   "
+          f"p50 {statistics.median(samples) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Folder of test images")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--weights", default=MODELS["till"])
+    args = parser.parse_args()
+
+    images = sorted(glob.glob(os.path.join(args.images, "*.*")))
+    if not images:
+        raise SystemExit(f"No images found in {args.images}")
+    print(f"device={device} images={len(images)} runs={args.runs}")
+
+    # Before: every request loads the weights itself
+    before = []
+    for i in range(args.runs):
+        start = time.perf_counter()
+        model = YOLO(args.weights)
+        model(images[i % len(images)], device=device, verbose=False)
+        before.append(time.perf_counter() - start)
+
+    # After: one cold start, then warm checkouts
+    registry = ModelRegistry(max_instances=1)
+    start = time.perf_counter()
+    registry.load("till", args.weights)
+    cold_start = time.perf_counter() - start
+
+    after = []
+    for i in range(args.runs):
+        start = time.perf_counter()
+        with registry.model("till") as model:
+            model(images[i % len(images)], device=device, verbose=False)
+        after.append(time.perf_counter() - start)
+
+    print(f"{'registry cold start (load+warmup)':<28} {cold_start * 1000:8.1f} ms")
+    summarize("per request, before", before)
+    summarize("per request, after", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Benchmarks are run from the BackEnd folder, e.g. `python -m Benchmarks.Pool_Benchmark`
@@ -0,0 +1,276 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+import cv2
+from ultralytics import YOLO
+
+from Model_Registry import device, resolve
+from Yolo_Prediction import update_inventory_from_counts
+
+
+class CameraIngest:
+    """Counts items passing a camera into `inventory`.
+
+    A reader thread pulls frames from `source` (a video file, RTSP URL or
+    device index) and keeps only frames that differ from the last kept one
+    by more than `diff_threshold` (mean absolute difference of a 64x36
+    grayscale thumbnail), plus one every `max_gap` seconds. Kept frames go
+    through a bounded queue to the detector thread. For live sources a full
+    queue drops the new frame so detection stays current; files block
+    instead, so nothing is skipped.
+
+    The detector runs `model.track()` on its own YOLO instance, because
+    tracker state lives on the predictor. Each track id is counted once,
+    after it has been seen in `min_hits` frames, so a tomato that stays in
+    view is one tomato. New counts are written every `flush_interval`
+    seconds through update_inventory_from_counts. If detection fails the
+    error is kept in `error` and the reader stops too.
+    """
+
+    def __init__(self, source, diff_threshold=6.0, max_gap=2.0, max_fps=10.0, queue_size=4,
+                 min_hits=3, flush_interval=10.0, image_size=640, tracker="bytetrack.yaml",
+                 realtime=None, dry_run=False):
+        self.source = int(source) if str(source).isdigit() else source
+        self.diff_threshold = diff_threshold
+        self.max_gap = max_gap
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.min_hits = min_hits
+        self.flush_interval = flush_interval
+        self.image_size = image_size
+        self.tracker = tracker
+        self.is_file = isinstance(self.source, str) and os.path.isfile(self.source)
+        # Files are played back at their own frame rate unless told otherwise
+        self.realtime = not self.is_file if realtime is None else realtime
+        self.dry_run = dry_run
+
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._tracks = {}  # track id -> [label, hits, counted, last detection index]
+        self._pending = Counter()
+        self.stats = Counter()
+        self.counted = Counter()
+        self.started_at = None
+        self.source_fps = None
+        self.error = None
+
+    # Lifecycle
+
+    def start(self):
+        self.model = YOLO(resolve("till"))
+        self.started_at = time.time()
+        self._threads = [
+            threading.Thread(target=self._read, daemon=True),
+            threading.Thread(target=self._detect, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self.flush()
+
+    def wait(self):
+        """Block until a file source has been fully processed."""
+        for thread in self._threads:
+            thread.join()
+        self.flush()
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    # Reading and sampling
+
+    def _read(self):
+        capture = cv2.VideoCapture(self.source)
+        try:
+            if not capture.isOpened():
+                self.error = f"Could not open {self.source}"
+                return
+            self.source_fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+            previous = None
+            last_kept = float("-inf")
+            playback_start = time.monotonic()
+            while not self._stop.is_set():
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                self.stats["frames_read"] += 1
+                if self.realtime and self.is_file:
+                    # Pace a recording like the live camera it stands in for
+                    due = playback_start + self.stats["frames_read"] / self.source_fps
+                    time.sleep(max(0.0, due - time.monotonic()))
+
+                # Sampling runs on video time for files, wall time for live feeds
+                now = self.stats["frames_read"] / self.source_fps if self.is_file else time.monotonic()
+                if now - last_kept < self.min_interval:
+                    self.stats["skipped_rate"] += 1
+                    continue
+                thumbnail = cv2.cvtColor(cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+                if previous is not None and now - last_kept < self.max_gap \
+                        and cv2.absdiff(thumbnail, previous).mean() < self.diff_threshold:
+                    self.stats["skipped_similar"] += 1
+                    continue
+
+                if self.realtime:
+                    try:
+                        self._frames.put_nowait(frame)
+                    except queue.Full:
+                        self.stats["dropped_busy"] += 1  # Detector is behind; keep up with the feed
+                        continue
+                elif not self._put(frame):
+                    break  # Stopped, or the detector died
+                previous = thumbnail
+                last_kept = now
+        finally:
+            capture.release()
+            try:
+                self._frames.put_nowait(None)
+            except queue.Full:
+                pass  # The detector also checks the stop flag
+
+    def _put(self, frame):
+        # Blocking put that gives up once the ingest is stopping
+        while not self._stop.is_set():
+            try:
+                self._frames.put(frame, timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # Detection, tracking and counting
+
+    def _detect(self):
+        try:
+            self._detect_frames()
+        except Exception as err:
+            self.error = f"Detection failed: {err!r}"
+            print(f"Camera {self.source}: {self.error}")
+            self._stop.set()
+
+    def _detect_frames(self):
+        last_flush = time.monotonic()
+        index = 0
+        while True:
+            try:
+                frame = self._frames.get(timeout=1.0)
+            except queue.Empty:
+                reader = self._threads[0]
+                if self._stop.is_set() and not reader.is_alive():
+                    break  # Reader gone without its end marker
+                frame = False
+            if frame is None:
+                break
+            if frame is not False:
+                start = time.perf_counter()
+                result = self.model.track(frame, persist=True, tracker=self.tracker, imgsz=self.image_size,
+                                          device=device, verbose=False)[0]
+                self.stats["detect_ms"] += round((time.perf_counter() - start) * 1000)
+                self.stats["frames_detected"] += 1
+                index += 1
+                self._count(result, index)
+
+            if time.monotonic() - last_flush >= self.flush_interval:
+                try:
+                    self.flush()
+                except Exception as err:
+                    print(f"Camera flush failed, will retry: {err}")
+                last_flush = time.monotonic()
+
+    def _count(self, result, index):
+        if result.boxes.id is None:
+            return
+        ids = result.boxes.id.int().tolist()
+        classes = result.boxes.cls.int().tolist()
+        with self._lock:
+            for track_id, cls in zip(ids, classes):
+                track = self._tracks.setdefault(track_id, [result.names[cls], 0, False, index])
+                track[1] += 1
+                track[3] = index
+                if not track[2] and track[1] >= self.min_hits:
+                    track[2] = True
+                    self._pending[track[0]] += 1
+            # Forget tracks the tracker has long since dropped
+            for track_id in [key for key, track in self._tracks.items() if index - track[3] > 300]:
+                del self._tracks[track_id]
+
+    def flush(self):
+        with self._lock:
+            pending = dict(self._pending)
+            self._pending.clear()
+        if not pending:
+            return
+        if not self.dry_run:
+            try:
+                update_inventory_from_counts(pending)
+            except Exception:
+                with self._lock:
+                    self._pending.update(pending)  # Keep them for the next flush
+                raise
+        self.counted.update(pending)
+
+    def status(self):
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        detected = self.stats["frames_detected"]
+        with self._lock:
+            pending = dict(self._pending)
+            active_tracks = len(self._tracks)
+        return {
+            "source": str(self.source),
+            "running": self.running,
+            "error": self.error,
+            "source_fps": self.source_fps,
+            "frames": {key: value for key, value in self.stats.items() if key != "detect_ms"},
+            "detect_ms_avg": round(self.stats["detect_ms"] / detected, 1) if detected else None,
+            "detect_fps": round(detected / elapsed, 2) if elapsed else None,
+            "read_fps": round(self.stats["frames_read"] / elapsed, 2) if elapsed else None,
+            "queue": self._frames.qsize(),
+            "tracks": active_tracks,
+            "pending": pending,
+            "counted": dict(self.counted),
+        }
+
+
+def camera_source(source):
+    """What to open for `source`: a camera named in CameraSources, or a file in CameraRecordingsDir.
+
+    Anything else raises ValueError, so API callers can't make cv2 open
+    arbitrary files, devices or URLs.
+    """
+    if source in CAMERA_SOURCES:
+        return CAMERA_SOURCES[source]
+    if CAMERA_RECORDINGS_DIR:
+        root = os.path.realpath(CAMERA_RECORDINGS_DIR)
+        path = os.path.realpath(os.path.join(root, source))
+        if os.path.commonpath([root, path]) == root and os.path.isfile(path):
+            return path
+    raise ValueError(f"Unknown camera source '{source}'. Use a name from CameraSources or a recording in CameraRecordingsDir.")
+
+
+def from_env(source, **overrides):
+    """CameraIngest with the Camera* settings from .env, overridden per call."""
+    settings = {
+        "diff_threshold": float(os.getenv("CameraDiffThreshold", 6.0)),
+        "max_gap": float(os.getenv("CameraMaxGap", 2.0)),
+        "max_fps": float(os.getenv("CameraMaxFps", 10.0)),
+        "queue_size": int(os.getenv("CameraQueue", 4)),
+        "min_hits": int(os.getenv("CameraMinHits", 3)),
+        "flush_interval": float(os.getenv("CameraFlushInterval", 10.0)),
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return CameraIngest(source, **settings)
+
+
+# name=RTSP URL or device index, comma separated, e.g. till=rtsp://10.0.0.5/stream,back=0
+CAMERA_SOURCES = dict(
+    entry.strip().split("=", 1) for entry in os.getenv("CameraSources", "").split(",") if "=" in entry
+)
+CAMERA_RECORDINGS_DIR = os.getenv("CameraRecordingsDir") or None
@@ -1,16 +1,176 @@
 import mysql.connector
 import os
 import dotenv
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from Metrics import Gauge, TimedCursor, sql_checkout_seconds
 
 dotenv.load_dotenv()
 
 
-db = mysql.connector.connect(
+class ConnectionPool:
+    """Small thread-safe pool of MySQL connections.
+
+    Connections are opened lazily up to `size`, checked out for the duration of
+    one unit of work and handed back afterwards. A connection that sat idle for
+    longer than `stale_after` seconds is pinged (and reconnected) before reuse.
+    """
+
+    def __init__(self, size=10, stale_after=30, checkout_timeout=10, **connect_args):
+        self.size = size
+        self.stale_after = stale_after
+        self.checkout_timeout = checkout_timeout
+        self.connect_args = connect_args
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def _connect(self):
+        return mysql.connector.connect(**self.connect_args)
+
+    def _is_healthy(self, conn, idle_for):
+        if idle_for < self.stale_after:
+            return True
+        try:
+            conn.ping(reconnect=True, attempts=2, delay=0)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def acquire(self):
+        # Prefer an idle connection, otherwise open a new one while below size
+        try:
+            conn, released_at = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            try:
+                conn, released_at = self._idle.get(timeout=self.checkout_timeout)
+            except queue.Empty:
+                raise mysql.connector.errors.PoolError(
+                    f"No MySQL connection available after {self.checkout_timeout}s (pool size {self.size})"
+                )
+
+        if self._is_healthy(conn, time.monotonic() - released_at):
+            return conn
+
+        # Stale and unrecoverable: replace it with a fresh connection
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error:
+            # Broken connection, drop it so the slot can be reopened
+            with self._lock:
+                self._opened -= 1
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+
+
+pool = ConnectionPool(
+    size=int(os.getenv("SQLPoolSize", 10)),
+    stale_after=int(os.getenv("SQLPoolStaleAfter", 30)),
+    checkout_timeout=int(os.getenv("SQLPoolTimeout", 10)),
     host=os.getenv("SQLHost"),
     user=os.getenv("SQLUser"),
     password=os.getenv("SQLPassword"),
     database=os.getenv("SQLDatabase"),
     connection_timeout=10,
+    # Lets a streaming (unbuffered) cursor be closed before all rows are read
+    consume_results=True,
 )
 
-cursor = db.cursor()
\ No newline at end of file
+Gauge("sql_pool_connections_open", "MySQL connections opened by the pool", function=lambda: pool._opened)
+Gauge("sql_pool_connections_idle", "Pooled MySQL connections waiting to be used", function=lambda: pool._idle.qsize())
+
+
+@contextmanager
+def get_cursor(commit=False, **cursor_args):
+    """Check out a connection and yield a cursor on it.
+
+    With `commit=True` the work is committed when the block exits cleanly and
+    rolled back on error. The connection always goes back to the pool.
+    Statements are timed per query (see Metrics.TimedCursor).
+    """
+    waiting_since = time.perf_counter()
+    with pool.connection() as conn:
+        sql_checkout_seconds.observe(time.perf_counter() - waiting_since)
+        cursor = TimedCursor(conn.cursor(**cursor_args), conn)
+        try:
+            yield cursor
+            if commit:
+                conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except mysql.connector.Error:
+                pass
+            raise
+        finally:
+            cursor.close()
+
+
+@contextmanager
+def named_lock(name, timeout=60):
+    """Hold the MySQL named lock `name` for the block, across every process on the database.
+
+    Used for one-time setup that several API workers may attempt at once.
+    Raises TimeoutError if the lock isn't free within `timeout` seconds.
+    """
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, %s);", (name, timeout))
+            if not cursor.fetchone()[0]:
+                raise TimeoutError(f"Timed out waiting for the '{name}' lock")
+            try:
+                yield
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s);", (name,))
+                cursor.fetchone()
+        finally:
+            cursor.close()
@@ -0,0 +1,192 @@
+import glob
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+# How the till model is run on CPU-only boxes:
+#   torch          the .pt weights through PyTorch (default)
+#   onnx           ONNX Runtime, FP32
+#   onnx-int8      ONNX Runtime, statically quantized with a calibration set
+#   openvino       OpenVINO, FP32
+#   openvino-int8  OpenVINO, quantized by ultralytics/NNCF
+# Exported files are written next to the weights on first use and reused after.
+BACKENDS = ("torch", "onnx", "onnx-int8", "openvino", "openvino-int8")
+
+IMAGE_SIZE = 640
+
+
+def artifact_path(weights, backend):
+    stem, _ = os.path.splitext(weights)
+    return {
+        "torch": weights,
+        "onnx": stem + ".onnx",
+        "onnx-int8": stem + "_int8.onnx",
+        "openvino": stem + "_openvino_model",
+        "openvino-int8": stem + "_int8_openvino_model",
+    }[backend]
+
+
+def letterbox(image, size=IMAGE_SIZE):
+    """Resize keeping aspect ratio and pad to size x size, as YOLO's preprocessing does."""
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    resized = cv2.resize(image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_LINEAR)
+    top = (size - resized.shape[0]) // 2
+    left = (size - resized.shape[1]) // 2
+    return cv2.copyMakeBorder(
+        resized, top, size - resized.shape[0] - top, left, size - resized.shape[1] - left,
+        cv2.BORDER_CONSTANT, value=(114, 114, 114),
+    )
+
+
+def to_input(image, size=IMAGE_SIZE):
+    """BGR image -> 1x3xHxW float32 RGB in [0, 1]."""
+    image = letterbox(image, size)[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(image, dtype=np.float32)[None] / 255.0
+
+
+def calibration_images(folder, limit=200):
+    paths = sorted(glob.glob(os.path.join(folder, "*.*")))[:limit]
+    if not paths:
+        raise ValueError(f"No calibration images found in {folder}")
+    return paths
+
+
+def export_onnx(weights, size=IMAGE_SIZE):
+    from ultralytics import YOLO
+
+    return YOLO(weights).export(format="onnx", imgsz=size, simplify=True)
+
+
+def quantize_onnx(onnx_path, calibration_folder, output_path, size=IMAGE_SIZE):
+    """Post-training static INT8 quantization of an exported model.
+
+    Activation ranges are calibrated on real till photos; weights are
+    quantized per channel (QDQ format, which ONNX Runtime's CPU kernels fuse).
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static,
+    )
+
+    class Reader(CalibrationDataReader):
+        def __init__(self, paths, input_name):
+            self._inputs = iter(paths)
+            self._input_name = input_name
+
+        def get_next(self):
+            for path in self._inputs:
+                image = cv2.imread(path)
+                if image is not None:
+                    return {self._input_name: to_input(image, size)}
+            return None
+
+    model = onnx.load(onnx_path)
+    quantize_static(
+        onnx_path,
+        output_path,
+        Reader(calibration_images(calibration_folder), model.graph.input[0].name),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+
+    # Keep the class names and image size ultralytics stores in the metadata
+    quantized = onnx.load(output_path)
+    existing = {prop.key for prop in quantized.metadata_props}
+    for prop in model.metadata_props:
+        if prop.key not in existing:
+            quantized.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(quantized, output_path)
+    return output_path
+
+
+def export_openvino(weights, int8=False, calibration=None, size=IMAGE_SIZE):
+    from ultralytics import YOLO
+
+    if int8 and not calibration:
+        raise ValueError("openvino-int8 needs DetectorCalibration set to a dataset YAML")
+    kwargs = {"int8": True, "data": calibration} if int8 else {}
+    return YOLO(weights).export(format="openvino", imgsz=size, **kwargs)
+
+
+def prepare(weights, backend="torch", calibration=None, size=IMAGE_SIZE):
+    """Path of `weights` in the given backend's format, exporting it if needed.
+
+    An export older than the weights is redone, so replacing the .pt file is
+    enough to roll the new model out on every backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend '{backend}'. Use {', '.join(BACKENDS)}.")
+    path = artifact_path(weights, backend)
+    if not os.path.exists(weights):
+        if os.path.exists(path):
+            return path  # Deployed with the export only
+        raise FileNotFoundError(f"Neither {weights} nor an export of it for {backend} exists")
+    if path == weights or (os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(weights)):
+        return path
+
+    print(f"Exporting {weights} for {backend}")
+    if backend == "onnx":
+        return export_onnx(weights, size)
+    if backend == "onnx-int8":
+        if not calibration:
+            raise ValueError("onnx-int8 needs DetectorCalibration set to a folder of sample images")
+        return quantize_onnx(prepare(weights, "onnx", size=size), calibration, path, size)
+    exported = export_openvino(weights, backend == "openvino-int8", calibration, size)
+    if os.path.abspath(exported) != os.path.abspath(path):
+        if os.path.isdir(path):
+            shutil.rmtree(path)  # The stale export, os.replace won't overwrite a folder
+        os.replace(exported, path)
+    return path
+
+
+def _runtime_holder(model, attribute):
+    # Newer ultralytics keeps the runtime on AutoBackend.backend, older on AutoBackend itself
+    backend = model.predictor.model
+    for holder in (vars(backend).get("backend"), backend):
+        if holder is not None and attribute in vars(holder):
+            return holder
+    return None
+
+
+def set_threads(model, path, threads):
+    """Apply an intra-op thread count to a loaded, warmed-up YOLO model."""
+    if not threads:
+        return
+    if path.endswith(".onnx"):
+        import onnxruntime
+
+        holder = _runtime_holder(model, "session")
+        if holder is None:
+            print(f"Could not apply {threads} threads to {path}")
+            return
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        holder.session = onnxruntime.InferenceSession(path, options, providers=holder.session.get_providers())
+    elif path.endswith("_openvino_model"):
+        import openvino as ov
+
+        holder = _runtime_holder(model, "ov_compiled_model")
+        if holder is None:
+            print(f"Could not apply {threads} threads to {path}")
+            return
+        core = ov.Core()
+        xml = glob.glob(os.path.join(path, "*.xml"))[0]
+        holder.ov_compiled_model = core.compile_model(
+            core.read_model(xml), "CPU", {"PERFORMANCE_HINT": "LATENCY", "INFERENCE_NUM_THREADS": threads}
+        )
+    else:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+DETECTOR_BACKEND = os.getenv("DetectorBackend", "torch")
+DETECTOR_THREADS = int(os.getenv("DetectorThreads", 0))  # 0 = runtime default
+DETECTOR_CALIBRATION = os.getenv("DetectorCalibration") or None
@@ -0,0 +1,110 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# How much history the fast engine looks at
+HISTORY_WEEKS = 8
+# Recent weeks weigh more in the day-of-week moving average
+WEEK_DECAY = 0.8
+# Smoothing factor for the exponential level
+ALPHA = 0.3
+
+METHODS = ("seasonal_naive", "dow_ma", "ets", "ensemble")
+
+
+def pivot_sales(df):
+    """Turn sales_data rows into a dishes x days matrix.
+
+    Days nobody recorded and holidays (is_holiday = 1) become NaN so they
+    don't drag the weekday baselines around. Returns (dishes, dates, matrix).
+    """
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    table = df.pivot_table(index='dish_name', columns='date', values='sales', aggfunc='sum')
+    dates = pd.date_range(df['date'].min(), df['date'].max(), freq='D')
+    table = table.reindex(columns=dates)
+
+    matrix = table.to_numpy(dtype=float, copy=True)
+    if 'is_holiday' in df:
+        holidays = df.groupby('date')['is_holiday'].max().reindex(dates, fill_value=0).to_numpy()
+        matrix[:, holidays == 1] = np.nan
+    return table.index.to_numpy(), dates, matrix
+
+
+def _weekly_blocks(matrix, weeks):
+    """Last `weeks` * 7 days as a (dishes, weeks, 7) array, left-padded with NaN."""
+    days = weeks * 7
+    if matrix.shape[1] < days:
+        pad = np.full((matrix.shape[0], days - matrix.shape[1]), np.nan)
+        matrix = np.concatenate([pad, matrix], axis=1)
+    return matrix[:, -days:].reshape(matrix.shape[0], weeks, 7)
+
+
+def _nan_weighted_mean(values, weights, axis):
+    present = ~np.isnan(values)
+    total = np.where(present, values, 0.0) * weights
+    norm = present * weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total.sum(axis=axis) / norm.sum(axis=axis)
+
+
+def _nanmean(values, **kwargs):
+    # All-NaN rows (dishes with no usable history) are expected; they end up as 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(values, **kwargs)
+
+
+def forecast_matrix(matrix, horizon, method="ensemble", weeks=HISTORY_WEEKS):
+    """Forecast `horizon` days for every dish at once.
+
+    Column j of the weekly profiles lines up with the weekday of the j-th of
+    the last seven history days, so day h of the horizon uses column
+    (h - 1) % 7.
+    """
+    blocks = _weekly_blocks(matrix, weeks)
+    target_cols = np.arange(horizon) % 7
+
+    # Seasonal naive: the last observed value on the same weekday
+    present = ~np.isnan(blocks)
+    last_seen = weeks - 1 - np.argmax(present[:, ::-1, :], axis=1)
+    naive_profile = np.take_along_axis(blocks, last_seen[:, None, :], axis=1)[:, 0, :]
+
+    # Day-of-week moving average, recent weeks weighted higher
+    week_weights = (WEEK_DECAY ** np.arange(weeks - 1, -1, -1))[None, :, None]
+    dow_profile = _nan_weighted_mean(blocks, week_weights, axis=1)
+
+    # Exponential smoothing on the de-seasonalised series
+    with np.errstate(invalid="ignore", divide="ignore"):
+        seasonal_index = dow_profile / _nanmean(dow_profile, axis=1, keepdims=True)
+    flat = blocks.reshape(blocks.shape[0], -1)
+    deseasonalised = flat / np.tile(seasonal_index, weeks)
+    day_weights = (ALPHA * (1 - ALPHA) ** np.arange(flat.shape[1] - 1, -1, -1))[None, :]
+    level = _nan_weighted_mean(deseasonalised, day_weights, axis=1)
+    ets_profile = level[:, None] * seasonal_index
+
+    profiles = {
+        "seasonal_naive": naive_profile,
+        "dow_ma": dow_profile,
+        "ets": ets_profile,
+    }
+    if method == "ensemble":
+        profile = _nanmean(np.stack(list(profiles.values())), axis=0)
+    else:
+        profile = profiles[method]
+
+    forecast = np.nan_to_num(profile[:, target_cols], nan=0.0)
+    return np.clip(forecast, 0, None)
+
+
+def forecast_sales(df, horizon=10, method="ensemble"):
+    """Rows of (date, dish_name, predicted_sales) for the days after the history."""
+    dishes, dates, matrix = pivot_sales(df)
+    forecast = forecast_matrix(matrix, horizon, method)
+    future = pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=horizon, freq='D').date
+
+    rows = []
+    for i, dish in enumerate(dishes):
+        rows.extend(zip(future, [dish] * horizon, forecast[i].tolist()))
+    return rows
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from Metrics import model_stage_seconds
+
+# MobileNet freshness classifier run on every detected box.
+# Labels are the model's output classes in order; LIFE_FACTOR is how much of
+# an ingredient's max_life is left for each class.
+MODEL_PATH = os.getenv("FreshnessModelPath", "./Models/Freshness_MobileNet.h5")
+LABELS = [label.strip() for label in os.getenv("FreshnessLabels", "Fresh,Bad,Rotten").split(",")]
+LIFE_FACTOR = {"Fresh": 1.0, "Bad": 0.4, "Rotten": 0.0}
+DEFAULT_MAX_LIFE = 7  # What the scanner used to store for every new item
+MAX_BATCH = int(os.getenv("FreshnessMaxBatch", 64))
+
+
+class FreshnessClassifier:
+    """Classifies all crops of a scan in one forward pass.
+
+    Boxes are sliced out of the frame the detector already decoded (numpy
+    views, no copies), resized straight into one preallocated batch and
+    normalised in a single vectorised step. Batches are padded to one of a
+    few fixed sizes (1, 2, 4, 8, then steps of 8) so the model never retraces
+    mid-scan and at most 7 padded crops are computed for nothing. The Keras
+    model is loaded on first use; without a model file the stage is skipped.
+    """
+
+    def __init__(self, path=MODEL_PATH, labels=LABELS, max_batch=MAX_BATCH):
+        self.path = path
+        self.labels = labels
+        self.max_batch = max_batch
+        self._model = None
+        self._size = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return self._model is not None or os.path.exists(self.path)
+
+    def load(self, model=None):
+        with self._lock:
+            if self._model is None:
+                if model is None:
+                    import keras
+                    model = keras.models.load_model(self.path, compile=False)
+                self._model = model
+                self._size = model.input_shape[1]
+                # Build the graph for every batch shape now so no scan pays for it
+                for bucket in self._buckets():
+                    self._model.predict_on_batch(np.zeros((bucket, self._size, self._size, 3), dtype=np.float32))
+        return self._model
+
+    def _buckets(self):
+        bucket = 1
+        while bucket < self.max_batch:
+            yield bucket
+            bucket = bucket * 2 if bucket < 8 else bucket + 8
+        yield self.max_batch
+
+    def _bucket(self, count):
+        return next(bucket for bucket in self._buckets() if bucket >= count)
+
+    def crops(self, results):
+        """(label, crop view) for every box in a list of ultralytics results."""
+        crops = []
+        for result in results:
+            frame = result.orig_img
+            height, width = frame.shape[:2]
+            boxes = result.boxes.xyxy.cpu().numpy().astype(int)
+            classes = result.boxes.cls.cpu().numpy().astype(int)
+            for (x1, y1, x2, y2), cls in zip(boxes, classes):
+                x1, y1 = max(x1, 0), max(y1, 0)
+                x2, y2 = min(x2, width), min(y2, height)
+                if x2 > x1 and y2 > y1:
+                    crops.append((result.names[cls], frame[y1:y2, x1:x2]))
+        return crops
+
+    def classify(self, crops):
+        """Class probabilities, one row per crop image."""
+        model = self.load()
+        size = self._size
+        probabilities = []
+        for start in range(0, len(crops), self.max_batch):
+            chunk = crops[start:start + self.max_batch]
+            started = time.perf_counter()
+            batch = np.zeros((self._bucket(len(chunk)), size, size, 3), dtype=np.uint8)
+            for i, crop in enumerate(chunk):
+                cv2.resize(crop, (size, size), dst=batch[i], interpolation=cv2.INTER_AREA)
+            # BGR -> RGB and MobileNet's [-1, 1] scaling for the whole batch at once
+            inputs = batch[..., ::-1].astype(np.float32) / 127.5 - 1.0
+            prepared = time.perf_counter()
+            probabilities.append(np.asarray(model.predict_on_batch(inputs))[:len(chunk)])
+            # Per crop, to line up with the detector's per-image timings
+            model_stage_seconds.observe((prepared - started) / len(chunk), model="freshness", stage="preprocess")
+            model_stage_seconds.observe((time.perf_counter() - prepared) / len(chunk), model="freshness", stage="inference")
+        return np.concatenate(probabilities) if probabilities else np.zeros((0, len(self.labels)))
+
+    def assess(self, results):
+        """{ingredient: {"quality", "freshness", "crops"}} averaged over every box.
+
+        `freshness` is the expected share of shelf life left (0-1).
+        """
+        crops = self.crops(results)
+        if not crops or not self.available:
+            return {}
+        probabilities = self.classify([crop for _, crop in crops])
+        factors = np.array([LIFE_FACTOR.get(label, 1.0) for label in self.labels])
+
+        by_label = {}
+        for (label, _), row in zip(crops, probabilities):
+            by_label.setdefault(label, []).append(row)
+
+        assessment = {}
+        for label, rows in by_label.items():
+            mean = np.mean(rows, axis=0)
+            assessment[label] = {
+                "quality": self.labels[int(np.argmax(mean))],
+                "freshness": round(float(mean @ factors), 3),
+                "crops": len(rows),
+            }
+        return assessment
+
+
+freshness_classifier = FreshnessClassifier()
+
+
+def remaining_life(max_life, freshness):
+    max_life = max_life or DEFAULT_MAX_LIFE
+    return int(round(max_life * freshness))
@@ -0,0 +1,44 @@
+import io
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Longest side uploads are reduced to before detection. YOLO letterboxes to
+# 640 anyway, so decoding a 12-MP photo at full size only costs time and memory.
+MAX_SIDE = int(os.getenv("UploadMaxSide", 640))
+
+REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def decode_image(data, max_side=MAX_SIDE):
+    """Decode uploaded bytes into a BGR array no larger than `max_side`.
+
+    JPEGs are decoded at 1/2, 1/4 or 1/8 scale when that still leaves at
+    least `max_side` pixels, which skips most of the decode work, and the
+    rest is an area resize. EXIF orientation is applied by OpenCV.
+    """
+    if not data:
+        raise ValueError("Empty image upload")
+    try:
+        width, height = Image.open(io.BytesIO(data)).size  # Reads the header only
+    except Exception:
+        raise ValueError("Unsupported or corrupt image")
+
+    flag = cv2.IMREAD_COLOR
+    if max_side:
+        for factor, reduced in REDUCED_FLAGS:
+            if max(width, height) // factor >= max_side:
+                flag = reduced
+                break
+
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if image is None:
+        raise ValueError("Unsupported or corrupt image")
+
+    height, width = image.shape[:2]
+    if max_side and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        image = cv2.resize(image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    return image
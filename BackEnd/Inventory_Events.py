@@ -0,0 +1,231 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from Connect_MySQL import *
+from Table_Versions import table_versions, tables_changed
+
+
+def encode_event(event, data, event_id):
+    """One Server-Sent Events message, encoded once and shared by every subscriber."""
+    payload = json.dumps(jsonable_encoder(data), separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode()
+
+
+class InventoryEvents:
+    """Pushes committed inventory changes to Server-Sent Events subscribers.
+
+    Write paths read the rows they changed inside their transaction (see
+    `changed_rows`) and `publish()` them after commit, from any thread. The
+    event loop encodes each change once and drops it into every subscriber's
+    bounded queue. A subscriber that falls `queue_size` messages behind is
+    disconnected instead of buffered; the browser's EventSource reconnects
+    and resyncs from a fresh snapshot.
+
+    Rows are stamped with a sequence number while the write still holds
+    their locks, so an older value published late never overwrites a newer
+    one.
+
+    Writes made by other API workers (or other processes) are picked up by
+    `follow_ledger()`, which polls inventory_ledger every `poll_interval`
+    seconds and publishes the current rows of the ingredients it touched.
+    Those arrive up to one interval late; a row identical to the last one
+    published is not sent again, so a worker's own writes seen a second time
+    through the ledger cost nothing. The poll also bumps this process's
+    "inventory" counter, and "sales" for orders, so cached responses built
+    from another worker's writes are invalidated too.
+    """
+
+    KEEPALIVE = b": keepalive\n\n"
+
+    def __init__(self, queue_size=256, snapshot_ttl=5.0, keepalive=15.0, poll_interval=1.0):
+        self.queue_size = queue_size
+        self.snapshot_ttl = snapshot_ttl
+        self.keepalive = keepalive
+        self.poll_interval = poll_interval
+        self._loop = None
+        self._subscribers = set()
+        self._listeners = []  # In-process consumers, e.g. the recommendation index
+        self._seq = itertools.count(1)
+        self._last_seq = {}  # ingredient -> seq of the newest published row
+        self._last_row = {}  # ingredient -> newest published row
+        self._following = False
+        self._event_id = 0
+        self._snapshot = None
+        self._snapshot_lock = asyncio.Lock()
+        self.stats = {"published": 0, "dropped_subscribers": 0, "from_ledger": 0}
+
+    def attach(self, loop):
+        self._loop = loop
+        loop.call_later(self.keepalive, self._send_keepalive)
+
+    def _send_keepalive(self):
+        # One timer for everyone instead of a timeout per subscriber
+        self._broadcast(self.KEEPALIVE)
+        self._loop.call_later(self.keepalive, self._send_keepalive)
+
+    def changed_rows(self, cursor, ingredients):
+        """Current values of `ingredients`, read with an open cursor before commit."""
+        ingredients = sorted(set(ingredients))
+        if not ingredients:
+            return []
+        placeholders = ", ".join(["%s"] * len(ingredients))
+        cursor.execute(
+            f"SELECT ingredient, quantity, remaining_life, quality FROM inventory WHERE ingredient IN ({placeholders});",
+            ingredients,
+        )
+        seq = next(self._seq)  # itertools.count is atomic under the GIL
+        return [
+            {"ingredient": ingredient, "quantity": quantity, "remaining_life": remaining_life, "quality": quality, "seq": seq}
+            for ingredient, quantity, remaining_life, quality in cursor.fetchall()
+        ]
+
+    # Publishing (any thread)
+
+    def publish(self, rows):
+        if not rows or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, rows)
+        except RuntimeError:
+            pass  # Loop already closed during shutdown
+
+    def _fan_out(self, rows):
+        fresh = []
+        for row in rows:
+            if row["seq"] >= self._last_seq.get(row["ingredient"], 0):
+                self._last_seq[row["ingredient"]] = row["seq"]
+                values = {key: value for key, value in row.items() if key != "seq"}
+                if values != self._last_row.get(row["ingredient"]):
+                    self._last_row[row["ingredient"]] = values
+                    fresh.append(values)
+        if not fresh:
+            return
+
+        for listener in self._listeners:
+            try:
+                listener(fresh)
+            except Exception as err:
+                print(f"Inventory listener failed: {err}")
+
+        self._event_id += 1
+        self.stats["published"] += 1
+        self._broadcast(encode_event("delta", fresh, self._event_id))
+
+    def _broadcast(self, message):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(queue)
+
+    def _drop(self, queue):
+        self._subscribers.discard(queue)
+        self.stats["dropped_subscribers"] += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)  # Ends that subscriber's stream
+
+    # Writes from other processes
+
+    def follow_ledger(self):
+        if self._following or not self.poll_interval:
+            return
+        self._following = True
+        threading.Thread(target=self._follow, daemon=True).start()
+
+    def stop(self):
+        self._following = False
+
+    def _follow(self):
+        seen = {}  # ledger id -> at, for the look-back window
+        since = None
+        while self._following:
+            try:
+                with get_cursor() as cursor:
+                    since, seen = self._poll(cursor, since, seen)
+            except Exception as err:
+                print(f"Inventory ledger poll failed, will retry: {err}")
+            time.sleep(self.poll_interval)
+
+    def _poll(self, cursor, since, seen):
+        """Publish the ledger entries written since `since`. Returns the next (since, seen)."""
+        cursor.execute("SELECT NOW(3);")
+        now = cursor.fetchone()[0]
+        if since is None:
+            return now, seen
+        # Rows commit a little after their `at`, so look back and skip what was seen
+        cursor.execute("""
+        SELECT id, ingredient, kind, at FROM inventory_ledger
+        WHERE at >= %s - INTERVAL 10 SECOND;
+        """, (since,))
+        entries = cursor.fetchall()
+        new = [entry for entry in entries if entry[0] not in seen]
+        seen = {ledger_id: at for ledger_id, _, _, at in entries}
+        if new:
+            self.stats["from_ledger"] += 1
+            # Orders write sales_data in the same transaction as their ledger rows
+            if any(kind == "order" for _, _, kind, _ in new):
+                tables_changed("inventory", "sales")
+            else:
+                tables_changed("inventory")
+            self.publish(self.changed_rows(cursor, {ingredient for _, ingredient, _, _ in new}))
+        return now, seen
+
+    # Subscribing (event loop)
+
+    def add_listener(self, callback):
+        """Call `callback(rows)` on the event loop with every delta, stale rows already dropped."""
+        self._listeners.append(callback)
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    async def snapshot(self, build):
+        """Encoded snapshot event, shared by everyone connecting at about the same time."""
+        versions, _ = table_versions.snapshot(("inventory",))
+        async with self._snapshot_lock:
+            cached = self._snapshot
+            if cached is None or cached[0] != versions or time.monotonic() - cached[1] > self.snapshot_ttl:
+                rows = await asyncio.to_thread(build)
+                cached = (versions, time.monotonic(), encode_event("snapshot", rows, self._event_id))
+                self._snapshot = cached
+        return cached[2]
+
+    async def stream(self, build_snapshot):
+        """Snapshot first, then deltas and keepalive comments as they arrive."""
+        # Subscribe before reading the snapshot so nothing committed in between is missed
+        queue = self.subscribe()
+        try:
+            yield await self.snapshot(build_snapshot)
+            while True:
+                messages = [await queue.get()]
+                # Whatever queued up meanwhile goes out in the same write
+                while not queue.empty():
+                    messages.append(queue.get_nowait())
+                if None in messages:
+                    return
+                yield b"".join(messages)
+        finally:
+            self.unsubscribe(queue)
+
+    def status(self):
+        return dict(self.stats, subscribers=len(self._subscribers))
+
+
+inventory_events = InventoryEvents(
+    queue_size=int(os.getenv("InventoryEventQueue", 256)),
+    snapshot_ttl=float(os.getenv("InventorySnapshotTTL", 5)),
+    keepalive=float(os.getenv("InventoryKeepalive", 15)),
+    poll_interval=float(os.getenv("InventoryLedgerPoll", 1)),
+)
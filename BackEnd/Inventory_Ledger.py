@@ -0,0 +1,256 @@
+from datetime import datetime, timedelta
+
+from Connect_MySQL import *
+from Table_Versions import tables_changed
+from Inventory_Events import inventory_events
+
+# Every change to inventory.quantity is also appended to inventory_ledger, in
+# the same transaction, as (ingredient, delta, kind). `inventory` stays the
+# fast-read projection of the ledger. Snapshots of the running totals are
+# materialized periodically (the ledger_snapshot job, see Job_Runner), so the
+# stock at any moment is one snapshot plus the deltas after it.
+KINDS = ("intake", "order", "correction", "waste")
+
+# Ledger rows younger than this are left out of a new snapshot, so a
+# transaction that took its id earlier but commits later is never missed
+SNAPSHOT_SETTLE_SECONDS = 60
+
+
+def ensure_ledger_tables():
+    """Create the ledger tables, opening the ledger with the current stock the first time."""
+    # Under the lock, so workers starting together open the ledger only once
+    with named_lock("schema:ledger"), get_cursor(commit=True) as cursor:
+        cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = 'inventory_ledger';")
+        if cursor.fetchone()[0]:
+            return
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS inventory_ledger (
+          id bigint NOT NULL AUTO_INCREMENT,
+          at datetime(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+          ingredient varchar(255) NOT NULL,
+          delta int NOT NULL,
+          kind enum({", ".join(f"'{kind}'" for kind in KINDS)}) NOT NULL,
+          PRIMARY KEY (id),
+          KEY idx_ledger_at (at),
+          -- Covers per-ingredient consumption queries without touching the rows
+          KEY idx_ledger_ingredient_at (ingredient, at, kind, delta)
+        );
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_snapshot_index (
+          ledger_id bigint NOT NULL,
+          taken_at datetime(3) NOT NULL,
+          PRIMARY KEY (ledger_id),
+          KEY idx_snapshot_taken_at (taken_at)
+        );
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_snapshots (
+          ledger_id bigint NOT NULL,
+          ingredient varchar(255) NOT NULL,
+          quantity int NOT NULL,
+          PRIMARY KEY (ledger_id, ingredient)
+        );
+        """)
+        cursor.execute("""
+        INSERT INTO inventory_ledger (ingredient, delta, kind)
+        SELECT ingredient, quantity, 'correction' FROM inventory WHERE quantity <> 0;
+        """)
+        print(f"Opened inventory_ledger with {cursor.rowcount} ingredients")
+
+
+def record(cursor, deltas, kind):
+    """Append {ingredient: delta} to the ledger using the writer's open cursor."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown ledger kind '{kind}'. Use {', '.join(KINDS)}.")
+    rows = [(ingredient, delta, kind) for ingredient, delta in deltas.items() if delta]
+    if rows:
+        cursor.executemany("INSERT INTO inventory_ledger (ingredient, delta, kind) VALUES (%s, %s, %s);", rows)
+
+
+def adjust(ingredient, delta, kind="correction"):
+    """Manual stock correction or write-off; changes the projection and the ledger together."""
+    if kind not in ("correction", "waste"):
+        raise ValueError("Manual adjustments are 'correction' or 'waste'.")
+    if kind == "waste" and delta > 0:
+        raise ValueError("Waste must be a negative delta.")
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("SELECT quantity FROM inventory WHERE ingredient = %s FOR UPDATE;", (ingredient,))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Ingredient '{ingredient}' not found in inventory.")
+        if (row[0] or 0) + delta < 0:
+            raise ValueError(f"Not enough '{ingredient}' in inventory. Available: {row[0] or 0}")
+        cursor.execute("UPDATE inventory SET quantity = COALESCE(quantity, 0) + %s WHERE ingredient = %s;", (delta, ingredient))
+        record(cursor, {ingredient: delta}, kind)
+        changed = inventory_events.changed_rows(cursor, [ingredient])
+    tables_changed("inventory")
+    inventory_events.publish(changed)
+    return (row[0] or 0) + delta
+
+
+# Snapshots
+
+def take_snapshot():
+    """Materialize the running totals up to the newest settled ledger row.
+
+    Built from the previous snapshot plus the deltas after it, so the cost
+    is bounded by the rows since the last snapshot.
+    """
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("SELECT ledger_id FROM inventory_snapshot_index ORDER BY ledger_id DESC LIMIT 1;")
+        row = cursor.fetchone()
+        previous = row[0] if row else 0
+
+        cursor.execute("""
+        SELECT id, at FROM inventory_ledger
+        WHERE at < NOW(3) - INTERVAL %s SECOND
+        ORDER BY at DESC LIMIT 1;
+        """, (SNAPSHOT_SETTLE_SECONDS,))
+        row = cursor.fetchone()
+        if row is None or row[0] <= previous:
+            return {"ledger_id": previous, "ingredients": 0, "replayed": 0}
+        upto, taken_at = row
+        ingredients = snapshot_upto(cursor, previous, upto, taken_at)
+    return {"ledger_id": upto, "taken_at": taken_at, "ingredients": ingredients, "replayed": upto - previous}
+
+
+def snapshot_upto(cursor, previous, upto, taken_at):
+    """Write the snapshot at ledger id `upto` from the one at `previous` (0 = none)."""
+    cursor.execute("""
+    INSERT INTO inventory_snapshots (ledger_id, ingredient, quantity)
+    SELECT %s, ingredient, SUM(quantity) FROM (
+        SELECT ingredient, quantity FROM inventory_snapshots WHERE ledger_id = %s
+        UNION ALL
+        SELECT ingredient, delta FROM inventory_ledger WHERE id > %s AND id <= %s
+    ) AS changes
+    GROUP BY ingredient;
+    """, (upto, previous, previous, upto))
+    ingredients = cursor.rowcount
+    cursor.execute("INSERT INTO inventory_snapshot_index (ledger_id, taken_at) VALUES (%s, %s);", (upto, taken_at))
+    return ingredients
+
+
+def _snapshot_around(cursor, when):
+    """(ledger_id, taken_at) of the last snapshot at or before `when`, and the id
+    of the next one, which bounds the replay."""
+    cursor.execute("""
+    SELECT ledger_id, taken_at FROM inventory_snapshot_index
+    WHERE taken_at <= %s ORDER BY taken_at DESC LIMIT 1;
+    """, (when,))
+    row = cursor.fetchone()
+    base = row or (0, None)
+    cursor.execute("""
+    SELECT ledger_id FROM inventory_snapshot_index
+    WHERE taken_at > %s ORDER BY taken_at LIMIT 1;
+    """, (when,))
+    row = cursor.fetchone()
+    return base, row[0] if row else None
+
+
+# Queries
+
+def stock_at(when, ingredients=None):
+    """{ingredient: quantity} as of `when`: one snapshot plus the deltas after it."""
+    with get_cursor() as cursor:
+        (base_id, _), next_id = _snapshot_around(cursor, when)
+        filter_sql, filter_params = "", []
+        if ingredients:
+            filter_sql = f" AND ingredient IN ({', '.join(['%s'] * len(ingredients))})"
+            filter_params = list(ingredients)
+        upper_sql, upper_params = ("AND id <= %s", [next_id]) if next_id else ("", [])
+        cursor.execute(f"""
+        SELECT ingredient, SUM(quantity) FROM (
+            SELECT ingredient, quantity FROM inventory_snapshots WHERE ledger_id = %s{filter_sql}
+            UNION ALL
+            SELECT ingredient, delta FROM inventory_ledger
+            WHERE id > %s {upper_sql} AND at <= %s{filter_sql}
+        ) AS changes
+        GROUP BY ingredient ORDER BY ingredient;
+        """, [base_id] + filter_params + [base_id] + upper_params + [when] + filter_params)
+        return {ingredient: int(quantity) for ingredient, quantity in cursor.fetchall()}
+
+
+def consumption(start, end=None, ingredients=None, group=None):
+    """Stock movements per ingredient over [start, end).
+
+    Returns [{ingredient, used, wasted, received, corrected, used_per_day}];
+    with group="day" each ingredient also gets a per-day `days` series of
+    `used`. `used` counts order consumption only, so it is the rate to plan
+    purchasing with; `wasted` is what was written off.
+    """
+    if group not in (None, "day"):
+        raise ValueError(f"Unknown group '{group}'. Use day.")
+    end = end or datetime.now()
+    days = max((end - start) / timedelta(days=1), 1 / 24)
+    filter_sql, filter_params = "", []
+    if ingredients:
+        filter_sql = f" AND ingredient IN ({', '.join(['%s'] * len(ingredients))})"
+        filter_params = list(ingredients)
+
+    with get_cursor() as cursor:
+        cursor.execute(f"""
+        SELECT ingredient, kind, SUM(delta) FROM inventory_ledger
+        WHERE at >= %s AND at < %s{filter_sql}
+        GROUP BY ingredient, kind ORDER BY ingredient;
+        """, [start, end] + filter_params)
+        totals = {}
+        for ingredient, kind, delta in cursor.fetchall():
+            totals.setdefault(ingredient, dict.fromkeys(KINDS, 0))[kind] = int(delta)
+
+        series = {}
+        if group == "day":
+            cursor.execute(f"""
+            SELECT ingredient, DATE(at) AS day, -SUM(delta) FROM inventory_ledger
+            WHERE at >= %s AND at < %s AND kind = 'order'{filter_sql}
+            GROUP BY ingredient, day ORDER BY ingredient, day;
+            """, [start, end] + filter_params)
+            for ingredient, day, used in cursor.fetchall():
+                series.setdefault(ingredient, []).append({"date": day, "used": int(used)})
+
+    report = []
+    for ingredient, kinds in totals.items():
+        entry = {
+            "ingredient": ingredient,
+            "used": -kinds["order"],
+            "wasted": -kinds["waste"],
+            "received": kinds["intake"],
+            "corrected": kinds["correction"],
+            "used_per_day": round(-kinds["order"] / days, 3),
+        }
+        if group == "day":
+            entry["days"] = series.get(ingredient, [])
+        report.append(entry)
+    return report
+
+
+def projection_drift():
+    """Ingredients whose inventory.quantity disagrees with the ledger (should be none).
+
+    Both are read in one consistent snapshot, so concurrent writers can't
+    cause false alarms.
+    """
+    with get_cursor() as cursor:
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY;")
+        cursor.execute("SELECT ledger_id FROM inventory_snapshot_index ORDER BY ledger_id DESC LIMIT 1;")
+        row = cursor.fetchone()
+        base_id = row[0] if row else 0
+        cursor.execute("""
+        SELECT ingredient, SUM(quantity) FROM (
+            SELECT ingredient, quantity FROM inventory_snapshots WHERE ledger_id = %s
+            UNION ALL
+            SELECT ingredient, delta FROM inventory_ledger WHERE id > %s
+        ) AS changes
+        GROUP BY ingredient;
+        """, (base_id, base_id))
+        ledger = {ingredient.lower(): int(quantity) for ingredient, quantity in cursor.fetchall()}
+        cursor.execute("SELECT ingredient, COALESCE(quantity, 0) FROM inventory;")
+        projection = {ingredient.lower(): (ingredient, quantity) for ingredient, quantity in cursor.fetchall()}
+        cursor.execute("COMMIT;")
+
+    drift = []
+    for key in sorted(set(ledger) | set(projection)):
+        ingredient, quantity = projection.get(key, (key, 0))
+        if ledger.get(key, 0) != quantity:
+            drift.append({"ingredient": ingredient, "inventory": quantity, "ledger": ledger.get(key, 0)})
+    return drift
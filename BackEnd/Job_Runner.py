@@ -0,0 +1,328 @@
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from Connect_MySQL import *
+from Metrics import forecast_dish_seconds, forecast_job_seconds, job_seconds
+from Table_Versions import tables_changed
+
+# name -> (module, function, tables the job writes, description).
+# Modules are imported in the worker process only, so the API never loads
+# Prophet just to schedule a forecast.
+JOBS = {
+    "forecast": ("Sale_prediction", "predict_sales", ("predictions",), "Refit the sales forecast and rewrite sales_predictions"),
+    "rollups": ("Sales_Rollups", "rebuild_sales_rollups", ("sales",), "Recompute the daily/weekly/monthly sales rollups"),
+    "archive_cleanup": ("Upload_Archive", "prune_archive", (), "Apply the retention limits to UploadArchiveDir"),
+    "ledger_snapshot": ("Inventory_Ledger", "take_snapshot", (), "Snapshot running stock totals so point-in-time queries replay less"),
+}
+
+DEFAULT_SCHEDULE = "forecast@06:00,archive_cleanup@04:00,ledger_snapshot@03:00,ledger_snapshot@15:00"
+
+
+def parse_schedule(text):
+    """"forecast@06:00,archive_cleanup@04:00" -> [("forecast", (6, 0)), ...]"""
+    schedules = []
+    for entry in filter(None, (part.strip() for part in text.split(","))):
+        name, _, at = entry.partition("@")
+        if name not in JOBS:
+            raise ValueError(f"Unknown job '{name}' in JobSchedule. Choose from {list(JOBS)}")
+        hour, minute = (int(value) for value in at.split(":"))
+        schedules.append((name, (hour, minute)))
+    return schedules
+
+
+def ensure_job_tables():
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_runs (
+          id bigint NOT NULL AUTO_INCREMENT,
+          job_name varchar(64) NOT NULL,
+          scheduled_for datetime(3) NOT NULL,
+          source varchar(16) NOT NULL,
+          status varchar(16) NOT NULL,
+          host varchar(255) DEFAULT NULL,
+          pid int DEFAULT NULL,
+          started_at datetime(3) DEFAULT NULL,
+          finished_at datetime(3) DEFAULT NULL,
+          seconds double DEFAULT NULL,
+          result text,
+          PRIMARY KEY (id),
+          UNIQUE KEY unique_run (job_name, scheduled_for)
+        );
+        """)
+
+
+def _finish(run_id, status, seconds=None, result=None):
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("""
+        UPDATE job_runs SET status = %s, finished_at = NOW(3), seconds = %s, result = %s
+        WHERE id = %s AND status IN ('queued', 'running');
+        """, (status, seconds, result, run_id))
+
+
+def run_job(run_id, name, kwargs):
+    """Entry point of the worker process: run one job under its MySQL lock."""
+    module, function, _, _ = JOBS[name]
+    # GET_LOCK belongs to the connection, so hold one for the whole run; if the
+    # process dies MySQL releases the lock with the connection.
+    with pool.connection() as lock_conn:
+        lock = lock_conn.cursor()
+        lock.execute("SELECT GET_LOCK(%s, 0);", (f"job:{name}",))
+        if not lock.fetchone()[0]:
+            _finish(run_id, "skipped", result=json.dumps({"error": "already running"}))
+            return
+
+        try:
+            with get_cursor(commit=True) as cursor:
+                cursor.execute(
+                    "UPDATE job_runs SET status = 'running', host = %s, pid = %s, started_at = NOW(3) WHERE id = %s;",
+                    (socket.gethostname(), os.getpid(), run_id),
+                )
+            start = time.perf_counter()
+            try:
+                result = getattr(importlib.import_module(module), function)(**kwargs)
+            except Exception as err:
+                traceback.print_exc()
+                _finish(run_id, "failed", time.perf_counter() - start, json.dumps({"error": repr(err)}))
+                raise SystemExit(1)
+            _finish(run_id, "succeeded", time.perf_counter() - start, json.dumps(result, default=str))
+        finally:
+            lock.execute("SELECT RELEASE_LOCK(%s);", (f"job:{name}",))
+            lock.fetchone()
+
+
+class JobRunner:
+    """Runs scheduled and on-demand jobs in their own processes, once across all workers.
+
+    Every API worker (or a standalone `python Job_Runner.py`) may run the
+    scheduler. A scheduled slot is claimed by inserting its (job_name,
+    scheduled_for) row into `job_runs`; the unique key lets exactly one
+    process win. The job itself runs in a spawned process that holds a MySQL
+    named lock, so a manual run never overlaps a scheduled one.
+
+    A slot missed while nothing was running is still run if it is less than
+    `catch_up_hours` old.
+
+    Jobs finish in other processes, possibly on other hosts, so every API
+    worker also follows `job_runs` (`follow()`): each run that finished
+    since the last look bumps the table versions of what it wrote, which
+    invalidates this worker's cached reads, and its duration (plus the
+    per-dish fit times of a forecast) goes into this worker's metrics.
+    """
+
+    def __init__(self, schedules=(), poll_interval=30, catch_up_hours=6):
+        self.schedules = list(schedules)
+        self.poll_interval = poll_interval
+        self.catch_up = timedelta(hours=catch_up_hours)
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = {}  # run id -> Process started by this runner
+        self._claimed = set()  # (job, slot) already claimed here or elsewhere
+        self._thread = None
+        self._running = False
+        self._following = False
+        self._followed_since = None  # finished_at cut-off of the last sync
+        self._followed = {}  # run id -> finished_at, runs already synced
+
+    # Scheduling
+
+    def start(self):
+        if self._running or not self.schedules:
+            return
+        ensure_job_tables()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Jobs already started are left to finish in their own processes
+        self._running = False
+        self._following = False
+
+    def _run(self):
+        while self._running:
+            try:
+                self.run_due()
+            except Exception as err:
+                print(f"Job scheduler check failed, will retry: {err}")
+            time.sleep(self.poll_interval)
+
+    def run_due(self, now=None):
+        now = now or datetime.now()
+        for name, (hour, minute) in self.schedules:
+            slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if slot > now:
+                slot -= timedelta(days=1)
+            if (name, slot) in self._claimed or now - slot > self.catch_up:
+                continue
+            self._claimed.add((name, slot))
+            self.submit(name, scheduled_for=slot, source="schedule")
+
+    # Following runs finished anywhere
+
+    def follow(self):
+        if self._following:
+            return
+        ensure_job_tables()
+        self._following = True
+        with get_cursor() as cursor:
+            cursor.execute("SELECT NOW(3);")
+            self._followed_since = cursor.fetchone()[0]
+        threading.Thread(target=self._follow, daemon=True).start()
+
+    def _follow(self):
+        while self._following:
+            time.sleep(self.poll_interval)
+            try:
+                self.sync()
+            except Exception as err:
+                print(f"Job run sync failed, will retry: {err}")
+
+    def sync(self):
+        """Apply the runs that finished since the last sync. Returns them."""
+        with get_cursor() as cursor:
+            cursor.execute("SELECT NOW(3);")
+            now = cursor.fetchone()[0]
+            # A run's finished_at is set just before its commit, so look back
+            # a little and skip the runs already seen
+            cursor.execute("""
+            SELECT id, job_name, status, seconds, result, finished_at FROM job_runs
+            WHERE finished_at >= %s - INTERVAL %s SECOND ORDER BY finished_at;
+            """, (self._followed_since, self.poll_interval + 60))
+            rows = cursor.fetchall()
+        new = [row for row in rows if row[0] not in self._followed]
+        self._followed = {row[0]: row[5] for row in rows}
+        self._followed_since = now
+
+        for run_id, name, status, seconds, result, _ in new:
+            if name not in JOBS:
+                continue
+            if status == "succeeded":
+                tables_changed(*JOBS[name][2])
+            if seconds is not None:
+                job_seconds.observe(seconds, job=name, status=status)
+            if name == "forecast" and status == "succeeded" and result:
+                result = json.loads(result)
+                if result.get("backend"):
+                    forecast_job_seconds.observe(seconds, backend=result["backend"])
+                for dish, dish_seconds in (result.get("dish_seconds") or {}).items():
+                    forecast_dish_seconds.set(round(dish_seconds, 3), dish=dish)
+        return new
+
+    # Running
+
+    def submit(self, name, scheduled_for=None, source="manual", **kwargs):
+        """Claim a run of `name` and start it in a new process. Returns the run id,
+        or None if another process already claimed that slot."""
+        if name not in JOBS:
+            raise ValueError(f"Unknown job '{name}'. Choose from {list(JOBS)}")
+        scheduled_for = scheduled_for or datetime.now()
+        with get_cursor(commit=True) as cursor:
+            cursor.execute("""
+            INSERT IGNORE INTO job_runs (job_name, scheduled_for, source, status)
+            VALUES (%s, %s, %s, 'queued');
+            """, (name, scheduled_for, source))
+            if cursor.rowcount != 1:
+                return None
+            run_id = cursor.lastrowid
+
+        process = self._context.Process(target=run_job, args=(run_id, name, kwargs), name=f"job-{name}-{run_id}")
+        process.start()
+        self._processes[run_id] = process
+        threading.Thread(target=self._watch, args=(run_id, name, process), daemon=True).start()
+        return run_id
+
+    def _watch(self, run_id, name, process):
+        process.join()
+        self._processes.pop(run_id, None)
+        if process.exitcode == 0:
+            # The job's own cache bumps happened in the worker process. Other
+            # API workers catch up through sync().
+            tables_changed(*JOBS[name][2])
+        else:
+            # Covers a worker that crashed before recording its outcome
+            _finish(run_id, "failed", result=json.dumps({"error": f"worker exited with code {process.exitcode}"}))
+
+    def is_running(self, name):
+        with get_cursor() as cursor:
+            cursor.execute("SELECT IS_FREE_LOCK(%s);", (f"job:{name}",))
+            return not cursor.fetchone()[0]
+
+    # Status
+
+    def get_run(self, run_id):
+        runs = self.runs(run_id=run_id)
+        return runs[0] if runs else None
+
+    def runs(self, job=None, limit=50, run_id=None):
+        query = "SELECT * FROM job_runs"
+        conditions, params = [], []
+        if job:
+            conditions.append("job_name = %s")
+            params.append(job)
+        if run_id:
+            conditions.append("id = %s")
+            params.append(run_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT %s;"
+        with get_cursor() as cursor:
+            cursor.execute(query, params + [limit])
+            column_names = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(column_names, row)) for row in cursor.fetchall()]
+        for row in rows:
+            row["result"] = json.loads(row["result"]) if row["result"] else None
+        return rows
+
+    def status(self):
+        """Per job: schedule, run counts, durations and the latest run."""
+        with get_cursor() as cursor:
+            cursor.execute("""
+            SELECT job_name, COUNT(*), SUM(status = 'succeeded'), SUM(status = 'failed'),
+                   AVG(CASE WHEN status = 'succeeded' THEN seconds END),
+                   MAX(CASE WHEN status = 'succeeded' THEN seconds END),
+                   MAX(id)
+            FROM job_runs GROUP BY job_name;
+            """)
+            stats = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        schedule = {}
+        for name, (hour, minute) in self.schedules:
+            schedule.setdefault(name, []).append(f"{hour:02d}:{minute:02d}")
+        report = {}
+        for name, (_, _, _, description) in JOBS.items():
+            runs, succeeded, failed, avg_seconds, max_seconds, last_id = stats.get(name, (0, 0, 0, None, None, None))
+            report[name] = {
+                "description": description,
+                "schedule": schedule.get(name, []),
+                "runs": runs,
+                "succeeded": int(succeeded or 0),
+                "failed": int(failed or 0),
+                "avg_seconds": avg_seconds,
+                "max_seconds": max_seconds,
+                "last_run": self.get_run(last_id) if last_id else None,
+            }
+        return report
+
+
+job_runner = JobRunner(
+    schedules=parse_schedule(os.getenv("JobSchedule", DEFAULT_SCHEDULE)),
+    poll_interval=float(os.getenv("JobPollInterval", 30)),
+    catch_up_hours=float(os.getenv("JobCatchUpHours", 6)),
+)
+
+
+if __name__ == "__main__":
+    # Standalone scheduler, for deployments that run the API with JobScheduler=0
+    job_runner.start()
+    print(f"Job scheduler running: {os.getenv('JobSchedule', DEFAULT_SCHEDULE)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        job_runner.stop()
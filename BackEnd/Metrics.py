@@ -0,0 +1,267 @@
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from functools import lru_cache
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_metrics = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        _metrics.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), function=None):
+        super().__init__(name, help, labels)
+        self.function = function  # Read at scrape time, for values owned elsewhere
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        if self.function is not None:
+            try:
+                self.set(self.function())
+            except Exception:
+                pass
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, (list(series[0]), series[1], series[2])) for key, series in self._values.items()]
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                bucket_labels = _format_labels(self.labels, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {bucket_count}")
+            bucket_labels = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+def render():
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Metrics recorded across the backend
+
+http_request_seconds = Histogram("http_request_duration_seconds", "API request latency", ("method", "route", "status"))
+http_in_flight = Gauge("http_requests_in_flight", "Requests being handled")
+sql_query_seconds = Histogram("sql_query_duration_seconds", "SQL statement latency", ("query",))
+sql_rows = Counter("sql_rows_total", "Rows returned or affected by SQL statements", ("query",))
+sql_checkout_seconds = Histogram("sql_pool_checkout_seconds", "Time waiting for a pooled MySQL connection")
+model_load_seconds = Histogram("model_load_seconds", "Model load and warm-up time", ("model",), buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120))
+model_stage_seconds = Histogram("model_inference_seconds", "Per-image model time by stage", ("model", "stage"))
+forecast_job_seconds = Histogram("forecast_job_seconds", "Whole forecast job duration", ("backend",), buckets=(0.1, 1, 5, 15, 30, 60, 120, 300, 600, 1800))
+job_seconds = Histogram("job_duration_seconds", "Job run duration, from job_runs", ("job", "status"), buckets=(0.1, 1, 5, 15, 30, 60, 120, 300, 600, 1800))
+forecast_dish_seconds = Gauge("forecast_dish_fit_seconds", "Last Prophet fit time per dish", ("dish",))
+plan_seconds = Histogram("inventory_plan_seconds", "Ingredient plan computation time", ("days",))
+
+
+# SQL statement labels: verb plus first table, e.g. "SELECT sales_daily"
+
+_STATEMENT = re.compile(r"^\s*(\w+)", re.S)
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|JOIN)\s+`?([\w.]+)", re.I)
+
+
+@lru_cache(maxsize=1024)
+def query_label(sql):
+    verb = _STATEMENT.match(sql)
+    verb = verb.group(1).upper() if verb else "?"
+    table = _TABLE.search(sql)
+    return f"{verb} {table.group(1)}" if table else verb
+
+
+class TimedCursor:
+    """Cursor proxy that records each statement's latency and row count.
+
+    `connection` is the connection the cursor belongs to, for callers that
+    need to roll back or commit themselves.
+    """
+
+    def __init__(self, cursor, connection=None):
+        self._cursor = cursor
+        self.connection = connection
+
+    def _timed(self, method, sql, *args, **kwargs):
+        label = query_label(sql)
+        start = time.perf_counter()
+        try:
+            return method(sql, *args, **kwargs)
+        finally:
+            sql_query_seconds.observe(time.perf_counter() - start, query=label)
+            if self._cursor.rowcount and self._cursor.rowcount > 0:
+                sql_rows.inc(self._cursor.rowcount, query=label)
+
+    def execute(self, sql, *args, **kwargs):
+        return self._timed(self._cursor.execute, sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._timed(self._cursor.executemany, sql, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def record_detection(results, model="till"):
+    """Per-image preprocess/inference/postprocess times ultralytics measures (ms)."""
+    for result in results:
+        for stage, milliseconds in (getattr(result, "speed", None) or {}).items():
+            if milliseconds is not None:
+                model_stage_seconds.observe(milliseconds / 1000, model=model, stage=stage)
+
+
+# Optional sampling profiler for slow requests
+
+class SlowRequestSampler:
+    """Samples every thread's stack while any request has run longer than `threshold`.
+
+    Stacks are kept as collapsed "frame;frame;frame count" lines, the input
+    format of flamegraph.pl and speedscope. Sampling only happens while a
+    slow request is in flight, so the cost is nil otherwise.
+    """
+
+    def __init__(self, threshold, interval=0.01, max_stacks=5000):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._active = {}  # request token -> start time
+        self._lock = threading.Lock()
+        self._stacks = _Tally()
+        self._thread = None
+
+    def begin(self):
+        token = object()
+        with self._lock:
+            self._active[token] = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return token
+
+    def end(self, token):
+        with self._lock:
+            self._active.pop(token, None)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                slow = any(now - started > self.threshold for started in self._active.values())
+            if not slow:
+                continue
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = ";".join(f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+                                 for entry in traceback.extract_stack(frame))
+                with self._lock:
+                    if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                        self._stacks[stack] += 1
+
+    def collapsed(self, reset=False):
+        with self._lock:
+            text = "\n".join(f"{stack} {count}" for stack, count in self._stacks.most_common())
+            if reset:
+                self._stacks.clear()
+        return text + "\n"
+
+
+slow_threshold_ms = float(os.getenv("SlowRequestMs", 0))
+slow_sampler = SlowRequestSampler(slow_threshold_ms / 1000) if slow_threshold_ms > 0 else None
@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+from ultralytics import YOLO
+
+from Metrics import model_load_seconds
+from Detector_Backends import DETECTOR_BACKEND, DETECTOR_CALIBRATION, DETECTOR_THREADS, prepare, set_threads
+
+device = "cuda" if torch.cuda.is_available() else "cpu"
+
+MODELS = {
+    "till": os.getenv("TillModelPath", "./Models/M_Till_best.pt"),
+}
+
+# The only folder swap() loads weights from; YOLO unpickles whatever it is given
+MODEL_DIR = os.getenv("ModelDir") or os.path.dirname(MODELS["till"]) or "."
+
+
+def weights_path(path):
+    """`path` (a file name in MODEL_DIR, or a path inside it) as a real path.
+
+    Raises ValueError for anything that resolves outside MODEL_DIR, symlinks
+    and `..` included.
+    """
+    root = os.path.realpath(MODEL_DIR)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise ValueError(f"Weights must be inside {MODEL_DIR}")
+    return full
+
+
+class ModelRegistry:
+    """Keeps warmed-up YOLO instances so requests never pay the load cost.
+
+    Ultralytics predictors are not safe to share between threads, so each
+    registered model owns a small pool of instances. A request checks one out,
+    runs inference and hands it back. `swap()` loads and warms a new weights
+    file and bumps the model generation; instances of an older generation are
+    discarded as they are returned, so in-flight requests finish on the old
+    weights while new ones pick up the new file. A request waiting for a free
+    instance re-checks the current generation every `wait_interval` seconds,
+    so a swap never leaves it blocked on the old pool.
+    """
+
+    def __init__(self, max_instances=2, warmup_size=640, wait_interval=1.0):
+        self.max_instances = max_instances
+        self.warmup_size = warmup_size
+        self.wait_interval = wait_interval
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def _load_instance(self, path):
+        start = time.perf_counter()
+        model = YOLO(path)
+        # Dummy inference builds the predictor and initialises the graph
+        dummy = np.zeros((self.warmup_size, self.warmup_size, 3), dtype=np.uint8)
+        model(dummy, device=device, verbose=False)
+        set_threads(model, path, DETECTOR_THREADS)
+        elapsed = time.perf_counter() - start
+        model_load_seconds.observe(elapsed, model=os.path.basename(path))
+        print(f"Loaded {path} on {device} in {elapsed:.2f}s")
+        return model
+
+    def load(self, name, path):
+        """Load `path` under `name` (replacing any previous weights) and warm it up."""
+        instance = self._load_instance(path)
+        with self._lock:
+            previous = self._models.get(name)
+            generation = previous["generation"] + 1 if previous else 0
+            idle = queue.LifoQueue()
+            idle.put((generation, instance))
+            self._models[name] = {
+                "path": path,
+                "generation": generation,
+                "idle": idle,
+                "created": 1,
+                "loaded_at": time.time(),
+            }
+        return instance
+
+    def swap(self, name, path):
+        """Hot-swap the weights behind `name` without restarting the API.
+
+        `path` goes through the same DetectorBackend export as the configured
+        weights, so a reload keeps serving from the selected runtime. Only
+        files inside MODEL_DIR are accepted, see weights_path().
+        """
+        return self.load(name, resolve(name, weights_path(path)))
+
+    def _entry(self, name):
+        with self._lock:
+            entry = self._models.get(name)
+        if entry is None:
+            if name not in MODELS:
+                raise KeyError(f"Unknown model '{name}'")
+            self.load(name, resolve(name))
+            with self._lock:
+                entry = self._models[name]
+        return entry
+
+    @contextmanager
+    def model(self, name="till"):
+        """Check out a warmed-up instance of `name` for the duration of the block."""
+        while True:
+            entry = self._entry(name)
+            try:
+                generation, instance = entry["idle"].get_nowait()
+                break
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_create = entry["created"] < self.max_instances
+                if can_create:
+                    entry["created"] += 1
+            if can_create:
+                try:
+                    generation, instance = entry["generation"], self._load_instance(entry["path"])
+                except Exception:
+                    with self._lock:
+                        entry["created"] -= 1
+                    raise
+                break
+            try:
+                generation, instance = entry["idle"].get(timeout=self.wait_interval)
+                break
+            except queue.Empty:
+                continue  # The weights may have been swapped meanwhile, look again
+
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                current = self._models.get(name)
+                keep = current is entry and generation == entry["generation"]
+                if not keep:
+                    entry["created"] -= 1
+            if keep:
+                entry["idle"].put((generation, instance))
+
+    def status(self):
+        with self._lock:
+            return {
+                name: {
+                    "path": entry["path"],
+                    "generation": entry["generation"],
+                    "instances": entry["created"],
+                    "idle": entry["idle"].qsize(),
+                    "loaded_at": entry["loaded_at"],
+                }
+                for name, entry in self._models.items()
+            }
+
+
+def resolve(name, path=None):
+    """Weights for `name` (or `path`) in the DetectorBackend format (exported on first use)."""
+    path = path or MODELS[name]
+    if device != "cpu":
+        return path  # The export backends are for CPU-only boxes
+    return prepare(path, DETECTOR_BACKEND, DETECTOR_CALIBRATION)
+
+
+registry = ModelRegistry(max_instances=int(os.getenv("ModelInstances", 2)))
+
+
+def load_all():
+    """Load and warm every configured model. Called once at API startup."""
+    for name in MODELS:
+        registry.load(name, resolve(name))
@@ -0,0 +1,266 @@
+import fcntl
+import itertools
+import json
+import os
+import threading
+from datetime import datetime
+
+from Connect_MySQL import *
+from SQL_Action import aggregate_orders, apply_orders
+from Table_Versions import tables_changed
+from Inventory_Events import inventory_events
+
+
+class OrderWriteBehind:
+    """Accepts orders against an in-memory stock snapshot and writes them in batches.
+
+    `accept()` checks the order against the snapshot, takes the stock off it
+    and answers right away. A background thread flushes everything accepted
+    so far every `flush_interval` seconds, or sooner once `flush_size` orders
+    are waiting, as one transaction (see SQL_Action.apply_orders).
+
+    With a `journal_path` every accepted order is appended (and fsynced) to a
+    local journal before it is acknowledged. The sequence number of the last
+    flushed order is stored in `order_journal_state` in the same transaction
+    as the flush, so after a crash `start()` replays exactly the orders that
+    never reached the database. Each process takes its own journal slot
+    (`journal_path`, then `journal_path.1`, ...), held with a lock file, so
+    API workers sharing one OrderJournal setting never share a file.
+
+    A journal entry that can no longer be posted (say its dish was taken off
+    the menu after it was accepted) is moved to `<journal>.dead` and logged
+    instead of being retried forever.
+    """
+
+    def __init__(self, flush_interval=1.0, flush_size=200, journal_path=None):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.journal_path = journal_path
+        self.journal_name = os.path.basename(journal_path) if journal_path else None
+        self._journal_lock = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = []  # (seq, order_time, [(dish_name, servings), ...])
+        self._snapshot = {}
+        self._seq = 0
+        self._journal = None
+        self._thread = None
+        self._running = False
+
+    # Startup / shutdown
+
+    def _ensure_tables(self):
+        with get_cursor(commit=True) as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS order_journal_state (
+              journal varchar(255) NOT NULL,
+              last_seq bigint NOT NULL,
+              PRIMARY KEY (journal)
+            );
+            """)
+
+    def _claim_journal(self):
+        # The lock sits in a side file because flushes replace the journal itself
+        base = self.journal_path
+        for slot in itertools.count():
+            path = base if slot == 0 else f"{base}.{slot}"
+            lock = open(path + ".lock", "a")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                continue
+            self._journal_lock = lock
+            self.journal_path = path
+            self.journal_name = os.path.basename(path)
+            return
+
+    def _last_flushed_seq(self):
+        with get_cursor() as cursor:
+            cursor.execute("SELECT last_seq FROM order_journal_state WHERE journal = %s;", (self.journal_name,))
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def _replay_journal(self):
+        last_seq = self._last_flushed_seq()
+        self._seq = last_seq
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        replayed = 0
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn final write from the crash
+                self._seq = max(self._seq, entry["seq"])
+                if entry["seq"] <= last_seq:
+                    continue
+                orders = [tuple(order) for order in entry["orders"]]
+                self._pending.append((entry["seq"], datetime.fromisoformat(entry["time"]), orders))
+                replayed += 1
+        return replayed
+
+    def start(self):
+        if self._running:
+            return
+        if self.journal_path:
+            self._ensure_tables()
+            self._claim_journal()
+            replayed = self._replay_journal()
+            if replayed:
+                print(f"Replaying {replayed} journaled order batches")
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self.refresh_snapshot()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        if self._journal_lock:
+            self._journal_lock.close()
+            self._journal_lock = None
+
+    # Accepting orders
+
+    def refresh_snapshot(self):
+        """Reload stock from the database, minus what is accepted but not yet flushed."""
+        with get_cursor() as cursor:
+            cursor.execute("SELECT ingredient, quantity FROM inventory;")
+            stock = {ingredient: quantity or 0 for ingredient, quantity in cursor.fetchall()}
+        with self._lock:
+            for _, _, orders in self._pending:
+                for ingredient, quantity in aggregate_orders(orders)[1].items():
+                    if ingredient in stock:
+                        stock[ingredient] -= quantity
+            self._snapshot = stock
+
+    def accept(self, orders):
+        """Check `orders` against the snapshot and queue them. Raises ValueError if short."""
+        servings_by_dish, required_ingredients = aggregate_orders(orders)
+        order_time = datetime.now()
+        with self._lock:
+            for ingredient, required_quantity in required_ingredients.items():
+                if ingredient not in self._snapshot:
+                    raise ValueError(f"Ingredient '{ingredient}' not found in inventory.")
+                if self._snapshot[ingredient] < required_quantity:
+                    raise ValueError(f"Not enough '{ingredient}' in inventory. Required: {required_quantity}, Available: {self._snapshot[ingredient]}")
+            for ingredient, required_quantity in required_ingredients.items():
+                self._snapshot[ingredient] -= required_quantity
+
+            self._seq += 1
+            if self._journal:
+                entry = {"seq": self._seq, "time": order_time.isoformat(), "orders": orders}
+                self._journal.write(json.dumps(entry) + "\n")
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            self._pending.append((self._seq, order_time, list(orders)))
+            waiting = len(self._pending)
+
+        if waiting >= self.flush_size:
+            self._wake.set()
+        return servings_by_dish
+
+    # Flushing
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as err:
+                print(f"Order flush failed, will retry: {err}")
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+
+            try:
+                written = self._write(batch)
+            except ValueError:
+                # Some entry can't be posted any more; post them one by one and
+                # set the failing ones aside so they don't block the rest
+                written = 0
+                for entry in batch:
+                    try:
+                        written += self._write([entry])
+                    except ValueError as err:
+                        self._dead_letter(entry, err)
+                        self._write([entry], post=False)
+
+            # Pick up stock changes made by other writers (image intake, other workers)
+            self.refresh_snapshot()
+        return written
+
+    def _write(self, entries, post=True):
+        """Post `entries` in one transaction and drop them from the journal.
+        With post=False they are only marked as done."""
+        orders = []
+        order_times = []
+        if post:
+            for _, order_time, entry_orders in entries:
+                orders.extend(entry_orders)
+                order_times.extend([order_time] * len(entry_orders))
+        last_seq = entries[-1][0]
+
+        changed = []
+        with get_cursor(commit=True) as cursor:
+            if orders:
+                apply_orders(cursor, orders, order_times, strict=False)
+                changed = inventory_events.changed_rows(cursor, aggregate_orders(orders)[1])
+            if self.journal_name:
+                cursor.execute("""
+                INSERT INTO order_journal_state (journal, last_seq) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE last_seq = VALUES(last_seq);
+                """, (self.journal_name, last_seq))
+        if orders:
+            tables_changed("inventory", "sales")
+            inventory_events.publish(changed)
+
+        with self._lock:
+            self._pending = [entry for entry in self._pending if entry[0] > last_seq]
+            if self._journal:
+                self._rewrite_journal()
+        return len(orders)
+
+    def _dead_letter(self, entry, err):
+        seq, order_time, orders = entry
+        print(f"Order batch {seq} from {order_time} can't be posted and was set aside: {err} {orders}")
+        if self.journal_path:
+            with open(self.journal_path + ".dead", "a", encoding="utf-8") as dead:
+                dead.write(json.dumps({"seq": seq, "time": order_time.isoformat(), "orders": orders, "error": str(err)}) + "\n")
+
+    def _rewrite_journal(self):
+        # Keep only what is still pending; rename makes the swap atomic
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as tmp:
+            for seq, order_time, orders in self._pending:
+                tmp.write(json.dumps({"seq": seq, "time": order_time.isoformat(), "orders": orders}) + "\n")
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        self._journal.close()
+        os.replace(tmp_path, self.journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+
+order_writer = None
+if os.getenv("OrderWriteBehind", "0") == "1":
+    order_writer = OrderWriteBehind(
+        flush_interval=float(os.getenv("OrderFlushInterval", 1.0)),
+        flush_size=int(os.getenv("OrderFlushSize", 200)),
+        journal_path=os.getenv("OrderJournal") or None,
+    )
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+
+from Connect_MySQL import *
+from Table_Versions import tables_changed
+
+
+class RecipeStore:
+    """In-process copy of the `menu` table with parsed recipes.
+
+    The menu is loaded once and indexed by dish name and by ingredient
+    (ingredient -> dishes that use it). A cheap checksum query runs at most
+    every `check_interval` seconds to pick up edits made outside this process;
+    code that writes to `menu` should call `invalidate()` right away.
+    """
+
+    VERSION_QUERY = """
+        SELECT COUNT(*), MAX(id),
+               BIT_XOR(CRC32(CONCAT_WS('|', id, dish_name, ingredients, price, category, vegetarian, img_link)))
+        FROM menu;
+    """
+
+    def __init__(self, check_interval=30):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def _load(self, cursor):
+        cursor.execute("SELECT dish_name, price, ingredients, category, vegetarian, img_link FROM menu;")
+        column_names = [desc[0] for desc in cursor.description]
+
+        menu = []
+        recipes = {}
+        by_ingredient = {}
+        for row in cursor.fetchall():
+            row_dict = dict(zip(column_names, row))
+            ingredients = json.loads(row_dict['ingredients']) if row_dict['ingredients'] else {}
+            recipes[row_dict['dish_name']] = ingredients
+            for ingredient in ingredients:
+                by_ingredient.setdefault(ingredient, []).append(row_dict['dish_name'])
+            # Get_Menu only exposes the ingredient names
+            row_dict['ingredients'] = list(ingredients.keys())
+            menu.append(row_dict)
+
+        return {"menu": menu, "recipes": recipes, "by_ingredient": by_ingredient}
+
+    def _current(self):
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is not None and now - self._checked_at < self.check_interval:
+                return self._snapshot
+            with get_cursor() as cursor:
+                cursor.execute(self.VERSION_QUERY)
+                version = cursor.fetchone()
+                if self._snapshot is None or version != self._version:
+                    self._snapshot = self._load(cursor)
+                    self._version = version
+                    tables_changed("menu")
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        """Force a reload on next access. Call after writing to `menu`."""
+        with self._lock:
+            self._snapshot = None
+            self._version = None
+
+    def menu(self):
+        return list(self._current()["menu"])
+
+    def recipes(self):
+        """{dish_name: {ingredient: quantity per serving}}"""
+        return self._current()["recipes"]
+
+    def ingredients_for(self, dish_name):
+        return self._current()["recipes"].get(dish_name)
+
+    def dishes_using(self, ingredient):
+        return list(self._current()["by_ingredient"].get(ingredient, []))
+
+
+recipe_store = RecipeStore(check_interval=float(os.getenv("MenuCheckInterval", 30)))
@@ -0,0 +1,243 @@
+import bisect
+import heapq
+import os
+import threading
+import time
+
+from Connect_MySQL import *
+from Recipe_Store import recipe_store
+from Table_Versions import table_versions
+
+
+class RecommendationEngine:
+    """Ranks dishes by how much soon-to-expire stock they use up.
+
+    Inventory is kept in memory with an expiry index, a list of
+    (remaining_life, ingredient) kept sorted, so the ingredients to use soon
+    are a prefix found with one bisect. Dishes with an urgent ingredient
+    (remaining_life < `urgent_days`) sit in a second sorted list, best first.
+    `apply()` takes the inventory rows a write just changed (the same rows
+    Inventory_Events pushes to the dashboards) and only re-ranks the dishes
+    that use those ingredients, so a request reads the top of the ranking
+    instead of scanning the whole menu.
+
+    Scores follow the recommendation page: 3 points per urgent ingredient,
+    2 per ingredient the user picked, ties broken by how close to expiry the
+    urgent ingredients are. Discounts go up to `max_discount` percent as an
+    ingredient nears the end of its max_life, averaged over the dish's urgent
+    ingredients and rounded to 5%.
+
+    Everything is reloaded when the menu changes or after `refresh_interval`
+    seconds, to pick up writes made by other processes.
+    """
+
+    def __init__(self, urgent_days=5, max_discount=30, refresh_interval=60):
+        self.urgent_days = urgent_days
+        self.max_discount = max_discount
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._items = {}            # ingredient key -> inventory row
+        self._expiry = []           # sorted (remaining_life, ingredient key)
+        self._dishes = {}           # dish_name -> menu row
+        self._ingredients = {}      # dish_name -> ingredient keys
+        self._by_ingredient = {}    # ingredient key -> dish names
+        self._urgent_dishes = {}    # dish_name -> urgent ingredient keys
+        self._ranking = []          # sorted (-score, -urgency, dish_name) of dishes with urgent stock
+        self._rank = {}             # dish_name -> its entry in _ranking
+        self._menu_version = None
+        self._loaded_at = None
+
+    # Loading
+
+    @staticmethod
+    def _key(ingredient):
+        # The recommendation page matches names case-insensitively
+        return ingredient.strip().lower()
+
+    def _fetch(self):
+        with get_cursor() as cursor:
+            cursor.execute("SELECT ingredient, quantity, remaining_life, max_life, quality, last_updated FROM inventory;")
+            column_names = [desc[0] for desc in cursor.description]
+            return [dict(zip(column_names, row)) for row in cursor.fetchall()]
+
+    def rebuild(self, inventory, menu):
+        """Index `inventory` rows and Get_Menu-style `menu` rows from scratch."""
+        versions, _ = table_versions.snapshot(("menu",))
+        with self._lock:
+            # Indexed from the deduplicated dishes, so a name listed twice isn't matched twice
+            self._dishes = {dish["dish_name"]: dish for dish in menu}
+            self._ingredients = {
+                dish_name: {self._key(ingredient) for ingredient in dish["ingredients"]}
+                for dish_name, dish in self._dishes.items()
+            }
+            self._by_ingredient = {}
+            for dish_name, keys in self._ingredients.items():
+                for key in keys:
+                    self._by_ingredient.setdefault(key, []).append(dish_name)
+
+            self._items = {}
+            self._expiry = []
+            self._urgent_dishes = {}
+            self._ranking = []
+            self._rank = {}
+            for row in inventory:
+                self._set_item(dict(row))
+            self._menu_version = versions
+            self._loaded_at = time.monotonic()
+
+    def refresh(self):
+        self.rebuild(self._fetch(), recipe_store.menu())
+
+    def _current(self):
+        versions, _ = table_versions.snapshot(("menu",))
+        if (
+            self._loaded_at is None
+            or versions != self._menu_version
+            or time.monotonic() - self._loaded_at > self.refresh_interval
+        ):
+            self.refresh()
+
+    # Incremental updates
+
+    def _is_urgent(self, row):
+        return row.get("remaining_life") is not None and row["remaining_life"] < self.urgent_days
+
+    def _set_item(self, row):
+        key = self._key(row["ingredient"])
+        old = self._items.get(key)
+        if old is not None and old.get("remaining_life") is not None:
+            index = bisect.bisect_left(self._expiry, (old["remaining_life"], key))
+            if index < len(self._expiry) and self._expiry[index] == (old["remaining_life"], key):
+                del self._expiry[index]
+
+        # Deltas carry no max_life or last_updated, keep what we had
+        item = dict(old or {}, **row)
+        self._items[key] = item
+        if item.get("remaining_life") is not None:
+            bisect.insort(self._expiry, (item["remaining_life"], key))
+
+        was_urgent = old is not None and self._is_urgent(old)
+        is_urgent = self._is_urgent(item)
+        if not (was_urgent or is_urgent):
+            return
+        for dish_name in self._by_ingredient.get(key, ()):
+            urgent = self._urgent_dishes.setdefault(dish_name, set())
+            if is_urgent:
+                urgent.add(key)
+            else:
+                urgent.discard(key)
+            self._rerank(dish_name)
+
+    def _rerank(self, dish_name):
+        old = self._rank.pop(dish_name, None)
+        if old is not None:
+            del self._ranking[bisect.bisect_left(self._ranking, old)]
+        urgent = self._urgent_dishes.get(dish_name)
+        if not urgent:
+            self._urgent_dishes.pop(dish_name, None)
+            return
+        entry = (-3 * len(urgent), -self._urgency(urgent), dish_name)
+        self._rank[dish_name] = entry
+        bisect.insort(self._ranking, entry)
+
+    def apply(self, rows):
+        """Update the index with changed inventory rows ({ingredient, remaining_life, ...})."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            for row in rows:
+                self._set_item(row)
+
+    # Queries
+
+    def discount(self, key):
+        item = self._items.get(key)
+        if item is None or not self._is_urgent(item):
+            return 0
+        max_life = item.get("max_life") or self.urgent_days
+        left = min(max(item["remaining_life"] / max_life, 0), 1)
+        return round((1 - left) * self.max_discount)
+
+    def use_soon(self, limit=None):
+        """Urgent ingredients, soonest to expire first."""
+        end = bisect.bisect_left(self._expiry, (self.urgent_days,))
+        if limit is not None:
+            end = min(end, limit)
+        return [
+            {
+                "ingredient": self._items[key]["ingredient"],
+                "quantity": self._items[key].get("quantity"),
+                "remaining_life": remaining_life,
+                "max_life": self._items[key].get("max_life"),
+                "quality": self._items[key].get("quality"),
+                "last_updated": self._items[key].get("last_updated"),
+                "discount": self.discount(key),
+            }
+            for remaining_life, key in self._expiry[:end]
+        ]
+
+    def _urgency(self, keys):
+        # Closer to expiry weighs more; 1.0 means the ingredient is already spent
+        total = 0.0
+        for key in keys:
+            item = self._items[key]
+            max_life = item.get("max_life") or self.urgent_days
+            total += 1 - min(max(item["remaining_life"] / max_life, 0), 1)
+        return total
+
+    def _describe(self, dish_name, selected):
+        dish = self._dishes[dish_name]
+        keys = self._ingredients[dish_name]
+        urgent = self._urgent_dishes.get(dish_name, set())
+        matched = keys & selected
+        discounts = [self.discount(key) for key in urgent]
+        discount = round(sum(discounts) / len(discounts) / 5) * 5 if discounts else 0
+        price = dish.get("price") or 0
+        return dict(
+            dish,
+            matched=sorted(self._items[key]["ingredient"] if key in self._items else key for key in matched),
+            urgent=sorted(self._items[key]["ingredient"] for key in urgent),
+            score=2 * len(matched) + 3 * len(urgent),
+            discount=discount,
+            discounted_price=round(price - price * discount / 100, 2),
+        )
+
+    def recommend(self, top_k=10, ingredients=None):
+        """Top `top_k` dishes for the urgent stock, optionally favouring `ingredients`.
+
+        Dishes using a picked ingredient are scored on the spot; the rest
+        come off the top of the precomputed ranking.
+        """
+        self._current()
+        selected = {self._key(ingredient) for ingredient in ingredients or ()}
+        with self._lock:
+            matched = {}
+            for key in selected:
+                for dish_name in self._by_ingredient.get(key, ()):
+                    matched[dish_name] = matched.get(dish_name, 0) + 1
+
+            entries = []
+            for dish_name, count in matched.items():
+                score, urgency, _ = self._rank.get(dish_name, (0, 0.0, dish_name))
+                entries.append((score - 2 * count, urgency, dish_name))
+            taken = 0
+            for entry in self._ranking:
+                if taken == top_k:
+                    break
+                if entry[2] not in matched:
+                    entries.append(entry)
+                    taken += 1
+
+            best = heapq.nsmallest(top_k, entries)
+            return {
+                "dishes": [self._describe(dish_name, selected) for _, _, dish_name in best],
+                "use_soon": self.use_soon(),
+                # Dishes with a non-zero score: urgent stock, a picked ingredient, or both
+                "candidates": len(self._rank.keys() | matched.keys()),
+            }
+
+recommendation_engine = RecommendationEngine(
+    urgent_days=float(os.getenv("UrgentDays", 5)),
+    max_discount=float(os.getenv("MaxDiscount", 30)),
+    refresh_interval=float(os.getenv("RecommendationRefresh", 60)),
+)
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+import asyncio
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from Table_Versions import table_versions
+
+
+class ResponseCache:
+    """Serialized JSON responses keyed by endpoint and query parameters.
+
+    An entry is reused while the versions of the tables it was built from are
+    unchanged (and, when a `ttl` is given, it is younger than that). Responses
+    carry an ETag and Last-Modified so browsers can revalidate with a cheap
+    304. A request with `Cache-Control: no-cache` always rebuilds.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.stats = {}
+
+    def _count(self, path, outcome):
+        counters = self.stats.setdefault(path, {"hit": 0, "miss": 0, "not_modified": 0})
+        counters[outcome] += 1
+
+    def _not_modified(self, request, etag, modified):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def respond(self, request: Request, tables, producer, *args, ttl=None):
+        path = request.url.path
+        key = (path, tuple(sorted(request.query_params.multi_items())), args)
+        versions, modified = table_versions.snapshot(tables)
+        no_cache = "no-cache" in request.headers.get("cache-control", "")
+
+        entry = self._entries.get(key)
+        fresh = (
+            entry is not None
+            and not no_cache
+            and entry["versions"] == versions
+            and (ttl is None or time.monotonic() - entry["built"] < ttl)
+        )
+        if fresh:
+            self._entries.move_to_end(key)
+        else:
+            # Versions are read before building, so a write racing the build
+            # leaves the entry stale rather than wrongly fresh
+            result = await asyncio.to_thread(producer, *args)
+            body = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode()
+            entry = {
+                "versions": versions,
+                "built": time.monotonic(),
+                "body": body,
+                "etag": '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"',
+                "last_modified": formatdate(modified, usegmt=True),
+                "modified": modified,
+            }
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        headers = {
+            "ETag": entry["etag"],
+            "Last-Modified": entry["last_modified"],
+            "Cache-Control": "no-cache",  # Browsers keep it but always revalidate
+        }
+        if self._not_modified(request, entry["etag"], entry["modified"]):
+            self._count(path, "not_modified")
+            return Response(status_code=304, headers=headers)
+
+        self._count(path, "hit" if fresh else "miss")
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+    def report(self):
+        report = {}
+        for path, counters in self.stats.items():
+            total = sum(counters.values())
+            served_from_cache = counters["hit"] + counters["not_modified"]
+            report[path] = dict(counters, hit_rate=round(served_from_cache / total, 3) if total else 0.0)
+        return {"entries": len(self._entries), "endpoints": report}
+
+
+response_cache = ResponseCache()
@@ -1,84 +1,91 @@
 from Connect_MySQL import * 
 from datetime import datetime
+from Recipe_Store import recipe_store
+from Sales_Rollups import add_sales, read_sales
+from Table_Versions import tables_changed
+from Inventory_Events import inventory_events
+from Inventory_Ledger import record as record_ledger
+from datetime import date, timedelta
 
 def Get_Menu():
-    query = "SELECT dish_name, price, ingredients, category, vegetarian, img_link FROM menu;"
-    cursor.execute(query)
-    results = cursor.fetchall()
-    
-    # Fetch column names dynamically from the cursor description
-    column_names = [desc[0] for desc in cursor.description]
-    
-    # Convert each row into a dictionary
-    dict_results = []
-    for row in results:
-        row_dict = dict(zip(column_names, row))
-        # Parse the ingredients JSON string into a list of keys
-        row_dict['ingredients'] = list(eval(row_dict['ingredients']).keys())
-        dict_results.append(row_dict)
-    
-    return dict_results
+    # Served from the in-process recipe store, the menu table is only re-read when it changes
+    return recipe_store.menu()
 
-def get_Weekly_sales():
-    query = """
-    SELECT date, dish_name, sales 
-    FROM sales_data 
-    WHERE date >= CURDATE() - INTERVAL 7 DAY;
-    """
-    cursor.execute(query)
-    results = cursor.fetchall()
-    
-    # Fetch column names dynamically from the cursor description
-    column_names = [desc[0] for desc in cursor.description]
-    
-    # Convert each row into a dictionary
-    dict_results = [dict(zip(column_names, row)) for row in results]
-    
-    # print(dict_results)
-    return dict_results
+def months_ago(day, n):
+    # Same calendar day n months back, clamped to the end of shorter months
+    month_index = day.year * 12 + day.month - 1 - n
+    year, month = divmod(month_index, 12)
+    next_month = date(year + (month + 1) // 12, (month + 1) % 12 + 1, 1)
+    return date(year, month + 1, min(day.day, (next_month - timedelta(days=1)).day))
 
-def get_monthly_sales():
-    query = """
-    SELECT date, dish_name, sales 
-    FROM sales_data 
-    WHERE MONTH(date) = MONTH(CURDATE()) AND YEAR(date) = YEAR(CURDATE());
-    """
-    cursor.execute(query)
-    results = cursor.fetchall()
-    
-    # Fetch column names dynamically from the cursor description
-    column_names = [desc[0] for desc in cursor.description]
-    
-    # Convert each row into a dictionary
-    dict_results = [dict(zip(column_names, row)) for row in results]
-    
-    # print(dict_results)
-    return dict_results
+def get_Weekly_sales(group=None):
+    # Last 7 days, read from the daily rollup
+    return read_sales(date.today() - timedelta(days=7), group=group)
+
+def get_monthly_sales(group=None):
+    # Current calendar month
+    today = date.today()
+    return read_sales(today.replace(day=1), group=group)
 
-def get_sales_last_n_months(n):
-    query = f"""
-    SELECT date, dish_name, sales 
-    FROM sales_data 
-    WHERE date >= DATE_SUB(CURDATE(), INTERVAL {n} MONTH);
+def get_sales_last_n_months(n, group=None):
+    return read_sales(months_ago(date.today(), n), group=group)
+
+SALES_PAGE_QUERY = """
+    SELECT id, date, dish_name, sales
+    FROM sales_data
+    WHERE date >= %s AND (date > %s OR (date = %s AND id > %s))
+    ORDER BY date, id
+"""
+
+def iter_sales_last_n_months(n, after_date=None, after_id=0, chunk_size=2000):
+    """Stream (id, date, dish_name, sales) rows in (date, id) order.
+
+    Uses an unbuffered cursor and fetchmany(), so only one chunk is held in
+    memory at a time. The pooled connection stays checked out until the
+    generator is exhausted or closed.
     """
-    cursor.execute(query)
-    results = cursor.fetchall()
-    
-    # Fetch column names dynamically from the cursor description
-    column_names = [desc[0] for desc in cursor.description]
-    
-    # Convert each row into a dictionary
-    dict_results = [dict(zip(column_names, row)) for row in results]
-    
-    return dict_results
+    start = months_ago(date.today(), n)
+    after_date = after_date or start - timedelta(days=1)
+    with get_cursor(buffered=False) as cursor:
+        cursor.execute(SALES_PAGE_QUERY, (start, after_date, after_date, after_id))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+def get_sales_page(n, after_date=None, after_id=0, limit=1000):
+    """One page of the last n months, plus the cursor for the next page."""
+    start = months_ago(date.today(), n)
+    after_date = after_date or start - timedelta(days=1)
+    with get_cursor() as cursor:
+        cursor.execute(SALES_PAGE_QUERY + " LIMIT %s", (start, after_date, after_date, after_id, limit))
+        rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) == limit:
+        last_id, last_date = rows[-1][0], rows[-1][1]
+        next_cursor = {"after_date": last_date.isoformat(), "after_id": last_id}
+    return rows, next_cursor
+
+def sales_rows_to_columnar(rows):
+    """Column arrays with dish names dictionary-encoded: dish[i] indexes into dishes."""
+    dishes = {}
+    return {
+        "dates": [row[1].isoformat() for row in rows],
+        "dish": [dishes.setdefault(row[2], len(dishes)) for row in rows],
+        "sales": [row[3] for row in rows],
+        "dishes": list(dishes),
+    }
 
 def get_inventory():
     query = "SELECT *, TIMESTAMPDIFF(SECOND, last_updated, NOW()) AS time_diff_seconds FROM inventory;"
-    cursor.execute(query)
-    results = cursor.fetchall()
+    with get_cursor() as cursor:
+        cursor.execute(query)
+        results = cursor.fetchall()
     
-    # Fetch column names dynamically from the cursor description
-    column_names = [desc[0] for desc in cursor.description]
+        # Fetch column names dynamically from the cursor description
+        column_names = [desc[0] for desc in cursor.description]
     
     # Convert each row into a dictionary
     dict_results = []
@@ -107,11 +114,12 @@ def get_Prediction():
     SELECT * 
     FROM sales_predictions 
     """
-    cursor.execute(query)
-    results = cursor.fetchall()
+    with get_cursor() as cursor:
+        cursor.execute(query)
+        results = cursor.fetchall()
     
-    # Fetch column names dynamically from the cursor description
-    column_names = [desc[0] for desc in cursor.description]
+        # Fetch column names dynamically from the cursor description
+        column_names = [desc[0] for desc in cursor.description]
     
     # Convert each row into a dictionary
     dict_results = [dict(zip(column_names, row)) for row in results]
@@ -119,67 +127,127 @@ def get_Prediction():
     # print(dict_results)
     return dict_results
 
-def update_inventory_for_dish(dish_name, servings):
-    # Fetch the ingredients and their quantities for the dish
-    query = "SELECT ingredients FROM menu WHERE dish_name = %s;"
-    cursor.execute(query, (dish_name,))
-    result = cursor.fetchone()
-    
-    if not result:
-        raise ValueError(f"Dish '{dish_name}' not found in the menu.")
-    
-    ingredients = eval(result[0])  # Parse the JSON string into a dictionary
-    
-    # Calculate the total quantity needed for the given servings
-    required_ingredients = {key: value * servings for key, value in ingredients.items()}
-    
-    # Fetch the current inventory
-    query = "SELECT ingredient, quantity FROM inventory;"
-    cursor.execute(query)
-    inventory = {row[0]: row[1] for row in cursor.fetchall()}
-    
-    # Check if there is enough inventory and update it
-    for ingredient, required_quantity in required_ingredients.items():
-        if ingredient not in inventory:
-            raise ValueError(f"Ingredient '{ingredient}' not found in inventory.")
-        if inventory[ingredient] < required_quantity:
-            raise ValueError(f"Not enough '{ingredient}' in inventory. Required: {required_quantity}, Available: {inventory[ingredient]}")
-        inventory[ingredient] -= required_quantity
-    
-    # Update the inventory in the database
-    for ingredient, new_quantity in inventory.items():
-        query = "UPDATE inventory SET quantity = %s WHERE ingredient = %s;"
-        cursor.execute(query, (new_quantity, ingredient))
-    
-    # Get current date
-    current_date = datetime.today().date()
-    day = current_date.weekday() + 1  # Monday=1, Sunday=7
-    month = current_date.month
-    is_weekend = 1 if day in [6, 7] else 0
-    is_holiday = 0  # Modify this if you have a holiday list
-    
-    # Check if the dish already has sales data for today
-    query = "SELECT id, sales FROM sales_data WHERE date = %s AND dish_name = %s;"
-    cursor.execute(query, (current_date, dish_name))
-    result = cursor.fetchone()
-    
-    if result:
-        # If the dish is already in sales_data for today, update sales count
-        sales_id, current_sales = result
-        new_sales = current_sales + servings
-        query = "UPDATE sales_data SET sales = %s WHERE id = %s;"
-        cursor.execute(query, (new_sales, sales_id))
-    else:
-        # Insert new record if no entry exists for today
-        query = """
-        INSERT INTO sales_data (date, day, month, is_weekend, is_holiday, dish_name, sales)
-        VALUES (%s, %s, %s, %s, %s, %s, %s);
+def aggregate_orders(orders):
+    """Total servings per dish and total quantity needed per ingredient."""
+    servings_by_dish = {}
+    for dish_name, servings in orders:
+        if servings <= 0:
+            raise ValueError(f"Servings for '{dish_name}' must be positive.")
+        servings_by_dish[dish_name] = servings_by_dish.get(dish_name, 0) + servings
+
+    required_ingredients = {}
+    for dish_name, servings in servings_by_dish.items():
+        # Fetch the ingredients and their quantities for the dish
+        ingredients = recipe_store.ingredients_for(dish_name)
+        if ingredients is None:
+            raise ValueError(f"Dish '{dish_name}' not found in the menu.")
+        for ingredient, quantity in ingredients.items():
+            required_ingredients[ingredient] = required_ingredients.get(ingredient, 0) + quantity * servings
+
+    return servings_by_dish, required_ingredients
+
+def apply_orders(cursor, orders, order_times=None, strict=True):
+    """Write a batch of (dish_name, servings) orders using an open cursor.
+
+    Only the ingredients the dishes use are touched, with a single CASE
+    UPDATE. With `strict` the UPDATE refuses to take any ingredient below
+    zero and a shortage raises ValueError; otherwise quantities are clamped at
+    zero (used when the orders were already accepted against a snapshot).
+    Each dish's daily sales_data row is upserted and every order is recorded
+    in `orders`. `order_times` optionally gives the time each order was taken.
+    What was taken off each ingredient is appended to the inventory ledger.
+    """
+    servings_by_dish, required_ingredients = aggregate_orders(orders)
+
+    # Only these rows are touched; the UPDATE locks them in key order. MySQL
+    # counts changed rows only, so zero-quantity ingredients are left out or
+    # the rowcount check below would always fail for them.
+    ingredients = sorted(ingredient for ingredient, quantity in required_ingredients.items() if quantity)
+    cases = " ".join(["WHEN %s THEN %s"] * len(ingredients))
+    placeholders = ", ".join(["%s"] * len(ingredients))
+    case_params = [value for ingredient in ingredients for value in (ingredient, required_ingredients[ingredient])]
+
+    if ingredients and strict:
+        query = f"""
+        UPDATE inventory
+        SET quantity = quantity - (CASE ingredient {cases} END)
+        WHERE ingredient IN ({placeholders})
+          AND quantity >= (CASE ingredient {cases} END);
         """
-        cursor.execute(query, (current_date, day, month, is_weekend, is_holiday, dish_name, servings))
-    
-    # Commit the changes
-    db.commit()
-    
+        cursor.execute(query, case_params + ingredients + case_params)
+
+        if cursor.rowcount != len(ingredients):
+            # Something is missing or short: undo the partial update and find out what
+            cursor.connection.rollback()
+            cursor.execute(f"SELECT ingredient, quantity FROM inventory WHERE ingredient IN ({placeholders});", ingredients)
+            inventory = {row[0]: row[1] for row in cursor.fetchall()}
+            for ingredient in ingredients:
+                if ingredient not in inventory:
+                    raise ValueError(f"Ingredient '{ingredient}' not found in inventory.")
+                if inventory[ingredient] < required_ingredients[ingredient]:
+                    raise ValueError(f"Not enough '{ingredient}' in inventory. Required: {required_ingredients[ingredient]}, Available: {inventory[ingredient]}")
+            raise ValueError("Inventory changed while posting the order, please retry.")
+        record_ledger(cursor, {ingredient: -required_ingredients[ingredient] for ingredient in ingredients}, "order")
+    elif ingredients:
+        # Clamped at zero, so read what is there to log what was really taken
+        cursor.execute(f"SELECT ingredient, quantity FROM inventory WHERE ingredient IN ({placeholders}) FOR UPDATE;", ingredients)
+        required_by_key = {ingredient.lower(): quantity for ingredient, quantity in required_ingredients.items()}
+        taken = {
+            ingredient: -min(max(quantity or 0, 0), required_by_key[ingredient.lower()])
+            for ingredient, quantity in cursor.fetchall()
+        }
+        query = f"""
+        UPDATE inventory
+        SET quantity = GREATEST(quantity - (CASE ingredient {cases} END), 0)
+        WHERE ingredient IN ({placeholders});
+        """
+        cursor.execute(query, case_params + ingredients)
+        record_ledger(cursor, taken, "order")
+
+    # Add the servings to each dish's daily sales row
+    order_times = order_times or [datetime.now()] * len(orders)
+    sales = {}
+    for (dish_name, servings), order_time in zip(orders, order_times):
+        key = (order_time.date(), dish_name)
+        sales[key] = sales.get(key, 0) + servings
+
+    rows = []
+    for (order_date, dish_name), servings in sales.items():
+        day = order_date.weekday() + 1  # Monday=1, Sunday=7
+        is_weekend = 1 if day in [6, 7] else 0
+        is_holiday = 0  # Modify this if you have a holiday list
+        rows.append((order_date, day, order_date.month, is_weekend, is_holiday, dish_name, servings))
+
+    query = """
+    INSERT INTO sales_data (date, day, month, is_weekend, is_holiday, dish_name, sales)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE sales = sales + VALUES(sales);
+    """
+    cursor.executemany(query, rows)
+    add_sales(cursor, sales)
+
+    # Keep the individual orders as well
+    cursor.executemany(
+        "INSERT INTO orders (dish_name, servings, order_time) VALUES (%s, %s, %s);",
+        [(dish_name, servings, order_time) for (dish_name, servings), order_time in zip(orders, order_times)],
+    )
+
+    return servings_by_dish
+
+def post_orders(orders):
+    """Post a batch of (dish_name, servings) orders in one transaction.
+
+    If any ingredient is short the whole batch is rolled back.
+    """
+    with get_cursor(commit=True) as cursor:
+        posted = apply_orders(cursor, orders)
+        changed = inventory_events.changed_rows(cursor, aggregate_orders(orders)[1])
+    tables_changed("inventory", "sales")
+    inventory_events.publish(changed)
+    return posted
+
+def update_inventory_for_dish(dish_name, servings):
+    post_orders([(dish_name, servings)])
     return f"Inventory updated and sales data recorded for {servings} servings of '{dish_name}'."
 
 # print(update_inventory_for_dish("Crispy Veggie Delight", 2))  # Example usage, replace with actual dish name and servings
\ No newline at end of file
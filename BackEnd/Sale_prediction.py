@@ -1,52 +1,277 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
 from Connect_MySQL import *
+from Table_Versions import tables_changed
+from Metrics import forecast_dish_seconds, forecast_job_seconds
+import Fast_Forecast
+
+FORECAST_DAYS = 10
+
+# Prepare data for Prophet
+def prepare_data(df, dish):
+    df_dish = df[df['dish_name'] == dish][['date', 'sales']]
+    df_dish = df_dish.rename(columns={'date': 'ds', 'sales': 'y'})
+    return df_dish
+
+def warm_start_params(model):
+    """Fitted parameters of `model` in the shape Prophet.fit(init=...) expects."""
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        params[name] = model.params[name][0][0]
+    for name in ['delta', 'beta']:
+        params[name] = model.params[name][0]
+    return params
+
+def predict_window(model, dish, start):
+    """(date, dish, predicted_sales) for the FORECAST_DAYS days from `start`."""
+    future = pd.DataFrame({'ds': pd.date_range(start, periods=FORECAST_DAYS, freq='D')})
+    forecast = model.predict(future)
+    return [(ds.date(), dish, float(yhat)) for ds, yhat in zip(forecast['ds'], forecast['yhat'])]
+
+def fit_dish(dish, data, previous_json=None, start=None):
+    """Fit one dish and return its next FORECAST_DAYS predictions.
+
+    Runs inside a worker process, so it only takes and returns plain data.
+    When the dish was fitted before, the optimizer starts from the previous
+    parameters instead of from scratch. Predictions cover the FORECAST_DAYS
+    from `start`, or the days right after the history when it isn't given.
+    """
+    started = time.perf_counter()
+    model = Prophet()
+    fit_args = {}
+    if previous_json:
+        try:
+            fit_args['init'] = warm_start_params(model_from_json(previous_json))
+        except (KeyError, IndexError, ValueError):
+            pass
+
+    try:
+        model.fit(data, **fit_args)
+    except (RuntimeError, ValueError):
+        # Parameter shapes no longer match (e.g. seasonality switched on), refit cold
+        model = Prophet()
+        model.fit(data)
+
+    if start is None:
+        start = data['ds'].max() + pd.Timedelta(days=1)
+    rows = predict_window(model, dish, start)
+    return dish, rows, time.perf_counter() - started, model_to_json(model)
+
+def extend_dish(dish, model_json, start):
+    """Roll an unchanged dish's forecast forward with its stored model, no refit."""
+    started = time.perf_counter()
+    rows = predict_window(model_from_json(model_json), dish, start)
+    return dish, rows, time.perf_counter() - started
+
+def ensure_forecast_tables():
+    with get_cursor(commit=True) as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS forecast_models (
+          dish_name varchar(255) NOT NULL,
+          model_json longtext,
+          history_at datetime(3) DEFAULT NULL,
+          updated_at timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+          PRIMARY KEY (dish_name)
+        );
+        """)
+        # Tables from before history_at watermarked on (last_date, last_id)
+        cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'forecast_models' AND column_name = 'history_at';
+        """)
+        if cursor.fetchone() is None:
+            cursor.execute("ALTER TABLE forecast_models ADD COLUMN history_at datetime(3) DEFAULT NULL;")
+
+def load_watermarks():
+    with get_cursor() as cursor:
+        cursor.execute("SELECT dish_name, history_at FROM forecast_models;")
+        return dict(cursor.fetchall())
+
+def find_changed_dishes(watermarks):
+    """Dishes whose sales history was written to after the watermark stored for them.
+
+    sales_data.updated_at moves on every insert and on every upsert of an
+    existing day (see Schema), so corrections to past days count as well as
+    new days. Only rows past the oldest watermark are read, through the
+    updated_at index, so a daily run touches roughly one day of sales.
+    """
+    if not watermarks or None in watermarks.values():
+        return None  # Some dish was never watermarked, refit everything once
+
+    with get_cursor() as cursor:
+        cursor.execute("""
+        SELECT dish_name, MAX(updated_at) FROM sales_data
+        WHERE updated_at > %s AND date < CURDATE()
+        GROUP BY dish_name;
+        """, (min(watermarks.values()),))
+        newest = cursor.fetchall()
 
-def predict_sales():
-    # Fetch sales data excluding today's sales
+    return [
+        dish for dish, updated_at in newest
+        if dish not in watermarks or updated_at > watermarks[dish]
+    ]
+
+def find_stale_forecasts(start, exclude):
+    """Dishes with a stored model whose predictions stop before the FORECAST_DAYS from `start`."""
+    with get_cursor() as cursor:
+        cursor.execute("""
+        SELECT m.dish_name, m.model_json FROM forecast_models m
+        LEFT JOIN (
+            SELECT dish_name, MAX(date) AS last_date FROM sales_predictions GROUP BY dish_name
+        ) p ON p.dish_name = m.dish_name
+        WHERE m.model_json IS NOT NULL
+          AND (p.last_date IS NULL OR p.last_date < %s + INTERVAL %s DAY);
+        """, (start, FORECAST_DAYS - 1))
+        return {dish: model_json for dish, model_json in cursor.fetchall() if dish not in exclude}
+
+def database_now():
+    with get_cursor() as cursor:
+        cursor.execute("SELECT NOW(3), CURDATE();")
+        return cursor.fetchone()
+
+def load_history(dishes):
     query = """
-    SELECT date, dish_name, sales FROM sales_data
-    WHERE date < CURDATE();
+    SELECT id, date, dish_name, sales FROM sales_data
+    WHERE date < CURDATE()
+    """
+    params = ()
+    if dishes is not None:
+        query += " AND dish_name IN (" + ", ".join(["%s"] * len(dishes)) + ")"
+        params = tuple(dishes)
+    with pool.connection() as conn:
+        return pd.read_sql(query, conn, params=params)
+
+def load_models(dishes):
+    with get_cursor() as cursor:
+        cursor.execute(
+            "SELECT dish_name, model_json FROM forecast_models WHERE dish_name IN ("
+            + ", ".join(["%s"] * len(dishes)) + ");",
+            tuple(dishes),
+        )
+        return dict(cursor.fetchall())
+
+def save_predictions(rows):
+    if not rows:
+        return
+    # One multi-row upsert for the whole job
+    with get_cursor(commit=True) as cursor:
+        cursor.executemany("""
+        INSERT INTO sales_predictions (date, dish_name, predicted_sales)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE predicted_sales = VALUES(predicted_sales);
+        """, rows)
+    tables_changed("predictions")
+
+def save_models(states):
+    if not states:
+        return
+    with get_cursor(commit=True) as cursor:
+        cursor.executemany("""
+        INSERT INTO forecast_models (dish_name, model_json, history_at)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE model_json = VALUES(model_json), history_at = VALUES(history_at);
+        """, states)
+
+def predict_sales_prophet(workers=None, full=False):
+    """Refit the dishes whose sales history changed since the last run.
+
+    With `full=True` (or on the first run) every dish is refitted from scratch.
     """
-    df = pd.read_sql(query, db)
+    job_start = time.perf_counter()
+    workers = workers or int(os.getenv("ForecastWorkers", os.cpu_count() or 1))
+    ensure_forecast_tables()
 
-    # Prepare data for Prophet
-    def prepare_data(df, dish):
-        df_dish = df[df['dish_name'] == dish][['date', 'sales']]
-        df_dish = df_dish.rename(columns={'date': 'ds', 'sales': 'y'})
-        return df_dish
+    # The history is read after this, so writes that race the read are refit next time
+    history_at, today = database_now()
+    watermarks = {} if full else load_watermarks()
+    changed = find_changed_dishes(watermarks)
 
-    # Get unique dish names
+    # Fetch sales data excluding today's sales, for the changed dishes only
+    if changed == []:
+        df = pd.DataFrame(columns=['id', 'date', 'dish_name', 'sales'])
+    else:
+        df = load_history(changed)
     dishes = df['dish_name'].unique()
+    previous = {} if full or not len(dishes) else load_models(list(dishes))
+    # Unchanged dishes keep their model, but their forecast still has to reach
+    # FORECAST_DAYS ahead of today
+    stale = find_stale_forecasts(today, set(dishes))
+    if not len(dishes) and not stale:
+        print("No new sales since the last forecast and every forecast is current.")
+        return {"dishes": 0, "extended": 0, "rows": 0, "seconds": time.perf_counter() - job_start, "dish_seconds": {}}
 
-    # Store predictions
-    predictions = {}
+    # Fit every dish in parallel. Spawned workers avoid forking the API
+    # process together with its torch/uvicorn threads.
+    all_rows = []
+    states = []
+    timings = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [
+            executor.submit(fit_dish, dish, prepare_data(df, dish), previous.get(dish), today)
+            for dish in dishes
+        ]
+        extensions = [executor.submit(extend_dish, dish, model_json, today) for dish, model_json in stale.items()]
+        for future in futures:
+            dish, rows, seconds, model_json = future.result()
+            all_rows.extend(rows)
+            timings[dish] = seconds
+            forecast_dish_seconds.set(round(seconds, 3), dish=dish)
+            states.append((dish, model_json, history_at))
+        for future in extensions:
+            dish, rows, seconds = future.result()
+            all_rows.extend(rows)
 
-    for dish in dishes:
-        data = prepare_data(df, dish)
-        model = Prophet()
-        model.fit(data)
-        
-        # Predict next 10 days
-        future = model.make_future_dataframe(periods=10)
-        forecast = model.predict(future)
-        
-        # Store predictions
-        predictions[dish] = forecast[['ds', 'yhat']].tail(10)
-
-        # Insert predictions into MySQL
-        for index, row in forecast.tail(10).iterrows():
-            cursor.execute("""
-            INSERT INTO sales_predictions (date, dish_name, predicted_sales)
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE predicted_sales = VALUES(predicted_sales);
-            """, (row['ds'], dish, row['yhat']))
-        db.commit()
-
-    # Display predictions
-    for dish, forecast in predictions.items():
-        print(f"Predicted sales for {dish} in the next 10 days:")
-        print(forecast)
-        print("-" * 50)
-
-    db.close()
+    write_start = time.perf_counter()
+    save_predictions(all_rows)
+    save_models(states)
+    write_seconds = time.perf_counter() - write_start
+
+    # Display timings
+    for dish, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"{dish:<40} fit+predict {seconds:6.2f}s")
+    print("-" * 50)
+    total = time.perf_counter() - job_start
+    print(f"Forecast {len(dishes)} dishes and rolled {len(stale)} forward with {workers} workers in {total:.2f}s "
+          f"(write {len(all_rows)} rows in {write_seconds:.2f}s)")
+
+    return {"dishes": len(dishes), "extended": len(stale), "rows": len(all_rows), "seconds": total, "dish_seconds": timings}
+
+def predict_sales_fast(method="ensemble"):
+    """Vectorized intraday re-forecast of every dish, cheap enough to run after a rush."""
+    job_start = time.perf_counter()
+    query = """
+    SELECT date, dish_name, sales, is_holiday FROM sales_data
+    WHERE date < CURDATE() AND date >= CURDATE() - INTERVAL %s DAY;
+    """
+    with pool.connection() as conn:
+        df = pd.read_sql(query, conn, params=(Fast_Forecast.HISTORY_WEEKS * 7,))
+    if df.empty:
+        return {"dishes": 0, "rows": 0, "seconds": time.perf_counter() - job_start}
+
+    rows = Fast_Forecast.forecast_sales(df, FORECAST_DAYS, method)
+    save_predictions(rows)
+    total = time.perf_counter() - job_start
+    print(f"Fast forecast ({method}) of {df['dish_name'].nunique()} dishes in {total:.3f}s")
+    return {"dishes": int(df['dish_name'].nunique()), "rows": len(rows), "seconds": total}
+
+FORECAST_BACKENDS = {
+    "prophet": predict_sales_prophet,
+    "fast": predict_sales_fast,
+}
+
+def predict_sales(backend=None, **kwargs):
+    """Run the forecast with `backend` (defaults to the ForecastBackend env, then Prophet)."""
+    backend = backend or os.getenv("ForecastBackend", "prophet")
+    if backend not in FORECAST_BACKENDS:
+        raise ValueError(f"Unknown forecast backend '{backend}'. Choose from {list(FORECAST_BACKENDS)}")
+    with forecast_job_seconds.time(backend=backend):
+        result = FORECAST_BACKENDS[backend](**kwargs)
+    # The API exports job metrics from job_runs.result, see JobRunner.sync
+    return dict(result, backend=backend)
@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+
+from Connect_MySQL import *
+
+# Pre-aggregated sales per dish per day, week (Monday) and month (1st).
+# Kept up to date by add_sales() in the same transaction that posts orders.
+ROLLUPS = {
+    "day": ("sales_daily", "date"),
+    "week": ("sales_weekly", "week_start"),
+    "month": ("sales_monthly", "month_start"),
+}
+
+# SQL expression that maps sales_data.date to each rollup's period
+PERIOD_SQL = {
+    "day": "date",
+    "week": "DATE_SUB(date, INTERVAL WEEKDAY(date) DAY)",
+    "month": "DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY)",
+}
+
+
+def period_start(day, period):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def ensure_rollup_tables():
+    """Create the rollup tables, backfilling them from sales_data the first time."""
+    # Workers starting together wait here, then find the tables already there
+    with named_lock("schema:rollups"):
+        created = []
+        with get_cursor(commit=True) as cursor:
+            for period, (table, column) in ROLLUPS.items():
+                cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s;", (table,))
+                if cursor.fetchone()[0]:
+                    continue
+                cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                  {column} date NOT NULL,
+                  dish_name varchar(255) NOT NULL,
+                  sales int NOT NULL DEFAULT 0,
+                  PRIMARY KEY ({column}, dish_name)
+                );
+                """)
+                created.append(period)
+        if created:
+            rebuild_sales_rollups(created)
+
+
+def rebuild_sales_rollups(periods=None):
+    """Recompute rollups from sales_data, e.g. after a bulk import or a manual fix."""
+    periods = periods or list(ROLLUPS)
+    with get_cursor(commit=True) as cursor:
+        for period in periods:
+            table, column = ROLLUPS[period]
+            cursor.execute(f"DELETE FROM {table};")
+            cursor.execute(f"""
+            INSERT INTO {table} ({column}, dish_name, sales)
+            SELECT {PERIOD_SQL[period]} AS period, dish_name, SUM(sales)
+            FROM sales_data
+            WHERE date IS NOT NULL AND dish_name IS NOT NULL
+            GROUP BY period, dish_name;
+            """)
+            print(f"Rebuilt {table}: {cursor.rowcount} rows")
+
+
+def add_sales(cursor, sales):
+    """Add {(date, dish_name): servings} to every rollup using an open cursor."""
+    for period, (table, column) in ROLLUPS.items():
+        totals = {}
+        for (day, dish_name), servings in sales.items():
+            key = (period_start(day, period), dish_name)
+            totals[key] = totals.get(key, 0) + servings
+        cursor.executemany(f"""
+        INSERT INTO {table} ({column}, dish_name, sales) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE sales = sales + VALUES(sales);
+        """, [(day, dish_name, servings) for (day, dish_name), servings in totals.items()])
+
+
+def read_sales(start, end=None, group=None):
+    """Sales with date in [start, end) from the rollups.
+
+    group=None     -> [{date, dish_name, sales}], the rows sales_data used to return
+    group="dish"   -> [{dish_name, sales}], totals over the range
+    group="day" / "week" / "month"
+                   -> [{period, dishes: [{dish_name, sales}]}]; week and month
+                      buckets are whole periods, so `start` is rounded down
+    """
+    if group not in (None, "dish", "day", "week", "month"):
+        raise ValueError(f"Unknown group '{group}'. Use dish, day, week or month.")
+    end = end or date.today() + timedelta(days=1)
+    if group in ("week", "month"):
+        start = period_start(start, group)
+    table, column = ROLLUPS[group if group in ROLLUPS else "day"]
+
+    with get_cursor() as cursor:
+        if group == "dish":
+            cursor.execute(f"""
+            SELECT dish_name, SUM(sales) FROM {table}
+            WHERE {column} >= %s AND {column} < %s
+            GROUP BY dish_name ORDER BY dish_name;
+            """, (start, end))
+            return [{"dish_name": dish_name, "sales": int(sales)} for dish_name, sales in cursor.fetchall()]
+
+        cursor.execute(f"""
+        SELECT {column}, dish_name, sales FROM {table}
+        WHERE {column} >= %s AND {column} < %s
+        ORDER BY {column}, dish_name;
+        """, (start, end))
+        rows = cursor.fetchall()
+
+    if group is None:
+        return [{"date": day, "dish_name": dish_name, "sales": sales} for day, dish_name, sales in rows]
+
+    grouped = []
+    for period, dish_name, sales in rows:
+        if not grouped or grouped[-1]["period"] != period:
+            grouped.append({"period": period, "dishes": []})
+        grouped[-1]["dishes"].append({"dish_name": dish_name, "sales": sales})
+    return grouped
@@ -0,0 +1,128 @@
+import base64
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+
+# cv2 is only imported to encode, so the API can serve stored scans without
+# loading the vision stack (see Subsystems)
+FORMATS = {
+    "jpg": (".jpg", "image/jpeg", "IMWRITE_JPEG_QUALITY"),
+    "webp": (".webp", "image/webp", "IMWRITE_WEBP_QUALITY"),
+    "png": (".png", "image/png", "IMWRITE_PNG_COMPRESSION"),
+}
+
+SCAN_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ScanStore:
+    """Annotated scan images, encoded once and looked up by scan id.
+
+    The newest `max_items` images (up to `max_bytes` in total) stay in memory.
+    Older ones are written to `spill_dir` when it is set, keeping at most
+    `spill_items` files there, and are dropped otherwise.
+    """
+
+    def __init__(self, max_items=64, max_bytes=64 * 1024 * 1024, spill_dir=None, spill_items=1000,
+                 image_format="jpg", quality=85):
+        if image_format not in FORMATS:
+            raise ValueError(f"Unknown image format '{image_format}'. Use {', '.join(FORMATS)}.")
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_items = spill_items
+        self.image_format = image_format
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._images = OrderedDict()  # scan_id -> encoded bytes
+        self._bytes = 0
+        self._spilled = OrderedDict()  # scan_id -> path
+        self.latest = None
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @property
+    def media_type(self):
+        return FORMATS[self.image_format][1]
+
+    def encode(self, image, image_format=None, quality=None):
+        import cv2
+
+        extension, _, quality_flag = FORMATS[image_format or self.image_format]
+        quality = self.quality if quality is None else quality
+        if quality_flag == "IMWRITE_PNG_COMPRESSION":
+            quality = min(9, max(0, (100 - quality) // 10))  # 0-100 quality -> 9-0 compression
+        ok, buffer = cv2.imencode(extension, image, [getattr(cv2, quality_flag), quality])
+        if not ok:
+            raise ValueError("Could not encode the annotated image")
+        return buffer.tobytes()
+
+    def put(self, image):
+        """Encode a BGR image and keep it; returns its scan id."""
+        data = self.encode(image)
+        scan_id = uuid.uuid4().hex
+        with self._lock:
+            self._images[scan_id] = data
+            self._bytes += len(data)
+            self.latest = scan_id
+            while len(self._images) > self.max_items or (self._bytes > self.max_bytes and len(self._images) > 1):
+                old_id, old_data = self._images.popitem(last=False)
+                self._bytes -= len(old_data)
+                if self.spill_dir:
+                    self._spill(old_id, old_data)
+        return scan_id
+
+    def _spill(self, scan_id, data):
+        path = os.path.join(self.spill_dir, scan_id + FORMATS[self.image_format][0])
+        with open(path, "wb") as spill:
+            spill.write(data)
+        self._spilled[scan_id] = path
+        while len(self._spilled) > self.spill_items:
+            _, old_path = self._spilled.popitem(last=False)
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def get(self, scan_id):
+        """Encoded bytes for `scan_id`, or None if it is unknown or evicted."""
+        if not SCAN_ID.match(scan_id or ""):
+            return None
+        with self._lock:
+            data = self._images.get(scan_id)
+            if data is not None:
+                self._images.move_to_end(scan_id)
+                return data
+            path = self._spilled.get(scan_id)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as spill:
+                return spill.read()
+        except OSError:
+            return None
+
+    def thumbnail(self, image, width=320):
+        """Small JPEG of `image` as a data URI, for embedding in a JSON response."""
+        import cv2
+
+        height, original_width = image.shape[:2]
+        if original_width > width:
+            image = cv2.resize(image, (width, max(1, height * width // original_width)), interpolation=cv2.INTER_AREA)
+        data = self.encode(image, "jpg", 70)
+        return "data:image/jpeg;base64," + base64.b64encode(data).decode()
+
+    def status(self):
+        with self._lock:
+            return {"in_memory": len(self._images), "bytes": self._bytes, "spilled": len(self._spilled)}
+
+
+scan_store = ScanStore(
+    max_items=int(os.getenv("ScanStoreItems", 64)),
+    max_bytes=int(os.getenv("ScanStoreMB", 64)) * 1024 * 1024,
+    spill_dir=os.getenv("ScanSpillDir") or None,
+    spill_items=int(os.getenv("ScanSpillItems", 1000)),
+    image_format=os.getenv("ScanImageFormat", "jpg"),
+    quality=int(os.getenv("ScanImageQuality", 85)),
+)
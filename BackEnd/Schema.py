@@ -0,0 +1,90 @@
+from Connect_MySQL import *
+from Sales_Rollups import ensure_rollup_tables
+from Job_Runner import ensure_job_tables
+from Inventory_Ledger import ensure_ledger_tables
+
+# Columns the backend relies on, added to existing databases before the indexes.
+# (table, column name, DDL)
+COLUMNS = [
+    # Moves on every insert and every upsert of a day's total, so the forecast
+    # job can tell which dishes' history changed, corrections included
+    ("sales_data", "updated_at",
+     "ALTER TABLE sales_data ADD COLUMN updated_at datetime(3) NOT NULL "
+     "DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3);"),
+]
+
+# Indexes the backend relies on, added to existing databases on startup.
+# (table, index name, DDL)
+INDEXES = [
+    # One sales_data row per dish per day, lets order posting upsert the daily total.
+    # Doubles as the composite (date, dish_name) index for date-range reads.
+    ("sales_data", "unique_sale", "ALTER TABLE sales_data ADD UNIQUE KEY unique_sale (date, dish_name);"),
+    # Keyset pagination / streaming of sales_data in (date, id) order
+    ("sales_data", "idx_sales_date_id", "ALTER TABLE sales_data ADD KEY idx_sales_date_id (date, id);"),
+    # Incremental forecasting reads only the rows written since its last run
+    ("sales_data", "idx_sales_updated_at", "ALTER TABLE sales_data ADD KEY idx_sales_updated_at (updated_at);"),
+]
+
+def merge_duplicate_sales(cursor):
+    """Fold duplicate (date, dish_name) rows into the oldest one, summing the sales.
+
+    Order posting used to SELECT and then INSERT, so concurrent orders could
+    leave two rows for one dish and day; the unique key can't be added over them.
+    """
+    cursor.execute("""
+    CREATE TEMPORARY TABLE sales_duplicates AS
+    SELECT date, dish_name, MIN(id) AS keep_id, SUM(sales) AS total
+    FROM sales_data GROUP BY date, dish_name HAVING COUNT(*) > 1;
+    """)
+    cursor.execute("SELECT COUNT(*) FROM sales_duplicates;")
+    duplicates = cursor.fetchone()[0]
+    if duplicates:
+        print(f"Merging duplicate sales_data rows for {duplicates} (date, dish_name) pairs")
+        cursor.execute("""
+        UPDATE sales_data s JOIN sales_duplicates d ON s.id = d.keep_id
+        SET s.sales = d.total;
+        """)
+        cursor.execute("""
+        DELETE s FROM sales_data s
+        JOIN sales_duplicates d ON s.date = d.date AND s.dish_name = d.dish_name AND s.id <> d.keep_id;
+        """)
+    cursor.execute("DROP TEMPORARY TABLE sales_duplicates;")
+
+# Run before adding the index of the same name
+PREPARE_INDEX = {
+    "unique_sale": merge_duplicate_sales,
+}
+
+def ensure_schema():
+    """Apply the idempotent schema additions above. Safe to run on every startup."""
+    with named_lock("schema:indexes"), get_cursor(commit=True) as cursor:
+        for table, column, ddl in COLUMNS:
+            cursor.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+                LIMIT 1;
+            """, (table, column))
+            if cursor.fetchone() is None:
+                print(f"Adding column {column} to {table}")
+                cursor.execute(ddl)
+
+        for table, index, ddl in INDEXES:
+            cursor.execute("""
+                SELECT 1 FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+                LIMIT 1;
+            """, (table, index))
+            if cursor.fetchone() is None:
+                if index in PREPARE_INDEX:
+                    PREPARE_INDEX[index](cursor)
+                print(f"Adding index {index} on {table}")
+                cursor.execute(ddl)
+
+    # Daily / weekly / monthly sales rollups behind the reporting endpoints
+    ensure_rollup_tables()
+
+    # Scheduled / on-demand job history and the claim that keeps them single-run
+    ensure_job_tables()
+
+    # Append-only history of every inventory change, with periodic snapshots
+    ensure_ledger_tables()
@@ -0,0 +1,78 @@
+import importlib
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from Metrics import Gauge
+
+
+class Subsystem:
+    """A group of heavy modules imported on first use instead of at API import.
+
+    `load()` imports `modules` once (thread-safe) and runs the optional
+    `warm` hook ("Module:function"), e.g. loading model weights. It returns
+    a namespace of the modules, so callers write
+    `subsystem.load().Yolo_Prediction.scan_image(...)`. Workers that never
+    serve those endpoints never pay for torch, ultralytics or cv2.
+    """
+
+    def __init__(self, name, modules, warm=None):
+        self.name = name
+        self.modules = modules
+        self.warm = warm
+        self._lock = threading.Lock()
+        self._loaded = None
+        self.state = "cold"
+        self.seconds = None
+        self.error = None
+        Gauge(f"subsystem_{name}_ready", f"1 once the {name} subsystem is loaded and warm", function=lambda: int(self.ready))
+
+    @property
+    def ready(self):
+        return self._loaded is not None
+
+    def load(self):
+        if self._loaded is not None:
+            return self._loaded
+        with self._lock:
+            if self._loaded is None:
+                self.state = "loading"
+                start = time.perf_counter()
+                try:
+                    loaded = SimpleNamespace(**{module: importlib.import_module(module) for module in self.modules})
+                    if self.warm:
+                        module, function = self.warm.split(":")
+                        getattr(getattr(loaded, module), function)()
+                except Exception as err:
+                    self.state = "failed"
+                    self.error = repr(err)
+                    raise
+                self.seconds = time.perf_counter() - start
+                self.error = None
+                self.state = "ready"
+                self._loaded = loaded
+        return self._loaded
+
+    def status(self):
+        return {"state": self.state, "seconds": self.seconds, "error": self.error}
+
+
+# Detection, freshness, image decoding and camera feeds: torch, ultralytics, cv2, keras
+vision = Subsystem(
+    "vision",
+    ["Image_Input", "Model_Registry", "Yolo_Prediction", "Batch_Intake", "Camera_Ingest"],
+    warm="Model_Registry:load_all",
+)
+
+# Ingredient planning from the forecast: numpy and scipy
+planning = Subsystem("planning", ["Smart_Inventory"])
+
+SUBSYSTEMS = {subsystem.name: subsystem for subsystem in (vision, planning)}
+
+# Loaded in the background right after startup; leave empty for a worker
+# that only serves menu, sales and inventory reads.
+WARM_SUBSYSTEMS = [name.strip() for name in os.getenv("WarmSubsystems", "vision,planning").split(",") if name.strip()]
+for _name in WARM_SUBSYSTEMS:
+    if _name not in SUBSYSTEMS:
+        raise ValueError(f"Unknown subsystem '{_name}' in WarmSubsystems. Choose from {list(SUBSYSTEMS)}")
@@ -0,0 +1,44 @@
+import threading
+import time
+
+# Tables (or derived data sets) whose changes readers care about
+TABLES = ("inventory", "menu", "sales", "predictions")
+
+
+class TableVersions:
+    """Per-table change counters, bumped by the write paths after they commit.
+
+    Readers compare counters to tell whether anything they depend on changed
+    since they last looked. Counters live in this process; writes made by
+    other workers reach it through the followers that poll the database:
+    inventory_ledger (inventory, and sales for orders) in Inventory_Events,
+    job_runs (the tables each job writes) in Job_Runner, and the menu
+    checksum in Recipe_Store. Those bump up to one poll interval late.
+    """
+
+    def __init__(self, tables=TABLES):
+        self._lock = threading.Lock()
+        started = time.time()
+        self._versions = {table: 0 for table in tables}
+        self._modified = {table: started for table in tables}
+
+    def bump(self, *tables):
+        now = time.time()
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._modified[table] = now
+
+    def snapshot(self, tables):
+        """(versions tuple, last-modified time) for `tables`."""
+        with self._lock:
+            versions = tuple(self._versions.get(table, 0) for table in tables)
+            modified = max(self._modified.get(table, 0) for table in tables)
+        return versions, modified
+
+
+table_versions = TableVersions()
+
+
+def tables_changed(*tables):
+    table_versions.bump(*tables)
@@ -0,0 +1,105 @@
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+
+
+class UploadArchive:
+    """Keeps original uploads on disk, written by a background thread.
+
+    `save()` never blocks the request: uploads are queued and dropped (and
+    counted) if the writer falls `queue_size` files behind. After each write
+    the oldest files are deleted until the archive is within `max_files`,
+    `max_mb` and `max_age_days`.
+    """
+
+    def __init__(self, directory, max_files=1000, max_mb=1024, max_age_days=30, queue_size=64):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age = max_age_days * 86400
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._files = []  # (mtime, path, size), oldest first
+        self._bytes = 0
+        self._thread = None
+        self.dropped = 0
+
+    def _scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._files = []
+        self._bytes = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                self._files.append((stat.st_mtime, path, stat.st_size))
+                self._bytes += stat.st_size
+        self._files.sort()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._scan()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def save(self, filename, data):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((filename, data))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            filename, data = self._queue.get()
+            # Unique name so two "image.jpg" uploads never collide
+            safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", os.path.basename(filename or "upload"))[-100:]
+            path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:8]}_{safe_name}")
+            try:
+                with open(path, "wb") as archived:
+                    archived.write(data)
+            except OSError as err:
+                print(f"Could not archive upload {filename}: {err}")
+                continue
+            self._files.append((time.time(), path, len(data)))
+            self._bytes += len(data)
+            self._apply_retention()
+
+    def prune(self):
+        """Apply the retention limits to whatever is on disk now. Returns the files removed."""
+        self._scan()
+        before = len(self._files)
+        self._apply_retention()
+        return before - len(self._files)
+
+    def _apply_retention(self):
+        cutoff = time.time() - self.max_age
+        while self._files and (
+            len(self._files) > self.max_files or self._bytes > self.max_bytes or self._files[0][0] < cutoff
+        ):
+            _, path, size = self._files.pop(0)
+            self._bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Off unless a directory is configured
+upload_archive = None
+if os.getenv("UploadArchiveDir"):
+    upload_archive = UploadArchive(
+        os.getenv("UploadArchiveDir"),
+        max_files=int(os.getenv("UploadArchiveFiles", 1000)),
+        max_mb=int(os.getenv("UploadArchiveMB", 1024)),
+        max_age_days=float(os.getenv("UploadArchiveDays", 30)),
+    )
+
+
+def prune_archive():
+    # Scheduled as the archive_cleanup job (see Job_Runner)
+    if upload_archive is None:
+        return {"removed": 0}
+    return {"removed": upload_archive.prune()}
@@ -1,55 +1,93 @@
-import torch
-from ultralytics import YOLO
-import cv2
 from collections import Counter
-from Connect_MySQL import *  # Ensure this imports db and cursor
-from SQL_Action import get_inventory
+from Connect_MySQL import *  # Ensure this imports the connection pool
+from Model_Registry import registry, device
+from Table_Versions import tables_changed
+from Inventory_Events import inventory_events
+from Inventory_Ledger import record as record_ledger
+from Scan_Store import scan_store
+from Freshness import freshness_classifier, remaining_life
+from Metrics import record_detection
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
 print(f"Using device: {device}")
 
-def detect(image_path):
-    # Load YOLO model
-    model = YOLO("./Models/M_Till_best.pt")  # Update with actual model path
-    
-    # Run detection
-    results = model(image_path, device=device)
+def run_detection(sources):
+    """Run one YOLO call over a list of images and count the labels in each."""
+    # Borrow a warmed-up YOLO model from the registry
+    with registry.model("till") as model:
+        results = model(sources, device=device, verbose=False)
+        names = model.names
+    record_detection(results)
+
+    label_counts = []
+    for result in results:
+        class_indices = result.boxes.cls.cpu().numpy().astype(int)
+        labels = [names[idx] for idx in class_indices]
+        label_counts.append(dict(Counter(labels)))  # Count occurrences
+    return results, label_counts
+
+def update_inventory_from_counts(label_counts, freshness=None):
+    """Add detected quantities to `inventory` in a single transaction.
+
+    New ingredients are inserted with the same defaults the scanner always
+    used; existing ones (matched case-insensitively by the table collation)
+    are incremented in place. Items with a `freshness` assessment (see
+    Freshness.assess) also get its quality and a remaining life scaled from
+    their max_life. Every count is also appended to the inventory ledger.
+    """
+    if not label_counts:
+        return
+    freshness = freshness or {}
+    rows = [(item, count) for item, count in label_counts.items() if item not in freshness]
+    with get_cursor(commit=True) as cursor:
+        assessed = [item for item in label_counts if item in freshness]
+        if assessed:
+            placeholders = ", ".join(["%s"] * len(assessed))
+            cursor.execute(f"SELECT ingredient, max_life FROM inventory WHERE ingredient IN ({placeholders}) FOR UPDATE;", assessed)
+            max_life = {ingredient.lower(): life for ingredient, life in cursor.fetchall()}
+            cursor.executemany("""
+                INSERT INTO inventory (ingredient, quantity, remaining_life, quality, category, price)
+                VALUES (%s, %s, %s, %s, 'Unknown', 10)
+                ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity),
+                    remaining_life = VALUES(remaining_life), quality = VALUES(quality);
+            """, [
+                (item, label_counts[item], remaining_life(max_life.get(item.lower()), freshness[item]["freshness"]), freshness[item]["quality"])
+                for item in assessed
+            ])
+        if rows:
+            cursor.executemany("""
+                INSERT INTO inventory (ingredient, quantity, remaining_life, quality, category, price)
+                VALUES (%s, %s, 7, 'Fresh', 'Unknown', 10)
+                ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity);
+            """, rows)
+        record_ledger(cursor, label_counts, "intake")
+        changed = inventory_events.changed_rows(cursor, label_counts)
+    tables_changed("inventory")
+    inventory_events.publish(changed)
+    for item, count in label_counts.items():
+        print(f"Added {count} x {item}")
+
+def scan_image(source, thumbnail=False):
+    """Detect, update inventory and keep the annotated image in the scan store.
+
+    Returns {"counts", "freshness", "scan_id"} plus a "thumbnail" data URI when asked.
+    """
+    results, label_counts = run_detection([source])
     annotated_image = results[0].plot()
-    class_indices = results[0].boxes.cls.cpu().numpy().astype(int)
-    labels = [model.names[idx] for idx in class_indices]
-    label_counts = dict(Counter(labels))  # Count occurrences
-    
-    # Save annotated output
-    output_path = "output.jpg"
-    cv2.imwrite(output_path, annotated_image)
-    print(f"Output saved as {output_path}")
-    
-    # Fetch inventory
-    inventory = get_inventory()
-    inventory_dict = {item['ingredient'].lower(): item for item in inventory}
-    
+    label_counts = label_counts[0]
+
+    # Second stage: every box of this frame through the freshness model in one batch
+    freshness = freshness_classifier.assess(results)
+
+    # Encoded once and kept in memory, served by /get-image/{scan_id}
+    scan = {"counts": label_counts, "freshness": freshness, "scan_id": scan_store.put(annotated_image)}
+    if thumbnail:
+        scan["thumbnail"] = scan_store.thumbnail(annotated_image)
+
     # Update inventory
-    for item, count in label_counts.items():
-        item_lower = item.lower()
-        
-        if item_lower in inventory_dict:
-            new_quantity = inventory_dict[item_lower]['quantity'] + count
-            update_query = f"""
-                UPDATE inventory
-                SET quantity = {new_quantity}
-                WHERE ingredient = '{item}';
-            """
-            cursor.execute(update_query)
-            print(f"Updated {item}: New quantity = {new_quantity}")
-        else:
-            insert_query = f"""
-                INSERT INTO inventory (ingredient, quantity, remaining_life, quality, category, price)
-                VALUES ('{item}', {count}, 7, 'Fresh', 'Unknown', 10);
-            """
-            cursor.execute(insert_query)
-            print(f"Inserted {item} with quantity {count}")
-    
-    db.commit()  # Commit changes to database
+    update_inventory_from_counts(label_counts, freshness)
     print("Inventory updated successfully!")
-    
-    return label_counts
+
+    return scan
+
+def detect(image_path):
+    return scan_image(image_path)["counts"]
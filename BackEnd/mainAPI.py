@@ -1,19 +1,29 @@
-from fastapi import FastAPI, Request, Depends, HTTPException, status, File, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request, Response, Depends, HTTPException, status, File, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+import json
 
-from SQL_Action import Get_Menu, get_Weekly_sales, get_monthly_sales, get_sales_last_n_months, get_inventory, get_Prediction, update_inventory_for_dish
-from Yolo_Prediction import detect
-from Sale_prediction import predict_sales
-from Smart_Inventory import get_tomorrow_predictions
+from SQL_Action import Get_Menu, get_Weekly_sales, get_monthly_sales, get_sales_last_n_months, get_inventory, get_Prediction, update_inventory_for_dish, post_orders, iter_sales_last_n_months, get_sales_page, sales_rows_to_columnar
+from Schema import ensure_schema
+from Order_Writer import order_writer
+from Scan_Store import scan_store
+from Upload_Archive import upload_archive
+from Job_Runner import JOBS, job_runner
+from Subsystems import SUBSYSTEMS, WARM_SUBSYSTEMS, vision, planning
+from Recipe_Store import recipe_store
+from Response_Cache import response_cache
+from Inventory_Events import inventory_events
+from Recommendation_Engine import recommendation_engine
+from Inventory_Ledger import stock_at, consumption, adjust as adjust_inventory, projection_drift
+from Metrics import Gauge, render as render_metrics, http_request_seconds, http_in_flight, slow_sampler
+from concurrent.futures import ThreadPoolExecutor
 
 import dotenv
-import shutil
 import os
-import schedule
-import threading
 import asyncio
 import time
 
@@ -32,48 +42,335 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Schedule the job at 6:00 AM daily
-schedule.every().day.at("06:00").do(predict_sales)
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    http_in_flight.inc()
+    token = slow_sampler.begin() if slow_sampler else None
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, so /get-image/{scan_id} stays one series
+        route = request.scope.get("route")
+        http_request_seconds.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=status_code,
+        )
+        http_in_flight.dec()
+        if token:
+            slow_sampler.end(token)
 
-def run_scheduler():
-    """Runs the schedule in a loop in a separate thread."""
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+# Worker threads behind asyncio.to_thread (SQL, detection, forecasts)
+THREAD_POOL_WORKERS = int(os.getenv("ThreadPoolWorkers") or min(32, (os.cpu_count() or 1) + 4))
 
-# Start the scheduler in a background thread
-scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-scheduler_thread.start()
+@app.on_event("startup")
+async def size_thread_pool():
+    executor = ThreadPoolExecutor(max_workers=THREAD_POOL_WORKERS, thread_name_prefix="api")
+    asyncio.get_running_loop().set_default_executor(executor)
+    Gauge("threadpool_max_workers", "Size of the to_thread worker pool", function=lambda: executor._max_workers)
+    Gauge("threadpool_threads", "Worker threads started so far", function=lambda: len(executor._threads))
+    Gauge("threadpool_queue_depth", "Calls waiting for a free worker thread", function=lambda: executor._work_queue.qsize())
+
+@app.on_event("startup")
+async def migrate_schema():
+    await asyncio.to_thread(ensure_schema)
+
+@app.on_event("startup")
+async def start_order_writer():
+    # Optional write-behind mode for peak-hour order bursts (OrderWriteBehind=1)
+    if order_writer:
+        await asyncio.to_thread(order_writer.start)
+
+@app.on_event("shutdown")
+async def stop_order_writer():
+    if order_writer:
+        await asyncio.to_thread(order_writer.stop)
+
+@app.on_event("startup")
+async def attach_inventory_events():
+    # Write paths publish from worker threads onto this loop
+    inventory_events.attach(asyncio.get_running_loop())
+    inventory_events.add_listener(recommendation_engine.apply)
+    # Changes written by the other workers reach this one's subscribers through the ledger
+    inventory_events.follow_ledger()
+
+@app.on_event("shutdown")
+async def stop_inventory_events():
+    inventory_events.stop()
+
+# Vision (torch, ultralytics, cv2) and planning (scipy) are imported on first
+# use, see Subsystems. The ones in WarmSubsystems load in the background once
+# the API is up, so the first upload doesn't pay for model loading and /ready
+# tells a load balancer when they are warm.
+async def use(subsystem):
+    return await asyncio.to_thread(subsystem.load)
+
+async def warm(subsystem):
+    try:
+        await use(subsystem)
+        print(f"{subsystem.name} ready in {subsystem.seconds:.2f}s")
+    except Exception as err:
+        print(f"Could not load {subsystem.name}: {err}")
+
+warm_tasks = []
+
+@app.on_event("startup")
+async def warm_subsystems():
+    for name in WARM_SUBSYSTEMS:
+        warm_tasks.append(asyncio.create_task(warm(SUBSYSTEMS[name])))
+
+@app.get("/ready")
+async def ready(response: Response, require: Optional[str] = None):
+    """503 until the required subsystems (default: WarmSubsystems) are loaded."""
+    required = [name.strip() for name in require.split(",")] if require is not None else WARM_SUBSYSTEMS
+    unknown = [name for name in required if name and name not in SUBSYSTEMS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown subsystem(s) {unknown}. Choose from {list(SUBSYSTEMS)}")
+    is_ready = all(SUBSYSTEMS[name].ready for name in required if name)
+    if not is_ready:
+        response.status_code = 503
+    return {
+        "ready": is_ready,
+        "subsystems": {name: subsystem.status() for name, subsystem in SUBSYSTEMS.items()},
+        # Forecasts never load here, they run in job worker processes
+        "forecast": "job worker" if os.getenv("JobScheduler", "1") == "1" else "external job runner",
+    }
+
+@app.on_event("startup")
+async def start_job_scheduler():
+    # Forecasts and batch jobs run in their own processes (see Job_Runner); every
+    # worker may schedule them, a row in job_runs makes each slot run once.
+    # JobScheduler=0 when `python Job_Runner.py` runs the schedule instead.
+    if os.getenv("JobScheduler", "1") == "1":
+        await asyncio.to_thread(job_runner.start)
+    # Either way, follow the runs finished by any process, so this worker's
+    # cached predictions and forecast metrics stay current
+    await asyncio.to_thread(job_runner.follow)
+
+@app.on_event("shutdown")
+async def stop_job_scheduler():
+    job_runner.stop()
+
+# Dashboard reads are cached until a write path bumps one of their tables
+# (see Table_Versions) and answer 304 to a matching If-None-Match. The TTLs
+# cover what versions can't see: menu edits made outside the API, the
+# inventory's "N minutes ago" text and the date rolling over.
+INVENTORY_TTL = float(os.getenv("InventoryCacheTTL", 60))
+SALES_TTL = float(os.getenv("SalesCacheTTL", 300))
 
 @app.get("/Get_Menu")
-async def Menu():
-    return await asyncio.to_thread(Get_Menu)
+async def Menu(request: Request):
+    return await response_cache.respond(request, ("menu",), Get_Menu, ttl=recipe_store.check_interval)
 
 @app.get("/get_Weekly_sales")
-async def Weekly_sales():
-    return await asyncio.to_thread(get_Weekly_sales)
+async def Weekly_sales(request: Request, group: Optional[str] = None):
+    try:
+        return await response_cache.respond(request, ("sales",), get_Weekly_sales, group, ttl=SALES_TTL)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
 
 @app.get("/get_Monthly_sales")
-async def Monthly_sales():
-    return await asyncio.to_thread(get_monthly_sales)
+async def Monthly_sales(request: Request, group: Optional[str] = None):
+    try:
+        return await response_cache.respond(request, ("sales",), get_monthly_sales, group, ttl=SALES_TTL)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
 
 @app.get("/get_inventory_item")
-async def inventory():
-    return await asyncio.to_thread(get_inventory)
+async def inventory(request: Request):
+    return await response_cache.respond(request, ("inventory",), get_inventory, ttl=INVENTORY_TTL)
 
 @app.get("/get_prediction")
-async def prediction():
-    return await asyncio.to_thread(get_Prediction)
+async def prediction(request: Request):
+    return await response_cache.respond(request, ("predictions",), get_Prediction)
 
 @app.get("/get_inventory_predictions")
-async def inventory_prediction():
-    return await asyncio.to_thread(get_tomorrow_predictions)
+async def inventory_prediction(request: Request, days: int = 1):
+    if days < 1:
+        raise HTTPException(status_code=400, detail="days must be at least 1")
+    tables = ("predictions", "inventory", "menu")
+    modules = await use(planning)
+    if days == 1:
+        return await response_cache.respond(request, tables, modules.Smart_Inventory.get_tomorrow_predictions, ttl=INVENTORY_TTL)
+    return await response_cache.respond(request, tables, modules.Smart_Inventory.get_inventory_predictions, days, ttl=INVENTORY_TTL)
+
+@app.get("/inventory/events")
+async def inventory_event_stream():
+    """Server-Sent Events: a `snapshot` of the inventory on connect, then a `delta`
+    event with {ingredient, quantity, remaining_life, quality} for every row
+    an order, delivery scan or write-behind flush changes.
+    """
+    return StreamingResponse(
+        inventory_events.stream(get_inventory),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/recommendations")
+async def recommendations(top_k: int = 10, ingredients: Optional[str] = None):
+    """Dishes that use up stock close to expiry, with suggested discounts.
+
+    `ingredients` is a comma-separated list the customer picked; dishes using
+    them rank higher. `use_soon` lists the urgent ingredients, soonest first.
+    """
+    if top_k < 0:
+        raise HTTPException(status_code=400, detail="top_k must not be negative")
+    selected = [name for name in (ingredients or "").split(",") if name.strip()]
+    return await asyncio.to_thread(recommendation_engine.recommend, top_k, selected)
+
+def ingredient_list(ingredients):
+    return [name.strip() for name in (ingredients or "").split(",") if name.strip()] or None
+
+@app.get("/inventory/at")
+async def inventory_at(when: Optional[datetime] = None, ingredients: Optional[str] = None):
+    """Stock per ingredient as it was at `when` (default now), from the inventory ledger."""
+    when = when or datetime.now()
+    return {"when": when, "stock": await asyncio.to_thread(stock_at, when, ingredient_list(ingredients))}
+
+@app.get("/inventory/consumption")
+async def inventory_consumption(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    ingredients: Optional[str] = None,
+    group: Optional[str] = None,
+):
+    """Used, wasted, received and corrected quantities per ingredient over [start, end).
+
+    Defaults to the last 7 days; group=day adds a daily usage series.
+    """
+    end = end or datetime.now()
+    start = start or end - timedelta(days=7)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    try:
+        return await asyncio.to_thread(consumption, start, end, ingredient_list(ingredients), group)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+class InventoryAdjustment(BaseModel):
+    ingredient: str
+    delta: int
+    kind: str = "correction"  # or "waste", with a negative delta
+
+@app.post("/inventory/adjust")
+async def inventory_adjust(database: InventoryAdjustment):
+    try:
+        quantity = await asyncio.to_thread(adjust_inventory, database.ingredient, database.delta, database.kind)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return {"ingredient": database.ingredient, "quantity": quantity}
+
+@app.get("/inventory/ledger/check")
+async def inventory_ledger_check():
+    # Ingredients where the inventory table and the ledger disagree; should be empty
+    return {"drift": await asyncio.to_thread(projection_drift)}
+
+@app.get("/inventory/events/status")
+async def inventory_event_status():
+    return inventory_events.status()
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/profile")
+async def metrics_profile(reset: bool = False):
+    """Collapsed stacks sampled during slow requests (SlowRequestMs), for flamegraph.pl or speedscope."""
+    if slow_sampler is None:
+        raise HTTPException(status_code=404, detail="Set SlowRequestMs to enable slow-request profiling")
+    return PlainTextResponse(slow_sampler.collapsed(reset))
+
+@app.get("/cache_stats")
+async def cache_stats():
+    return response_cache.report()
+
+async def start_job(name, wait=False, **kwargs):
+    if name not in JOBS:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{name}'")
+    if await asyncio.to_thread(job_runner.is_running, name):
+        raise HTTPException(status_code=409, detail=f"Job '{name}' is already running")
+    run_id = await asyncio.to_thread(job_runner.submit, name, None, "manual", **kwargs)
+    run = await asyncio.to_thread(job_runner.get_run, run_id)
+    while wait and run["status"] in ("queued", "running"):
+        await asyncio.sleep(1)
+        run = await asyncio.to_thread(job_runner.get_run, run_id)
+    return run
+
+# Sale_prediction.FORECAST_BACKENDS, named here so the API doesn't import Prophet
+FORECAST_BACKENDS = ("prophet", "fast")
+
+@app.post("/refresh_prediction")
+async def refresh_prediction(backend: str = "fast", wait: bool = False):
+    """Re-forecast now, in a worker process. Returns the job run; with wait=true only once it has finished."""
+    if backend not in FORECAST_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown forecast backend '{backend}'. Choose from {list(FORECAST_BACKENDS)}")
+    return await start_job("forecast", wait, backend=backend)
+
+@app.get("/jobs")
+async def jobs_status():
+    return await asyncio.to_thread(job_runner.status)
+
+@app.get("/jobs/runs")
+async def job_runs(job: Optional[str] = None, limit: int = 50):
+    return await asyncio.to_thread(job_runner.runs, job, limit)
+
+@app.post("/jobs/{name}/run")
+async def run_job_now(name: str, wait: bool = False):
+    return await start_job(name, wait)
+
 class Database(BaseModel):
     Month: int
 
 @app.post("/Get_Sales_Last_N_Months")
-async def Get_Sales_Last(database: Database, request: Request):
-    return await asyncio.to_thread(get_sales_last_n_months, database.Month)
+async def Get_Sales_Last(
+    database: Database,
+    request: Request,
+    group: Optional[str] = None,
+    format: str = "json",
+    limit: Optional[int] = None,
+    after_date: Optional[date] = None,
+    after_id: int = 0,
+):
+    """Sales rows for the last N months.
+
+    format=json (default) returns the whole list, or one page when `limit`
+    is given; format=columnar returns dates/dish/sales arrays with dish names
+    dictionary-encoded; format=ndjson streams one row per line. Pages come
+    back with a `next` cursor (after_date, after_id) to pass to the next call.
+    """
+    if format not in ("json", "columnar", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json, columnar or ndjson")
+
+    if format == "ndjson":
+        def stream():
+            for rows in iter_sales_last_n_months(database.Month, after_date, after_id):
+                yield "".join(
+                    json.dumps({"id": row[0], "date": row[1].isoformat(), "dish_name": row[2], "sales": row[3]}) + "\n"
+                    for row in rows
+                )
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    if limit is None and format == "json":
+        try:
+            return await asyncio.to_thread(get_sales_last_n_months, database.Month, group)
+        except ValueError as err:
+            raise HTTPException(status_code=400, detail=str(err))
+
+    rows, next_cursor = await asyncio.to_thread(
+        get_sales_page, database.Month, after_date, after_id, limit or 1_000_000_000
+    )
+    if format == "columnar":
+        body = sales_rows_to_columnar(rows)
+    else:
+        body = {"rows": [{"id": row[0], "date": row[1], "dish_name": row[2], "sales": row[3]} for row in rows]}
+    body["next"] = next_cursor
+    return body
 
 class OrderData(BaseModel):
     dish_name: str
@@ -81,33 +378,149 @@ class OrderData(BaseModel):
 
 @app.post("/add_order")
 async def AddOrder(database: OrderData, request: Request):
-    return await asyncio.to_thread(update_inventory_for_dish, database.dish_name, database.quantity)
+    try:
+        if order_writer:
+            await asyncio.to_thread(order_writer.accept, [(database.dish_name, database.quantity)])
+            return f"Inventory updated and sales data recorded for {database.quantity} servings of '{database.dish_name}'."
+        return await asyncio.to_thread(update_inventory_for_dish, database.dish_name, database.quantity)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+class OrderBatch(BaseModel):
+    orders: List[OrderData]
 
-@app.post("/upload-image")
-async def upload_image(file: UploadFile = File(...)):
-    file_path = f"{UPLOAD_DIR}/{file.filename}"
+@app.post("/add_orders")
+async def AddOrders(database: OrderBatch, request: Request):
+    # A whole ticket or POS batch is posted in one transaction
+    orders = [(order.dish_name, order.quantity) for order in database.orders]
+    try:
+        if order_writer:
+            posted = await asyncio.to_thread(order_writer.accept, orders)
+        else:
+            posted = await asyncio.to_thread(post_orders, orders)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return {"posted": posted}
 
-    # Save the uploaded file asynchronously
-    def save_file():
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+async def read_upload(file):
+    """Decode an upload in memory, archiving the original bytes if configured."""
+    data = await file.read()
+    modules = await use(vision)
+    try:
+        image = await asyncio.to_thread(modules.Image_Input.decode_image, data)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=f"{file.filename}: {err}")
+    if upload_archive:
+        upload_archive.save(file.filename, data)
+    return image
 
-    await asyncio.to_thread(save_file)
+@app.post("/upload-image")
+async def upload_image(file: UploadFile = File(...), thumbnail: bool = False):
+    image = await read_upload(file)
 
     # Run your detection function asynchronously
-    label = await asyncio.to_thread(detect, file_path)
+    scan = await asyncio.to_thread(vision.load().Yolo_Prediction.scan_image, image, thumbnail)
+
+    response = {"filename": scan["counts"], "freshness": scan["freshness"], "scan_id": scan["scan_id"], "image_url": f"/get-image/{scan['scan_id']}"}
+    if thumbnail:
+        response["thumbnail"] = scan["thumbnail"]
+    return response
+
+@app.post("/upload-images")
+async def upload_images(files: List[UploadFile] = File(...)):
+    images = [await read_upload(file) for file in files]
 
-    return {"filename": label}
+    # Images are queued for batched detection and committed as one delivery
+    result = await asyncio.to_thread(vision.load().Batch_Intake.intake_images, images)
+
+    return {
+        "files": [{"filename": file.filename, "labels": labels} for file, labels in zip(files, result["images"])],
+        "total": result["total"],
+        "freshness": result["freshness"],
+    }
+
+@app.get("/get-image/{scan_id}")
+async def get_scan_image(scan_id: str):
+    data = await asyncio.to_thread(scan_store.get, scan_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    # Scan ids are never reused, so browsers may keep the image for good
+    return Response(content=data, media_type=scan_store.media_type, headers={"Cache-Control": "private, max-age=86400, immutable"})
 
 @app.get("/get-image")
 async def get_image():
-    file_path = r"D:\Smart-Restaurement-management-using-openCV\BackEnd\output.jpg"
-    
-    if not os.path.exists(file_path):
+    # Most recent scan, for clients that don't pass a scan id yet
+    if scan_store.latest is None:
         raise HTTPException(status_code=404, detail="File not found")
+    return await get_scan_image(scan_store.latest)
+
+class ModelSwap(BaseModel):
+    name: str = "till"
+    path: str  # file name in ModelDir, or a path inside it
+
+@app.get("/models")
+async def models_status():
+    # Don't load the vision stack just to report that nothing is loaded
+    if not vision.ready:
+        return {}
+    return vision.load().Model_Registry.registry.status()
+
+@app.post("/models/reload")
+async def reload_model(database: ModelSwap):
+    Model_Registry = (await use(vision)).Model_Registry
+    try:
+        path = Model_Registry.weights_path(database.path)
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Weights file not found")
+    await asyncio.to_thread(Model_Registry.registry.swap, database.name, path)
+    return Model_Registry.registry.status()[database.name]
+
+class CameraStart(BaseModel):
+    name: str = "till"
+    source: str  # camera name from CameraSources, or a file in CameraRecordingsDir
+    realtime: Optional[bool] = None
+    flush_interval: Optional[float] = None
+    min_hits: Optional[int] = None
+
+# Running camera feeds by name
+cameras = {}
+
+@app.post("/camera/start")
+async def camera_start(database: CameraStart):
+    current = cameras.get(database.name)
+    if current and current.running:
+        raise HTTPException(status_code=409, detail=f"Camera '{database.name}' is already running")
+    modules = await use(vision)
+    try:
+        source = modules.Camera_Ingest.camera_source(database.source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    camera = modules.Camera_Ingest.from_env(
+        source,
+        realtime=database.realtime,
+        flush_interval=database.flush_interval,
+        min_hits=database.min_hits,
+    )
+    await asyncio.to_thread(camera.start)
+    cameras[database.name] = camera
+    return camera.status()
+
+@app.post("/camera/stop")
+async def camera_stop(name: str = "till"):
+    camera = cameras.get(name)
+    if camera is None:
+        raise HTTPException(status_code=404, detail=f"No camera '{name}'")
+    await asyncio.to_thread(camera.stop)
+    return camera.status()
 
-    return FileResponse(file_path, media_type="image/png")
+@app.get("/camera/status")
+async def camera_status():
+    return {name: camera.status() for name, camera in cameras.items()}
 
+@app.on_event("shutdown")
+async def stop_cameras():
+    for camera in cameras.values():
+        if camera.running:
+            await asyncio.to_thread(camera.stop)
@@ -0,0 +1,112 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import BOM_Engine
+from BOM_Engine import BillOfMaterials
+
+
+class StaticRecipes:
+    def __init__(self, recipes):
+        self._recipes = recipes
+
+    def recipes(self):
+        return self._recipes
+
+
+def baseline_tomorrow(recipes, predictions, inventory):
+    """What get_tomorrow_predictions() computed before the BOM engine."""
+    total = {}
+    for dish, sales in predictions:
+        if dish in recipes:
+            for ingredient, qty in recipes[dish].items():
+                total[ingredient] = total.get(ingredient, 0) + qty * int(sales)
+    to_buy, insufficient, sufficient = {}, {}, {}
+    for ingredient, required in total.items():
+        available = inventory.get(ingredient, 0)
+        if available == 0:
+            to_buy[ingredient] = required
+        elif available < required:
+            insufficient[ingredient] = {"available": available, "required": required}
+        else:
+            sufficient[ingredient] = available
+    return {
+        "predicted_sales": [{"dish": dish, "predicted_sales": int(sales)} for dish, sales in predictions],
+        "total_ingredients_needed": total,
+        "ingredients_to_buy": to_buy,
+        "insufficient_ingredients": insufficient,
+        "sufficient_ingredients": sufficient,
+    }
+
+
+@pytest.fixture
+def kitchen(monkeypatch):
+    rng = random.Random(7)
+    ingredients = [f"Ingredient {i}" for i in range(40)]
+    recipes = {f"Dish {d}": {name: rng.randint(1, 3) for name in rng.sample(ingredients, 5)} for d in range(30)}
+    inventory = {name: rng.choice([0, 5, 50, 500]) for name in ingredients}
+    tomorrow = (datetime.now() + timedelta(days=1)).date()
+    predictions = [
+        (tomorrow + timedelta(days=day), dish, rng.randint(0, 20))
+        for day in range(3) for dish in rng.sample(sorted(recipes), 12)
+    ]
+    # A dish the menu no longer has still shows up in predicted_sales
+    predictions.append((tomorrow, "Retired Dish", 4))
+
+    class Cursor:
+        def execute(self, query, params=None):
+            if "sales_predictions" in query:
+                first, last = params
+                self.rows = [row for row in predictions if first <= row[0] <= last]
+            else:
+                self.rows = list(inventory.items())
+
+        def fetchall(self):
+            return self.rows
+
+    @contextmanager
+    def get_cursor():
+        yield Cursor()
+
+    monkeypatch.setattr(BOM_Engine, "get_cursor", get_cursor)
+    monkeypatch.setattr(BOM_Engine, "bom", BillOfMaterials(StaticRecipes(recipes)))
+    return recipes, predictions, inventory, tomorrow
+
+
+def test_first_day_matches_the_baseline(kitchen):
+    recipes, predictions, inventory, tomorrow = kitchen
+    plan = BOM_Engine.plan_ingredients(1)[0]
+    expected = baseline_tomorrow(recipes, [(dish, sales) for day, dish, sales in predictions if day == tomorrow], inventory)
+    assert plan["date"] == tomorrow.isoformat()
+    assert {key: value for key, value in plan.items() if key != "date"} == expected
+
+
+def test_later_days_are_judged_on_cumulative_demand(kitchen):
+    recipes, predictions, inventory, tomorrow = kitchen
+    plans = BOM_Engine.plan_ingredients(3)
+    running = {}
+    for day, plan in enumerate(plans):
+        date = tomorrow + timedelta(days=day)
+        today = baseline_tomorrow(recipes, [(dish, sales) for d, dish, sales in predictions if d == date], inventory)
+        assert plan["total_ingredients_needed"] == today["total_ingredients_needed"]
+        for ingredient, qty in today["total_ingredients_needed"].items():
+            running[ingredient] = running.get(ingredient, 0) + qty
+        for ingredient, entry in plan["insufficient_ingredients"].items():
+            assert entry == {"available": inventory[ingredient], "required": running[ingredient]}
+        for ingredient in plan["sufficient_ingredients"]:
+            assert inventory[ingredient] >= running[ingredient]
+
+
+def test_demand_is_plan_times_recipes():
+    recipes = {"A": {"x": 2, "y": 1}, "B": {"y": 3}}
+    bom = BillOfMaterials(StaticRecipes(recipes))
+    built = bom.current()
+    plan = np.zeros((2, 2))
+    plan[0, built["dish_index"]["A"]] = 4
+    plan[1, built["dish_index"]["B"]] = 5
+    demand = dict(zip(built["ingredients"], bom.demand(plan).T.tolist()))
+    assert demand == {"x": [8, 0], "y": [4, 15]}
+    assert bom.current() is built  # Same recipes object, matrix not rebuilt
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+
+import Camera_Ingest
+from Camera_Ingest import camera_source
+
+
+@pytest.fixture
+def recordings(tmp_path, monkeypatch):
+    folder = tmp_path / "recordings"
+    folder.mkdir()
+    (folder / "lunch.mp4").write_bytes(b"")
+    (tmp_path / "secret.mp4").write_bytes(b"")
+    monkeypatch.setattr(Camera_Ingest, "CAMERA_SOURCES", {"till": "rtsp://10.0.0.5/stream", "back": "0"})
+    monkeypatch.setattr(Camera_Ingest, "CAMERA_RECORDINGS_DIR", str(folder))
+    return folder
+
+
+def test_configured_names_and_recordings_are_opened(recordings):
+    assert camera_source("till") == "rtsp://10.0.0.5/stream"
+    assert camera_source("back") == "0"
+    assert camera_source("lunch.mp4") == str((recordings / "lunch.mp4").resolve())
+
+
+@pytest.mark.parametrize("source", [
+    "rtsp://attacker/stream", "1", "/etc/passwd", "../secret.mp4", "missing.mp4",
+])
+def test_anything_else_is_rejected(recordings, source):
+    with pytest.raises(ValueError):
+        camera_source(source)
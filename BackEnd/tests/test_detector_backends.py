@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import Detector_Backends
+from Detector_Backends import prepare
+
+
+@pytest.fixture
+def exports(monkeypatch):
+    done = []
+
+    def export_onnx(weights, size):
+        path = os.path.splitext(weights)[0] + ".onnx"
+        with open(path, "w") as f:
+            f.write(open(weights).read())
+        done.append(weights)
+        return path
+
+    monkeypatch.setattr(Detector_Backends, "export_onnx", export_onnx)
+    return done
+
+
+def write(path, content, mtime):
+    path.write_text(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_export_is_reused_while_the_weights_are_unchanged(tmp_path, exports):
+    weights = tmp_path / "till.pt"
+    write(weights, "v1", 1000)
+
+    first = prepare(str(weights), "onnx")
+    assert prepare(str(weights), "onnx") == first
+    assert len(exports) == 1
+
+
+def test_replaced_weights_are_exported_again(tmp_path, exports):
+    weights = tmp_path / "till.pt"
+    write(weights, "v1", 1000)
+    write(tmp_path / "till.onnx", "v0", 500)
+
+    path = prepare(str(weights), "onnx")
+
+    assert len(exports) == 1
+    assert open(path).read() == "v1"
+
+
+def test_export_alone_is_served(tmp_path, exports):
+    write(tmp_path / "till.onnx", "v0", 500)
+    assert prepare(str(tmp_path / "till.pt"), "onnx") == str(tmp_path / "till.onnx")
+    assert exports == []
+
+
+def test_missing_weights_and_export_raise(tmp_path, exports):
+    with pytest.raises(FileNotFoundError):
+        prepare(str(tmp_path / "till.pt"), "onnx")
+    with pytest.raises(FileNotFoundError):
+        prepare(str(tmp_path / "till.pt"), "torch")
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Fast_Forecast import METHODS, forecast_matrix, forecast_sales, pivot_sales
+
+WEEK = [10, 12, 14, 16, 30, 40, 20]
+
+
+def weekly_sales(weeks=8, start=date(2024, 1, 1), dishes=("Paneer Tikka", "Dal Makhani")):
+    rows = []
+    for day in range(weeks * 7):
+        for scale, dish in enumerate(dishes, start=1):
+            rows.append({"date": start + timedelta(days=day), "dish_name": dish,
+                         "sales": WEEK[day % 7] * scale, "is_holiday": 0})
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_steady_weekly_pattern_is_carried_forward(method):
+    df = weekly_sales()
+    rows = forecast_sales(df, horizon=10, method=method)
+
+    first = df["date"].max() + timedelta(days=1)
+    # The history starts on day 0 of WEEK, so the forecast continues where it stopped
+    offset = len(df["date"].unique()) % 7
+    for dish, scale in (("Paneer Tikka", 1), ("Dal Makhani", 2)):
+        got = [round(sales, 6) for day, name, sales in rows if name == dish]
+        expected = [WEEK[(offset + h) % 7] * scale for h in range(10)]
+        assert got == pytest.approx(expected)
+    assert sorted({day for day, _, _ in rows}) == [first + timedelta(days=h) for h in range(10)]
+
+
+def test_holidays_do_not_move_the_weekday_baseline():
+    df = weekly_sales()
+    holiday = df["date"].max() - timedelta(days=6)
+    df.loc[df["date"] == holiday, ["sales", "is_holiday"]] = [500, 1]
+
+    _, dates, matrix = pivot_sales(df)
+    assert np.isnan(matrix[:, list(dates.date).index(holiday)]).all()
+    clean = forecast_matrix(pivot_sales(weekly_sales())[2], 7, "dow_ma")
+    assert forecast_matrix(matrix, 7, "dow_ma") == pytest.approx(clean)
+
+
+def test_short_and_missing_history():
+    # Three days only, one dish never sold on a weekday: no NaN, no negatives
+    matrix = np.array([[5.0, np.nan, 7.0], [np.nan, np.nan, np.nan]])
+    for method in METHODS:
+        forecast = forecast_matrix(matrix, 7, method)
+        assert forecast.shape == (2, 7)
+        assert np.isfinite(forecast).all() and (forecast >= 0).all()
+        assert (forecast[1] == 0).all()
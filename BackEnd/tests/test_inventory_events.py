@@ -0,0 +1,78 @@
+from Inventory_Events import InventoryEvents
+from Table_Versions import table_versions
+
+
+def row(ingredient, quantity, seq):
+    return {"ingredient": ingredient, "quantity": quantity, "remaining_life": 4, "quality": "Fresh", "seq": seq}
+
+
+def collect(events):
+    received = []
+    events.add_listener(received.append)
+    return received
+
+
+def test_late_older_rows_are_dropped():
+    events = InventoryEvents()
+    received = collect(events)
+    events._fan_out([row("Rice", 8, seq=2)])
+    events._fan_out([row("Rice", 10, seq=1)])  # Read before the seq=2 write, published after it
+    assert [[entry["quantity"] for entry in delta] for delta in received] == [[8]]
+
+
+def test_rows_seen_again_through_the_ledger_are_not_resent():
+    events = InventoryEvents()
+    received = collect(events)
+    events._fan_out([row("Rice", 8, seq=1)])
+    # The ledger poll re-reads the same write with a newer seq
+    events._fan_out([row("Rice", 8, seq=2), row("Oil", 3, seq=2)])
+    assert [[entry["ingredient"] for entry in delta] for delta in received] == [["Rice"], ["Oil"]]
+    assert "seq" not in received[0][0]
+    assert events.stats["published"] == 2
+
+
+class LedgerCursor:
+    """Answers the follower's three queries: NOW(3), the ledger window, the inventory rows."""
+
+    def __init__(self, now, entries, stock):
+        self.now, self.entries, self.stock = now, entries, stock
+        self.result = None
+
+    def execute(self, query, params=()):
+        if "NOW(3)" in query:
+            self.result = [(self.now,)]
+        elif "inventory_ledger" in query:
+            self.result = self.entries
+        else:
+            self.result = [(name, *values) for name, values in self.stock.items() if name in params]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+
+def test_ledger_poll_bumps_the_tables_other_workers_wrote():
+    events = InventoryEvents()
+    published = []
+    events.publish = published.extend
+    stock = {"Rice": (8, 4, "Fresh"), "Oil": (3, 9, "Fresh")}
+
+    since, seen = events._poll(LedgerCursor(100, [], stock), None, {})
+    before, _ = table_versions.snapshot(("inventory", "sales"))
+
+    entries = [(1, "Rice", "correction", 101)]
+    since, seen = events._poll(LedgerCursor(102, entries, stock), since, seen)
+    after_correction, _ = table_versions.snapshot(("inventory", "sales"))
+    assert after_correction == (before[0] + 1, before[1])
+
+    entries = entries + [(2, "Oil", "order", 103)]
+    since, seen = events._poll(LedgerCursor(104, entries, stock), since, seen)
+    after_order, _ = table_versions.snapshot(("inventory", "sales"))
+    assert after_order == (before[0] + 2, before[1] + 1)
+
+    # Nothing new: entry 1 and 2 are still in the look-back window but already seen
+    events._poll(LedgerCursor(105, entries, stock), since, seen)
+    assert table_versions.snapshot(("inventory", "sales"))[0] == after_order
+    assert [row["ingredient"] for row in published] == ["Rice", "Oil"]
@@ -0,0 +1,36 @@
+import pytest
+
+from Inventory_Ledger import adjust, record
+
+
+class Cursor:
+    def __init__(self):
+        self.rows = []
+
+    def executemany(self, query, rows):
+        assert query.startswith("INSERT INTO inventory_ledger")
+        self.rows.extend(rows)
+
+
+def test_record_skips_zero_deltas():
+    cursor = Cursor()
+    record(cursor, {"Rice": -3, "Salt": 0, "Oil": 2}, "order")
+    assert cursor.rows == [("Rice", -3, "order"), ("Oil", 2, "order")]
+
+    cursor = Cursor()
+    record(cursor, {"Salt": 0}, "intake")
+    assert cursor.rows == []
+
+
+def test_record_rejects_unknown_kinds():
+    with pytest.raises(ValueError, match="Unknown ledger kind 'theft'"):
+        record(Cursor(), {"Rice": -1}, "theft")
+
+
+@pytest.mark.parametrize("delta, kind, message", [
+    (-2, "order", "Manual adjustments are 'correction' or 'waste'"),
+    (3, "waste", "Waste must be a negative delta"),
+])
+def test_adjust_validates_before_touching_the_database(delta, kind, message):
+    with pytest.raises(ValueError, match=message):
+        adjust("Rice", delta, kind)
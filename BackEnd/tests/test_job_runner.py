@@ -0,0 +1,130 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+import Job_Runner
+from Job_Runner import JobRunner, parse_schedule
+from Metrics import forecast_dish_seconds, job_seconds
+from Table_Versions import table_versions
+
+
+def test_parse_schedule():
+    assert parse_schedule("forecast@06:00, ledger_snapshot@03:00,,ledger_snapshot@15:30") == [
+        ("forecast", (6, 0)), ("ledger_snapshot", (3, 0)), ("ledger_snapshot", (15, 30)),
+    ]
+    assert parse_schedule("") == []
+    with pytest.raises(ValueError, match="Unknown job 'backup'"):
+        parse_schedule("backup@01:00")
+
+
+class JobRuns:
+    """job_runs in memory: the unique (job_name, scheduled_for) key decides who runs a slot."""
+
+    def __init__(self):
+        self.rows = {}
+        self.finished = []
+        self.now = datetime(2025, 3, 14, 7, 0)
+
+    @contextmanager
+    def get_cursor(self, commit=False):
+        job_runs = self
+
+        class Cursor:
+            rowcount = 0
+            lastrowid = None
+
+            def execute(self, query, params=()):
+                if "INSERT IGNORE INTO job_runs" in query:
+                    key = params[:2]
+                    self.rowcount = 0 if key in job_runs.rows else 1
+                    if self.rowcount:
+                        job_runs.rows[key] = self.lastrowid = len(job_runs.rows) + 1
+                elif query.strip() == "SELECT NOW(3);":
+                    self.result = [(job_runs.now,)]
+                elif "FROM job_runs" in query:
+                    self.result = job_runs.finished
+
+            def fetchone(self):
+                return self.result[0]
+
+            def fetchall(self):
+                return self.result
+
+        yield Cursor()
+
+
+class Process:
+    exitcode = 0
+
+    def __init__(self, target, args, name):
+        self.args = args
+
+    def start(self):
+        pass
+
+    def join(self):
+        pass
+
+
+@pytest.fixture
+def job_runs(monkeypatch):
+    job_runs = JobRuns()
+    monkeypatch.setattr(Job_Runner, "get_cursor", job_runs.get_cursor)
+    return job_runs
+
+
+def runner(schedule="forecast@06:00,archive_cleanup@04:00"):
+    job_runner = JobRunner(parse_schedule(schedule), catch_up_hours=6)
+    job_runner._context = type("Context", (), {"Process": Process})
+    return job_runner
+
+
+def test_each_slot_runs_once_across_workers(job_runs):
+    workers = [runner(), runner()]
+    now = datetime(2025, 3, 14, 6, 30)
+    for worker in workers:
+        worker.run_due(now)
+        worker.run_due(now + timedelta(minutes=1))
+
+    assert sorted(job_runs.rows) == [
+        ("archive_cleanup", datetime(2025, 3, 14, 4, 0)),
+        ("forecast", datetime(2025, 3, 14, 6, 0)),
+    ]
+
+
+def test_slots_older_than_the_catch_up_window_are_skipped(job_runs):
+    job_runner = runner("forecast@06:00")
+    job_runner.run_due(datetime(2025, 3, 14, 5, 0))   # Yesterday's 06:00 is 23 hours old
+    job_runner.run_due(datetime(2025, 3, 14, 12, 30))  # Today's is 6.5 hours old
+    assert job_runs.rows == {}
+    job_runner.run_due(datetime(2025, 3, 15, 6, 0))
+    assert list(job_runs.rows) == [("forecast", datetime(2025, 3, 15, 6, 0))]
+
+
+def test_manual_run_of_an_unknown_job():
+    with pytest.raises(ValueError, match="Unknown job"):
+        runner().submit("backup")
+
+
+def test_sync_applies_runs_finished_elsewhere(job_runs):
+    job_runner = runner()
+    job_runner._followed_since = job_runs.now - timedelta(minutes=1)
+    result = json.dumps({"backend": "prophet", "dish_seconds": {"Idli": 1.23456}})
+    job_runs.finished = [
+        (7, "forecast", "succeeded", 42.0, result, job_runs.now),
+        (8, "rollups", "failed", 3.0, json.dumps({"error": "boom"}), job_runs.now),
+    ]
+    before, _ = table_versions.snapshot(("predictions", "sales"))
+
+    assert [row[0] for row in job_runner.sync()] == [7, 8]
+    after, _ = table_versions.snapshot(("predictions", "sales"))
+    # Only the succeeded forecast invalidates what it wrote
+    assert (after[0] - before[0], after[1] - before[1]) == (1, 0)
+    assert forecast_dish_seconds._values[("Idli",)] == 1.235
+    assert job_seconds._values[("forecast", "succeeded")][2] >= 1
+
+    # Runs already seen are not applied twice
+    assert job_runner.sync() == []
+    assert table_versions.snapshot(("predictions",))[0] == after[:1]
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+
+import Model_Registry
+from Model_Registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ModelRegistry(max_instances=1, wait_interval=0.05)
+    # Instances only need an identity here, no weights are loaded
+    monkeypatch.setattr(registry, "_load_instance", lambda path: object())
+    monkeypatch.setattr(Model_Registry, "resolve", lambda name, path=None: path)
+    registry.load("till", "old.pt")
+    return registry
+
+
+def test_instance_goes_back_to_the_pool(registry):
+    with registry.model("till") as first:
+        pass
+    with registry.model("till") as second:
+        assert second is first
+    assert registry.status()["till"]["idle"] == 1
+
+
+def test_waiter_gets_the_new_generation_after_a_swap(registry):
+    served = []
+
+    def waiter():
+        with registry.model("till") as instance:
+            served.append(instance)
+
+    with registry.model("till") as old:
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        new = registry.swap("till", "new.pt")
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert served == [new] and new is not old
+    assert registry.status()["till"] == dict(registry.status()["till"], path=Model_Registry.weights_path("new.pt"), generation=1, instances=1, idle=1)
+
+
+def test_failed_load_frees_its_slot(registry, monkeypatch):
+    with registry.model("till"):
+        pass
+    entry = registry._models["till"]
+    entry["idle"].get_nowait()  # Force the next checkout to load a new instance
+    entry["created"] = 0
+
+    def broken(path):
+        raise RuntimeError("corrupt weights")
+
+    monkeypatch.setattr(registry, "_load_instance", broken)
+    with pytest.raises(RuntimeError):
+        with registry.model("till"):
+            pass
+    assert entry["created"] == 0
+
+
+def test_swap_only_loads_weights_inside_the_model_dir(registry, tmp_path, monkeypatch):
+    models = tmp_path / "Models"
+    models.mkdir()
+    (models / "new.pt").write_bytes(b"")
+    (tmp_path / "elsewhere.pt").write_bytes(b"")
+    monkeypatch.setattr(Model_Registry, "MODEL_DIR", str(models))
+
+    assert Model_Registry.weights_path("new.pt") == str((models / "new.pt").resolve())
+    assert Model_Registry.weights_path(str(models / "new.pt")) == str((models / "new.pt").resolve())
+    for outside in ("../elsewhere.pt", str(tmp_path / "elsewhere.pt"), "/etc/passwd"):
+        with pytest.raises(ValueError):
+            registry.swap("till", outside)
+    assert registry.status()["till"]["path"] == "old.pt"
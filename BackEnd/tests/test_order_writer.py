@@ -0,0 +1,164 @@
+import json
+from contextlib import contextmanager
+
+import pytest
+
+import Order_Writer
+import SQL_Action
+from Order_Writer import OrderWriteBehind
+from SQL_Action import aggregate_orders
+
+
+class Recipes:
+    def __init__(self, recipes):
+        self.recipes = recipes
+
+    def ingredients_for(self, dish_name):
+        return self.recipes.get(dish_name)
+
+
+class Database:
+    """The rows OrderWriteBehind reads and writes, held in memory."""
+
+    def __init__(self, stock):
+        self.stock = dict(stock)
+        self.journal_state = {}
+        self.posted = []
+
+    def apply_orders(self, cursor, orders, order_times=None, strict=True):
+        servings, required = aggregate_orders(orders)
+        for ingredient, quantity in required.items():
+            self.stock[ingredient] = max(self.stock[ingredient] - quantity, 0)
+        self.posted.extend(orders)
+        return servings
+
+    @contextmanager
+    def get_cursor(self, commit=False):
+        database = self
+
+        class Cursor:
+            def execute(self, query, params=()):
+                if "SELECT last_seq" in query:
+                    seq = database.journal_state.get(params[0])
+                    self.rows = [(seq,)] if seq is not None else []
+                elif "INSERT INTO order_journal_state" in query:
+                    database.journal_state[params[0]] = params[1]
+                elif "FROM inventory" in query:
+                    self.rows = list(database.stock.items())
+
+            def fetchone(self):
+                return self.rows[0] if self.rows else None
+
+            def fetchall(self):
+                return self.rows
+
+        yield Cursor()
+
+
+@pytest.fixture
+def recipes(monkeypatch):
+    store = Recipes({"Idli": {"Batter": 2}, "Vada": {"Batter": 1, "Oil": 1}})
+    monkeypatch.setattr(SQL_Action, "recipe_store", store)
+    return store
+
+
+@pytest.fixture
+def database(monkeypatch, recipes):
+    database = Database({"Batter": 100, "Oil": 100})
+    monkeypatch.setattr(Order_Writer, "get_cursor", database.get_cursor)
+    monkeypatch.setattr(Order_Writer, "apply_orders", database.apply_orders)
+    monkeypatch.setattr(Order_Writer.inventory_events, "changed_rows", lambda cursor, ingredients: [])
+    return database
+
+
+def writer(journal):
+    return OrderWriteBehind(flush_interval=3600, flush_size=10_000, journal_path=str(journal))
+
+
+def crash(order_writer):
+    # Stop the flusher and drop the files without flushing what is pending
+    order_writer.flush = lambda: 0
+    order_writer._running = False
+    order_writer._wake.set()
+    order_writer._thread.join()
+    order_writer._journal.close()
+    order_writer._journal_lock.close()
+
+
+def test_aggregate_orders(recipes):
+    servings, required = aggregate_orders([("Idli", 2), ("Vada", 1), ("Idli", 1)])
+    assert servings == {"Idli": 3, "Vada": 1}
+    assert required == {"Batter": 7, "Oil": 1}
+    with pytest.raises(ValueError, match="must be positive"):
+        aggregate_orders([("Idli", 0)])
+    with pytest.raises(ValueError, match="not found in the menu"):
+        aggregate_orders([("Dosa", 1)])
+
+
+def test_accept_checks_the_snapshot(database):
+    order_writer = OrderWriteBehind(flush_interval=3600)
+    order_writer.refresh_snapshot()
+    order_writer.accept([("Idli", 40)])
+    with pytest.raises(ValueError, match="Not enough 'Batter'"):
+        order_writer.accept([("Idli", 11)])
+    assert order_writer.flush() == 1
+    assert database.stock["Batter"] == 20
+
+
+def test_replay_posts_only_unflushed_orders(database, tmp_path):
+    journal = tmp_path / "orders.log"
+    first = writer(journal)
+    first.start()
+    first.accept([("Idli", 1)])
+    first.flush()
+    first.accept([("Vada", 2)])
+    first.accept([("Idli", 3), ("Vada", 1)])
+    crash(first)
+
+    second = writer(journal)
+    second.start()
+    assert [orders for _, _, orders in second._pending] == [[("Vada", 2)], [("Idli", 3), ("Vada", 1)]]
+    second.stop()
+    assert database.posted == [("Idli", 1), ("Vada", 2), ("Idli", 3), ("Vada", 1)]
+    assert database.journal_state == {"orders.log": 3}
+    assert journal.read_text() == ""
+
+    third = writer(journal)
+    third.start()
+    assert third._pending == []
+    third.stop()
+
+
+def test_unpostable_batch_is_set_aside(database, recipes, tmp_path):
+    journal = tmp_path / "orders.log"
+    order_writer = writer(journal)
+    order_writer.start()
+    order_writer.accept([("Idli", 1)])
+    order_writer.accept([("Vada", 1)])
+    order_writer.accept([("Idli", 2)])
+    del recipes.recipes["Vada"]  # Taken off the menu after it was accepted
+
+    assert order_writer.flush() == 2
+    assert database.posted == [("Idli", 1), ("Idli", 2)]
+    assert order_writer._pending == []
+    assert database.journal_state == {"orders.log": 3}
+    dead = [json.loads(line) for line in (tmp_path / "orders.log.dead").read_text().splitlines()]
+    assert [(entry["seq"], entry["orders"]) for entry in dead] == [(2, [["Vada", 1]])]
+    order_writer.stop()
+
+
+def test_workers_sharing_a_path_get_their_own_journal(database, tmp_path):
+    journal = tmp_path / "orders.log"
+    first, second = writer(journal), writer(journal)
+    first.start()
+    second.start()
+    try:
+        assert (first.journal_name, second.journal_name) == ("orders.log", "orders.log.1")
+        first.accept([("Idli", 1)])
+        second.accept([("Vada", 1)])
+        assert first._pending[0][0] == second._pending[0][0] == 1
+        second.flush()
+        assert "Idli" in journal.read_text()
+    finally:
+        first.stop()
+        second.stop()
@@ -0,0 +1,93 @@
+import pytest
+
+from Recommendation_Engine import RecommendationEngine
+
+MENU = [
+    {"dish_name": "Tomato Soup", "price": 120, "ingredients": ["Tomato", "Onion", "Garlic"]},
+    {"dish_name": "Veg Stir Fry", "price": 180, "ingredients": ["Capsicum", "Onion", "Carrot", "Garlic"]},
+    {"dish_name": "Spinach Dal", "price": 150, "ingredients": ["Spinach", "Garlic"]},
+    {"dish_name": "Corn Salad", "price": 90, "ingredients": ["Corn", "Cucumber", "Tomato"]},
+    {"dish_name": "Potato Fry", "price": 100, "ingredients": ["Potato"]},
+]
+
+INVENTORY = [
+    {"ingredient": "Tomato", "quantity": 10, "remaining_life": 2, "max_life": 7},
+    {"ingredient": "Onion", "quantity": 20, "remaining_life": 5, "max_life": 20},  # On the boundary, not urgent
+    {"ingredient": "Garlic", "quantity": 5, "remaining_life": 4.9, "max_life": 30},
+    {"ingredient": "Capsicum", "quantity": 8, "remaining_life": 1, "max_life": 6},
+    {"ingredient": "Carrot", "quantity": 12, "remaining_life": 9, "max_life": 14},
+    {"ingredient": "Spinach", "quantity": 3, "remaining_life": 6, "max_life": 4},
+    {"ingredient": "Corn", "quantity": 7, "remaining_life": 12, "max_life": 12},
+    {"ingredient": "Potato", "quantity": 30, "remaining_life": 25, "max_life": 60},
+]
+
+
+def page_score(dish, inventory, selected):
+    """The rule FoodRecommendation.jsx used: 2 per picked ingredient, 3 per ingredient under 5 days."""
+    matched = [i for i in dish["ingredients"] if i.lower() in selected]
+    urgent = [
+        i for i in dish["ingredients"]
+        if any(item["ingredient"].lower() == i.lower() and item["remaining_life"] < 5 for item in inventory)
+    ]
+    return 2 * len(matched) + 3 * len(urgent)
+
+
+def engine_for(inventory, menu=MENU):
+    engine = RecommendationEngine(urgent_days=5, refresh_interval=3600)
+    engine.rebuild(inventory, menu)
+    return engine
+
+
+def assert_matches_page(engine, inventory, selected):
+    result = engine.recommend(top_k=len(MENU), ingredients=selected)
+    expected = {dish["dish_name"]: page_score(dish, inventory, {i.lower() for i in selected}) for dish in MENU}
+    expected = {name: score for name, score in expected.items() if score}
+
+    assert {dish["dish_name"]: dish["score"] for dish in result["dishes"]} == expected
+    scores = [dish["score"] for dish in result["dishes"]]
+    assert scores == sorted(scores, reverse=True)
+    assert result["candidates"] == len(expected)
+
+
+@pytest.mark.parametrize("selected", [[], ["onion"], ["garlic", "tomato"], ["Potato", "carrot", "garlic"]])
+def test_scores_match_the_recommendation_page(selected):
+    assert_matches_page(engine_for(INVENTORY), INVENTORY, selected)
+
+
+def test_remaining_life_equal_to_urgent_days_is_not_urgent():
+    engine = engine_for(INVENTORY)
+    assert "Onion" not in [item["ingredient"] for item in engine.use_soon()]
+    soup = next(d for d in engine.recommend(top_k=5)["dishes"] if d["dish_name"] == "Tomato Soup")
+    assert soup["urgent"] == ["Garlic", "Tomato"]
+
+
+def test_incremental_updates_match_a_rebuild():
+    engine = engine_for(INVENTORY)
+    changes = [
+        {"ingredient": "Tomato", "remaining_life": 5},     # Leaves the urgent set at the boundary
+        {"ingredient": "Onion", "remaining_life": 4.5},    # Enters it
+        {"ingredient": "Potato", "remaining_life": 0},
+    ]
+    engine.apply(changes)
+
+    inventory = [dict(row) for row in INVENTORY]
+    for change in changes:
+        next(row for row in inventory if row["ingredient"] == change["ingredient"]).update(change)
+    for selected in ([], ["tomato", "spinach"]):
+        assert_matches_page(engine, inventory, selected)
+
+
+def test_dish_matched_several_ways_is_one_candidate():
+    # Listed twice in the menu, urgent, and using two picked ingredients
+    engine = engine_for(INVENTORY, MENU + [MENU[1]])
+    result = engine.recommend(top_k=10, ingredients=["onion", "garlic"])
+    names = [dish["dish_name"] for dish in result["dishes"]]
+    assert names.count("Veg Stir Fry") == 1
+    stir_fry = result["dishes"][names.index("Veg Stir Fry")]
+    assert stir_fry["score"] == 2 * 2 + 3 * 2
+    assert result["candidates"] == len(set(names)) == 4
+
+
+def test_dish_listed_twice_in_the_menu_is_scored_once():
+    engine = engine_for(INVENTORY, MENU + [MENU[4]])
+    assert_matches_page(engine, INVENTORY, ["potato"])
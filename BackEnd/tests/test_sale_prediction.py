@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("prophet")
+
+from Sale_prediction import FORECAST_DAYS, extend_dish, fit_dish
+
+HISTORY_END = date(2024, 3, 31)
+
+
+def history(days=60):
+    dates = [HISTORY_END - timedelta(days=day) for day in reversed(range(days))]
+    return pd.DataFrame({"ds": pd.to_datetime(dates), "y": [20 + day % 7 for day in range(days)]})
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    return fit_dish("Paneer Tikka", history())
+
+
+def test_without_a_start_the_forecast_follows_the_history(fitted):
+    dish, rows, _, _ = fitted
+    assert dish == "Paneer Tikka"
+    assert [day for day, _, _ in rows] == [HISTORY_END + timedelta(days=h) for h in range(1, FORECAST_DAYS + 1)]
+
+
+def test_stored_model_rolls_the_window_forward_without_refitting(fitted):
+    _, rows, _, model_json = fitted
+    today = HISTORY_END + timedelta(days=5)
+
+    dish, extended, _ = extend_dish("Paneer Tikka", model_json, today)
+
+    assert dish == "Paneer Tikka"
+    assert [day for day, _, _ in extended] == [today + timedelta(days=h) for h in range(FORECAST_DAYS)]
+    # Same model, so the days both windows cover get the same prediction
+    overlap = {day: sales for day, _, sales in rows}
+    for day, _, sales in extended:
+        if day in overlap:
+            assert sales == pytest.approx(overlap[day])
+
+
+def test_refit_predicts_from_the_given_start(fitted):
+    _, _, _, model_json = fitted
+    today = HISTORY_END + timedelta(days=3)
+    _, rows, _, _ = fit_dish("Paneer Tikka", history(), model_json, today)
+    assert [day for day, _, _ in rows] == [today + timedelta(days=h) for h in range(FORECAST_DAYS)]
@@ -0,0 +1,25 @@
+from datetime import date
+
+from SQL_Action import sales_rows_to_columnar
+
+
+def test_columnar_encoding_round_trips():
+    rows = [
+        (1, date(2025, 1, 1), "Idli", 12),
+        (2, date(2025, 1, 1), "Vada", 7),
+        (3, date(2025, 1, 2), "Idli", 9),
+        (4, date(2025, 1, 2), "Pongal", 0),
+    ]
+    columns = sales_rows_to_columnar(rows)
+
+    assert columns["dishes"] == ["Idli", "Vada", "Pongal"]
+    assert columns["dates"] == ["2025-01-01", "2025-01-01", "2025-01-02", "2025-01-02"]
+    decoded = [
+        (day, columns["dishes"][dish], sales)
+        for day, dish, sales in zip(columns["dates"], columns["dish"], columns["sales"])
+    ]
+    assert decoded == [(row[1].isoformat(), row[2], row[3]) for row in rows]
+
+
+def test_columnar_encoding_of_nothing():
+    assert sales_rows_to_columnar([]) == {"dates": [], "dish": [], "sales": [], "dishes": []}
@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+
+from Sales_Rollups import period_start
+from SQL_Action import months_ago
+
+
+@pytest.mark.parametrize("day, n, expected", [
+    (date(2025, 5, 15), 1, date(2025, 4, 15)),
+    (date(2025, 3, 31), 1, date(2025, 2, 28)),   # Clamped to the shorter month
+    (date(2024, 3, 31), 1, date(2024, 2, 29)),   # Leap year
+    (date(2025, 1, 31), 2, date(2024, 11, 30)),  # Across the year boundary
+    (date(2025, 12, 1), 12, date(2024, 12, 1)),
+    (date(2025, 7, 10), 0, date(2025, 7, 10)),
+    (date(2025, 2, 28), 25, date(2023, 1, 28)),
+])
+def test_months_ago(day, n, expected):
+    assert months_ago(day, n) == expected
+
+
+def test_period_start():
+    day = date(2025, 3, 14)  # A Friday
+    assert period_start(day, "day") == day
+    assert period_start(day, "week") == date(2025, 3, 10)
+    assert period_start(date(2025, 3, 10), "week") == date(2025, 3, 10)
+    assert period_start(day, "month") == date(2025, 3, 1)
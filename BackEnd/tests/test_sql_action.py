@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+
+import SQL_Action
+from SQL_Action import apply_orders
+
+RECIPES = {
+    "Masala Dosa": {"Rice Batter": 2, "Potato": 1, "Curry Leaves": 0},
+    "Veg Pulao": {"Rice": 3, "Potato": 1},
+}
+
+
+class Recipes:
+    def ingredients_for(self, dish_name):
+        return RECIPES.get(dish_name)
+
+
+class Connection:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def rollback(self):
+        self.cursor.stock = dict(self.cursor.committed)
+        self.cursor.ledger = []
+
+
+class InventoryCursor:
+    """Just enough of MySQL for apply_orders: the inventory rows, counted like MySQL counts them."""
+
+    def __init__(self, stock):
+        self.stock = dict(stock)
+        self.committed = dict(stock)
+        self.ledger = []
+        self.sales = []
+        self.rowcount = 0
+        self.rows = []
+        self.connection = Connection(self)
+
+    def execute(self, query, params=()):
+        params = list(params)
+        if query.lstrip().startswith("UPDATE inventory"):
+            strict = "quantity >=" in query
+            count = len(params) // (5 if strict else 3)
+            required = dict(zip(params[0:2 * count:2], params[1:2 * count:2]))
+            self.rowcount = 0
+            for ingredient in params[2 * count:3 * count]:
+                have = self.stock.get(ingredient)
+                if have is None or (strict and have < required[ingredient]):
+                    continue
+                new = have - required[ingredient] if strict else max(have - required[ingredient], 0)
+                # MySQL's rowcount counts changed rows only
+                self.rowcount += new != have
+                self.stock[ingredient] = new
+        elif query.lstrip().startswith("SELECT ingredient, quantity FROM inventory"):
+            self.rows = [(ingredient, self.stock[ingredient]) for ingredient in params if ingredient in self.stock]
+        else:
+            raise AssertionError(f"Unexpected statement: {query}")
+
+    def executemany(self, query, rows):
+        if "inventory_ledger" in query:
+            self.ledger.extend(rows)
+        else:
+            self.sales.append((query.split()[2], list(rows)))
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.fixture(autouse=True)
+def recipes(monkeypatch):
+    monkeypatch.setattr(SQL_Action, "recipe_store", Recipes())
+
+
+def test_strict_posting_takes_exact_quantities():
+    cursor = InventoryCursor({"Rice Batter": 10, "Potato": 5, "Curry Leaves": 0, "Rice": 9})
+    posted = apply_orders(cursor, [("Masala Dosa", 2), ("Veg Pulao", 1), ("Masala Dosa", 1)])
+
+    assert posted == {"Masala Dosa": 3, "Veg Pulao": 1}
+    assert cursor.stock == {"Rice Batter": 4, "Potato": 1, "Curry Leaves": 0, "Rice": 6}
+    # Zero-quantity recipe lines are neither updated nor logged
+    assert sorted(cursor.ledger) == [("Potato", -4, "order"), ("Rice", -3, "order"), ("Rice Batter", -6, "order")]
+
+
+def test_strict_shortage_rolls_back_and_names_the_ingredient():
+    cursor = InventoryCursor({"Rice Batter": 10, "Potato": 1, "Curry Leaves": 3})
+    with pytest.raises(ValueError, match="Not enough 'Potato' in inventory. Required: 2, Available: 1"):
+        apply_orders(cursor, [("Masala Dosa", 2)])
+    assert cursor.stock == cursor.committed
+    assert cursor.ledger == []
+
+
+def test_strict_missing_ingredient():
+    cursor = InventoryCursor({"Potato": 10})
+    with pytest.raises(ValueError, match="Ingredient 'Rice' not found in inventory."):
+        apply_orders(cursor, [("Veg Pulao", 1)])
+
+
+def test_clamped_posting_logs_what_was_really_taken():
+    cursor = InventoryCursor({"Rice Batter": 3, "Potato": 10, "Curry Leaves": 1})
+    order_time = datetime(2025, 3, 14, 12, 30)
+    apply_orders(cursor, [("Masala Dosa", 2)], [order_time], strict=False)
+
+    assert cursor.stock == {"Rice Batter": 0, "Potato": 8, "Curry Leaves": 1}
+    assert sorted(cursor.ledger) == [("Potato", -2, "order"), ("Rice Batter", -3, "order")]
+    tables = dict(cursor.sales)
+    assert tables["sales_data"] == [(order_time.date(), 5, 3, 0, 0, "Masala Dosa", 2)]
+    assert tables["orders"] == [("Masala Dosa", 2, order_time)]
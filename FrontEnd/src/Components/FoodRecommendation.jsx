@@ -2,8 +2,8 @@
 import React, { useState, useEffect } from 'react';
 
 const FoodRecommendationApp = () => {
-  const [menu, setMenu] = useState([]);
-  const [inventory, setInventory] = useState([]);
+  const [dishes, setDishes] = useState([]);
+  const [useSoon, setUseSoon] = useState([]);
   const [selectedIngredients, setSelectedIngredients] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -17,37 +17,33 @@ const FoodRecommendationApp = () => {
     'spring onion', 'tomato'
   ];
   const API_URL = process.env.REACT_APP_API_URL;
-  // Fetch menu and inventory data
+  // Ranking, discounts and the use-soon list come from /recommendations,
+  // re-fetched whenever the picked ingredients change
   useEffect(() => {
     const fetchData = async () => {
-      setLoading(true);
       try {
-        // Fetch menu data
-        const menuResponse = await fetch(`${API_URL}/Get_Menu`);
-        if (!menuResponse.ok) {
-          throw new Error('Failed to fetch menu data');
+        const params = new URLSearchParams({ top_k: 30 });
+        if (selectedIngredients.length) {
+          params.set('ingredients', selectedIngredients.join(','));
         }
-        const menuData = await menuResponse.json();
-        setMenu(Array.isArray(menuData) ? menuData : [menuData]);
-        
-        // Fetch inventory data
-        const inventoryResponse = await fetch(`${API_URL}/get_inventory_item`);
-        if (!inventoryResponse.ok) {
-          throw new Error('Failed to fetch inventory data');
+        const response = await fetch(`${API_URL}/recommendations?${params}`);
+        if (!response.ok) {
+          throw new Error('Failed to fetch recommendations');
         }
-        const inventoryData = await inventoryResponse.json();
-        setInventory(Array.isArray(inventoryData) ? inventoryData : [inventoryData]);
-        
-        setLoading(false);
+        const data = await response.json();
+        setDishes(data.dishes);
+        setUseSoon(data.use_soon);
+        setError(null);
       } catch (error) {
         console.error('Error fetching data:', error);
         setError(error.message);
+      } finally {
         setLoading(false);
       }
     };
-    
+
     fetchData();
-  }, []);
+  }, [selectedIngredients]);
 
   // Handle ingredient selection
   const handleIngredientToggle = (ingredient) => {
@@ -58,52 +54,8 @@ const FoodRecommendationApp = () => {
     );
   };
 
-  // Calculate discount based on remaining life
-  const calculateDiscount = (ingredient) => {
-    const inventoryItem = inventory.find(item => 
-      item.ingredient.toLowerCase() === ingredient.toLowerCase()
-    );
-    
-    if (!inventoryItem) return 0;
-    
-    // If remaining life is less than half of max life, apply discount
-    if (inventoryItem.remaining_life < 5) {
-      // Higher discount for items closer to expiration
-      const lifePercentage = inventoryItem.remaining_life / inventoryItem.max_life;
-      return Math.round((1 - lifePercentage) * 30); // Up to 30% discount
-    }
-    
-    return 0;
-  };
-
-  // Get recommendation score for each dish
-  const getRecommendationScore = (dish) => {
-    if (!dish.ingredients) return 0;
-    
-    const matchedIngredients = dish.ingredients.filter(ingredient => 
-      selectedIngredients.includes(ingredient.toLowerCase())
-    );
-    
-    const urgentIngredients = dish.ingredients.filter(ingredient => {
-      const inventoryItem = inventory.find(item => 
-        item.ingredient.toLowerCase() === ingredient.toLowerCase()
-      );
-      return inventoryItem && inventoryItem.remaining_life < 5;
-    });
-    
-    // Score based on matched ingredients and urgent ingredients
-    return (matchedIngredients.length * 2) + (urgentIngredients.length * 3);
-  };
-
-  // Sort menu items by recommendation score
-  const sortedMenu = [...menu].sort((a, b) => 
-    getRecommendationScore(b) - getRecommendationScore(a)
-  );
-
   // Get urgent ingredients that need to be used soon
-  const urgentIngredients = inventory
-    .filter(item => item.remaining_life < 5)
-    .map(item => item.ingredient.toLowerCase());
+  const urgentIngredients = useSoon.map(item => item.ingredient.toLowerCase());
 
   if (loading) return <div className="flex justify-center items-center min-h-screen">Loading...</div>;
   if (error) return <div className="text-red-500 text-center mt-8">{error}</div>;
@@ -153,8 +105,7 @@ const FoodRecommendationApp = () => {
         <div className="bg-yellow-100 border-l-4 border-yellow-500 p-4 mb-8">
           <p className="font-bold">Ingredients to use soon:</p>
           <p>
-            {inventory
-              .filter(item => item.remaining_life < 5)
+            {useSoon
               .map(item => `${item.ingredient} (${item.remaining_life} days left)`)
               .join(', ')}
           </p>
@@ -169,28 +120,11 @@ const FoodRecommendationApp = () => {
       )}
       
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-        {sortedMenu
-          .filter(dish => getRecommendationScore(dish) > 0)
+        {dishes
           .map((dish, index) => {
-            const matchedIngredients = dish.ingredients.filter(ingredient => 
-              selectedIngredients.includes(ingredient.toLowerCase())
-            );
-            
-            const dishUrgentIngredients = dish.ingredients.filter(ingredient => 
-              urgentIngredients.includes(ingredient.toLowerCase())
-            );
-            
-            const totalDiscount = dishUrgentIngredients.reduce(
-              (total, ingredient) => total + calculateDiscount(ingredient), 
-              0
-            );
-            
-            // Average discount rounded to nearest 5%
-            const finalDiscount = dishUrgentIngredients.length 
-              ? Math.round(totalDiscount / dishUrgentIngredients.length / 5) * 5 
-              : 0;
-              
-            const discountedPrice = dish.price - (dish.price * finalDiscount / 100);
+            const finalDiscount = dish.discount;
+            const discountedPrice = dish.discounted_price;
+            const dishUrgentIngredients = dish.urgent;
             
             return (
               <div 
@@ -270,7 +204,7 @@ const FoodRecommendationApp = () => {
           })}
       </div>
       
-      {selectedIngredients.length > 0 && sortedMenu.filter(dish => getRecommendationScore(dish) > 0).length === 0 && (
+      {selectedIngredients.length > 0 && dishes.length === 0 && (
         <p className="text-gray-500">No matching dishes found with your selected ingredients.</p>
       )}
     </div>
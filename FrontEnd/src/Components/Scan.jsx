@@ -225,8 +225,12 @@ function App() {
         const parsedData = JSON.parse(responseText);
         console.log("Parsed JSON data:", parsedData);
         
-        // Handle the specific format you're receiving: {"filename":{"vegetable1":count, ...}}
-        if (parsedData && typeof parsedData === 'object') {
+        // Current format: {"filename": {"vegetable1": count, ...}, "scan_id": ..., "image_url": ...}
+        // The annotated image belongs to this scan, so concurrent scans don't mix up
+        if (parsedData && parsedData.scan_id) {
+          setDetectionResults(parsedData.filename);
+          setDetectionImage(`${API_URL}/get-image/${parsedData.scan_id}`);
+        } else if (parsedData && typeof parsedData === 'object') {
           // Check if it has the nested structure with filename
           if (Object.keys(parsedData).length === 1) {
             const filename = Object.keys(parsedData)[0];
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import useInventoryFeed from "./useInventoryFeed";
 import SpoilagePrediction from "./spoilage-prediction";
 import { InventoryTracker } from "./inventory-trackor";
 import { OperationsOptimizer } from "./operation-optimizer";
@@ -7,43 +7,13 @@ import MenuSection from "./menu";
 import InventoryChart from "./inventoryChart";
 
 export default function Dashboard({ activeTab }) {
-  const [inventoryItems, setInventoryItems] = useState([]);
-  const [expiringItems, setExpiringItems] = useState([]);
-  const [isLoading, setIsLoading] = useState(true);
-  const [error, setError] = useState(null);
-  const API_URL = process.env.REACT_APP_API_URL;
-  // Fetch inventory data from API
-  useEffect(() => {
-    const fetchInventory = async () => {
-      try {
-        setIsLoading(true);
-        const response = await fetch(
-          `${API_URL}/get_inventory_item`
-        );
-
-        if (!response.ok) {
-          throw new Error(`HTTP error! Status: ${response.status}`);
-        }
-
-        const data = await response.json();
-        setInventoryItems(data);
-
-        // Process items with remaining life span of 7 days or less
-        const itemsExpiringWithinWeek = data
-          .filter((item) => item.remaining_life <= 7)
-          .sort((a, b) => a.remaining_life - b.remaining_life); // Sort by soonest expiring
-
-        setExpiringItems(itemsExpiringWithinWeek);
-        setIsLoading(false);
-      } catch (err) {
-        console.error("Error fetching inventory data:", err);
-        setError(err.message);
-        setIsLoading(false);
-      }
-    };
+  // Pushed by the server instead of polled
+  const { items: inventoryItems, isLoading, error } = useInventoryFeed();
 
-    fetchInventory();
-  }, []);
+  // Items with remaining life span of 7 days or less, soonest expiring first
+  const expiringItems = inventoryItems
+    .filter((item) => item.remaining_life <= 7)
+    .sort((a, b) => a.remaining_life - b.remaining_life);
 
   // Function to determine expiration text based on remaining life
   const getExpirationText = (remainingLife) => {
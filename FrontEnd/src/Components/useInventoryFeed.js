@@ -0,0 +1,41 @@
+import { useEffect, useState } from "react";
+
+// Live inventory from /inventory/events: a full snapshot on connect, then
+// per-ingredient deltas as orders and scans are committed. EventSource
+// reconnects (and gets a fresh snapshot) on its own after a drop.
+export default function useInventoryFeed() {
+  const [items, setItems] = useState([]);
+  const [isLoading, setIsLoading] = useState(true);
+  const [error, setError] = useState(null);
+  const API_URL = process.env.REACT_APP_API_URL;
+
+  useEffect(() => {
+    const source = new EventSource(`${API_URL}/inventory/events`);
+
+    source.addEventListener("snapshot", (event) => {
+      setItems(JSON.parse(event.data));
+      setError(null);
+      setIsLoading(false);
+    });
+
+    source.addEventListener("delta", (event) => {
+      const changes = JSON.parse(event.data);
+      setItems((current) => {
+        const byName = new Map(current.map((item) => [item.ingredient.toLowerCase(), item]));
+        for (const change of changes) {
+          const key = change.ingredient.toLowerCase();
+          byName.set(key, { ...byName.get(key), ...change, time_since_last_update: "just now" });
+        }
+        return Array.from(byName.values());
+      });
+    });
+
+    source.onerror = () => {
+      setError("Live inventory connection lost, reconnecting...");
+    };
+
+    return () => source.close();
+  }, [API_URL]);
+
+  return { items, isLoading, error };
+}
@@ -116,7 +116,9 @@ CREATE TABLE `sales_data` (
   `is_holiday` tinyint(1) DEFAULT NULL,
   `dish_name` varchar(255) DEFAULT NULL,
   `sales` int DEFAULT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `unique_sale` (`date`,`dish_name`),
+  KEY `idx_sales_date_id` (`date`,`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=6209 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 